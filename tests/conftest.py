@@ -2,8 +2,32 @@
 PyTest Fixtures.
 """
 
+import logging
+
 import pytest
 from cement import fs
+from types import SimpleNamespace
+
+from trustdnn.controllers.evaluate import Evaluate
+
+
+def pytest_addoption(parser):
+    parser.addoption("--benchmark", action="store_true", help="run the benchmarks, which report timings")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "benchmark: reports timings, skipped without --benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+
+    skip = pytest.mark.skip(reason="benchmark, run with --benchmark")
+
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
 
 @pytest.fixture(scope="function")
 def tmp(request):
@@ -14,3 +38,17 @@ def tmp(request):
     t = fs.Tmp()
     yield t
     t.remove()
+
+
+@pytest.fixture(scope="function")
+def evaluate(tmp_path):
+    """
+    Create an `Evaluate` controller outside of the app, with `tmp_path` as its
+    working directory and the default arguments of its actions. The tests
+    replace the methods that load the benchmarks and tools.
+    """
+    controller = Evaluate()
+    controller.app = SimpleNamespace(log=logging.getLogger('test'), pargs=SimpleNamespace(jobs=1))
+    controller._working_dir = tmp_path
+
+    return controller
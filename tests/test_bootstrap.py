@@ -0,0 +1,33 @@
+import numpy as np
+
+from trustdnn.core.bootstrap import bootstrap_ci, compute_metrics, paired_bootstrap
+
+
+def test_bootstrap_ci_matches_resampling_the_outcomes():
+    rng = np.random.default_rng(0)
+    outcomes = rng.choice(4, size=5000, p=[0.5, 0.1, 0.3, 0.1])
+    counts = np.bincount(outcomes, minlength=4)
+
+    intervals = bootstrap_ci(counts, n_resamples=2000)
+    # explicit resampling of the outcome vector
+    resamples = outcomes[rng.integers(0, len(outcomes), size=(2000, len(outcomes)))]
+    resampled_counts = np.stack([np.bincount(resample, minlength=4) for resample in resamples])
+    low, high = np.quantile(compute_metrics(resampled_counts)['mcc'], [0.025, 0.975])
+
+    assert intervals['mcc_low'] <= compute_metrics(counts)['mcc'] <= intervals['mcc_high']
+    assert abs(intervals['mcc_low'] - low) < 0.01
+    assert abs(intervals['mcc_high'] - high) < 0.01
+
+
+def test_paired_bootstrap():
+    rng = np.random.default_rng(0)
+    outcomes = rng.choice(4, size=5000)
+
+    same = paired_bootstrap(outcomes, outcomes)
+    assert same['difference'] == 0 and same['p_value'] == 1.0
+
+    # the second tool turns most false positives into true negatives
+    better = outcomes.copy()
+    better[(outcomes == 1) & (rng.random(5000) < 0.8)] = 2
+    test = paired_bootstrap(outcomes, better)
+    assert test['difference'] > 0 and test['low'] > 0 and test['p_value'] < 0.05
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from trustdnn.core.breakdown import Breakdown
+from trustdnn.core.evaluation import Evaluation
+
+COUNTS = ['tps', 'fps', 'tns', 'fns']
+
+
+def test_breakdown_aligns_on_index():
+    index = pd.Index([10, 11, 12, 13])
+    notifications = pd.DataFrame({'notification': ['correct', 'incorrect', 'correct', 'incorrect']}, index=index)
+    labels = pd.DataFrame({'y': [0, 1, 2, 1]}, index=index)
+    # the prediction of sample 11 is missing, the evaluation drops it
+    predictions = pd.DataFrame({'y': [0, 2, 2]}, index=[10, 12, 13])
+    evaluation = Evaluation(notifications, labels, predictions)
+    assert evaluation.index.tolist() == [10, 12, 13]
+
+    # the feature slice is indexed as the labels, the samples are grouped by their own value
+    feature = pd.Series(['a', 'b', 'c', 'd'], index=index)
+    df = Breakdown(evaluation.outcomes, {'true_class': evaluation.true_labels, 'feature': feature},
+                   index=evaluation.index).to_frame().set_index(['slice', 'group'])
+
+    for sample, group in [(10, 'a'), (12, 'c'), (13, 'd')]:
+        outcome = evaluation.outcomes[evaluation.index.get_loc(sample)]
+        assert df.loc[('feature', group), COUNTS].tolist() == np.eye(4, dtype=int)[outcome].tolist()
+
+    assert ('feature', 'b') not in df.index
+    assert df.loc['true_class', 'total'].tolist() == [1, 1, 1]
@@ -0,0 +1,87 @@
+import pytest
+
+from types import SimpleNamespace
+
+from trustdnn.core.cache import ResultCache, fingerprint
+
+
+def test_result_cache(tmp_path):
+    path = tmp_path / '.cache' / 'results.json'
+    cache = ResultCache(path)
+    key = ResultCache.key('tool', 'output', 1)
+
+    assert key == ResultCache.key('tool', 'output', 1) and key != ResultCache.key('tool', 'output', 2)
+    assert key not in cache
+
+    cache[key] = {'mcc': 0.5}
+    cache.save()
+
+    assert ResultCache(path).get(key) == {'mcc': 0.5}
+
+
+def test_fingerprint(tmp_path):
+    path = tmp_path / 'output.csv'
+    assert fingerprint(path).endswith(':missing') and fingerprint(None) == 'none'
+
+    path.write_text('a')
+    before = fingerprint(path)
+    path.write_text('ab')
+
+    assert fingerprint(path) != before
+
+
+@pytest.fixture
+def cached_evaluate(evaluate, tmp_path):
+    labels, predictions = tmp_path / 'labels.npy', tmp_path / 'predictions.npy'
+    labels.write_text('labels')
+    predictions.write_text('predictions')
+    evaluate.get_dataset = lambda dataset, benchmark: SimpleNamespace(test=SimpleNamespace(labels_path=labels))
+    evaluate.get_model = lambda model, benchmark: SimpleNamespace(predictions_path=predictions)
+    evaluate.get_tool = lambda tool: SimpleNamespace(get_notification_sources=lambda output: [output])
+    evaluate.evaluated = []
+
+    def evaluate_output(tool, output, **kwargs):
+        evaluate.evaluated.append(output)
+        return {'output': str(output)}
+
+    evaluate.evaluate_output = evaluate_output
+
+    return evaluate
+
+
+def test_cache_invalidation(cached_evaluate, tmp_path):
+    evaluate = cached_evaluate
+    outputs = [tmp_path / 'output1.csv', tmp_path / 'output2.csv']
+
+    for output in outputs:
+        output.write_text('notification\ncorrect\n')
+
+    jobs = [{'tool': 't1', 'output': output, 'dataset': 'd1', 'benchmark': 'b', 'model': 'm1', 'invert': False}
+            for output in outputs]
+
+    def evaluate_outputs(cache):
+        evaluate.evaluated.clear()
+        results = evaluate.evaluate_outputs(jobs, cache, workers=1)
+        assert [result['output'] for result in results] == [str(output) for output in outputs]
+
+        return evaluate.evaluated
+
+    assert evaluate_outputs(evaluate.get_cache()) == outputs
+    # cached across runs
+    assert evaluate_outputs(evaluate.get_cache()) == []
+
+    # a changed output is evaluated again
+    outputs[1].write_text('notification\nincorrect\n')
+    assert evaluate_outputs(evaluate.get_cache()) == [outputs[1]]
+
+    # so are all the outputs once the labels change
+    (tmp_path / 'labels.npy').write_text('new labels')
+    assert evaluate_outputs(evaluate.get_cache()) == outputs
+
+    # the options of the evaluation are part of the key
+    jobs[0]['invert'] = True
+    assert evaluate_outputs(evaluate.get_cache()) == [outputs[0]]
+
+    # --no_cache ignores the cached results and replaces them
+    assert evaluate_outputs(evaluate.get_cache(clear=True)) == outputs
+    assert evaluate_outputs(evaluate.get_cache()) == []
@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+
+from types import SimpleNamespace
+
+from trustdnn.controllers.campaign import Campaign
+from trustdnn.core.campaign import CampaignEntry, CampaignSpec
+from trustdnn.core.exc import TrustDNNError
+
+
+def test_load_spec(tmp_path):
+    path = tmp_path / 'spec.yml'
+    path.write_text("workdir: ~/workdir\n"
+                    "id: c1\n"
+                    "options: {parallel: 4, repeat: 3}\n"
+                    "matrix:\n"
+                    "  - tools: [prophecy, selfchecker]\n"
+                    "    benchmarks: trustbench\n"
+                    "    phases: [infer, analyze]\n"
+                    "  - {tools: deepinfer, benchmarks: trustbench, models: [m1], phases: infer}\n")
+    spec = CampaignSpec.load(path)
+
+    assert spec.id == 'c1' and spec.options == {'parallel': 4, 'repeat': 3}
+    assert spec.matrix[0].tools == ['prophecy', 'selfchecker'] and spec.matrix[0].benchmarks == ['trustbench']
+    # the analysis runs before the inference
+    assert spec.matrix[0].phases == ['analyze', 'infer'] and spec.matrix[0].datasets is None
+    assert spec.matrix[1].models == ['m1'] and spec.matrix[1].phases == ['infer']
+
+
+@pytest.mark.parametrize('matrix', ["[{tools: prophecy}]", "[{tools: prophecy, benchmarks: b, phases: [train]}]",
+                                    "[{tools: prophecy, benchmarks: b, tool: x}]"])
+def test_load_invalid_spec(tmp_path, matrix):
+    path = tmp_path / 'spec.yml'
+    path.write_text(f"workdir: wd\nid: c1\nmatrix: {matrix}\n")
+
+    with pytest.raises(TrustDNNError):
+        CampaignSpec.load(path)
+
+
+def test_workload_shared_working_dir(tmp_path):
+    benchmarks = {name: SimpleNamespace(name=name, models={'m1': SimpleNamespace(name='m1', dataset='d1')},
+                                        get_dataset=lambda dataset: SimpleNamespace(name=dataset))
+                  for name in ['b1', 'b2']}
+    campaign = Campaign()
+    campaign.app = SimpleNamespace(log=logging.getLogger('test'),
+                                   get_plugin_handler=lambda name, kind: benchmarks.get(name, name))
+    spec = CampaignSpec(workdir=tmp_path, id='c1', matrix=[CampaignEntry(tools=['t1', 't2'], benchmarks=['b1'])])
+
+    workload = campaign.get_workload(spec)
+    assert set(workload) == {('t1', 'b1', 'm1'), ('t2', 'b1', 'm1')}
+    assert workload[('t1', 'b1', 'm1')][1]['infer'].working_dir == tmp_path / 't1' / 'c1' / 'm1'
+
+    # the outputs of the model of both benchmarks would be in the same working directory
+    spec.matrix.append(CampaignEntry(tools=['t1'], benchmarks=['b2'], phases=['infer']))
+
+    with pytest.raises(TrustDNNError, match='share the working directory'):
+        campaign.get_workload(spec)
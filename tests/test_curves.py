@@ -0,0 +1,26 @@
+import numpy as np
+
+from trustdnn.core.curves import Curves
+
+
+def test_curves_match_thresholding():
+    rng = np.random.default_rng(0)
+    true_labels = rng.integers(0, 3, 2000)
+    pred_labels = np.where(rng.random(2000) < 0.7, true_labels, rng.integers(0, 3, 2000))
+    scores = np.round(rng.normal(true_labels == pred_labels, 1), 1)
+
+    for invert in [False, True]:
+        curves = Curves(scores, true_labels, pred_labels, invert=invert)
+        is_positive = (true_labels == pred_labels) ^ invert
+
+        for i, threshold in enumerate(curves.thresholds):
+            notified = scores <= threshold if invert else scores >= threshold
+            assert curves.true_pos[i] == (notified & is_positive).sum()
+            assert curves.false_pos[i] == (notified & ~is_positive).sum()
+
+        # the roc auc is the probability of ranking a positive above a negative
+        positives, negatives = scores[is_positive], scores[~is_positive]
+        if invert:
+            positives, negatives = -positives, -negatives
+        ranks = (positives[:, None] > negatives).mean() + (positives[:, None] == negatives).mean() / 2
+        assert abs(curves.roc_auc - ranks) < 1e-9
@@ -0,0 +1,47 @@
+import math
+
+import pandas as pd
+
+from types import SimpleNamespace
+
+from trustdnn.core.exc import TrustDNNError
+
+
+def get_dataset(sizes: dict):
+    def _get_dataset(dataset, benchmark):
+        if dataset not in sizes:
+            raise TrustDNNError(f"Dataset {dataset} not found in benchmark {benchmark}")
+
+        return SimpleNamespace(**{split: SimpleNamespace(size=size) for split, size in sizes[dataset].items()})
+
+    return _get_dataset
+
+
+def execution(tool, phase, dataset, duration, status='success'):
+    return {'tool': tool, 'phase': phase, 'dataset': dataset, 'benchmark': 'b', 'duration': duration,
+            'mem_peak': 2 * 1024 ** 2, 'status': status}
+
+
+def test_efficiency(evaluate):
+    executions = pd.DataFrame([execution('base', 'infer', 'd1', 2.0), execution('base', 'infer', 'd1', 2.0),
+                               execution('t1', 'infer', 'd1', 3.0), execution('t1', 'infer', 'd1', 5.0),
+                               execution('t1', 'infer', 'd1', 100.0, status='error'),
+                               execution('t1', 'analyze', 'd1', 10.0), execution('t1', 'serve', 'd1', 7.0),
+                               execution('t1', 'infer', 'd2', 1.0), execution('t1', 'infer', 'd3', 0.0)])
+    evaluate.get_dataset = get_dataset({'d1': {'test': 100, 'val': 50}, 'd3': {'test': 0, 'val': 0}})
+    df = evaluate.get_efficiency(executions, baseline='base').set_index(['tool', 'phase', 'dataset'])
+
+    infer = df.loc[('t1', 'infer', 'd1')]
+    assert infer['runs'] == 2 and infer['duration'] == 4.0 and infer['memory'] == 2.0
+    assert infer['duration_p50'] == 4.0 and infer['duration_p99'] == 4.98
+    assert infer['samples'] == 100 and infer['samples_per_second'] == 25.0 and infer['latency_ms'] == 40.0
+    assert infer['overhead'] == 2.0 and infer['overhead_seconds'] == 2.0
+
+    # the analysis processes the validation split and has no overhead
+    analyze = df.loc[('t1', 'analyze', 'd1')]
+    assert analyze['samples'] == 50 and analyze['samples_per_second'] == 5.0 and math.isnan(analyze['overhead'])
+
+    # without a split (serve), a split size (d2) or samples (d3), only the throughput and latency are unknown
+    for key in [('t1', 'serve', 'd1'), ('t1', 'infer', 'd2'), ('t1', 'infer', 'd3')]:
+        assert df.loc[key, 'runs'] == 1
+        assert math.isnan(df.loc[key, 'samples_per_second']) and math.isnan(df.loc[key, 'latency_ms'])
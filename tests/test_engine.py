@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import functools
+
+import pytest
+
+from trustdnn.core.objects import Execution, Job
+from trustdnn.handlers.engine import AsyncEngine
+from trustdnn.handlers.instance import InstanceHandler, partition_cores
+
+
+def make_job(tmp_path, name: str, code: str) -> Job:
+    output = tmp_path / f"{name}.txt"
+    command = f"{sys.executable} -c \"{code}; open('{output}', 'w').write('done')\""
+
+    return Job(command=command, output=output, log_path=tmp_path, cwd=tmp_path, name=name)
+
+
+def test_engine(tmp_path):
+    engine = AsyncEngine(logging.getLogger('test'), parallel=2, timeout=1, interval=0.05)
+    jobs = [make_job(tmp_path, 'ok', "print('hello')"), make_job(tmp_path, 'slow', "import time; time.sleep(10)"),
+            make_job(tmp_path, 'fail', "import sys; sys.exit(3)")]
+
+    executions = engine.run([functools.partial(engine.execute, job) for job in jobs])
+
+    assert [e.status for e in executions] == ['success', 'timeout', 'error']
+    assert [e.return_code for e in executions] == [0, -9, 3]
+    assert executions[1].duration < 5
+    # the fast job may exit before it is sampled
+    assert executions[1].mem_peak > 0 and executions[0].mem_peak >= 0
+    assert 'hello' in next(tmp_path.glob('*.ok.stdout')).read_text()
+
+
+def test_engine_requeue(tmp_path):
+    engine = AsyncEngine(logging.getLogger('test'), parallel=2, interval=0.05, budget=2 ** 40)
+    jobs = [make_job(tmp_path, 'large', "x = bytearray(200 * 2 ** 20); import time; time.sleep(1)"),
+            make_job(tmp_path, 'small', "import time; time.sleep(2)")]
+
+    jobs[0].memory, jobs[1].memory = 50 * 2 ** 20, 100 * 2 ** 20
+
+    executions = engine.run([functools.partial(engine.execute, job) for job in jobs])
+
+    assert [e.status for e in executions] == ['success', 'success']
+    # killed while sharing the budget with the small job, then re-queued with its observed peak
+    assert jobs[0].memory >= 200 * 2 ** 20
+    assert jobs[1].memory == 100 * 2 ** 20
+
+
+def test_engine_execute_call(tmp_path):
+    engine = AsyncEngine(logging.getLogger('test'), parallel=2, timeout=0.5, interval=0.05)
+    jobs = [Job(command=name, output=tmp_path / f"{name}.txt", log_path=tmp_path, cwd=tmp_path)
+            for name in ['fast', 'blocked']]
+    ticks = []
+
+    def call(seconds: float) -> Execution:
+        time.sleep(seconds)
+        return InstanceHandler.get_execution(0, tmp_path / 'fast.txt', seconds, 0, [1])
+
+    async def tick():
+        # the event loop keeps running while the calls block their threads
+        for _ in range(5):
+            ticks.append(time.time())
+            await asyncio.sleep(0.1)
+
+    fast, blocked, _ = engine.run([functools.partial(engine.execute_call, jobs[0], functools.partial(call, 0.1)),
+                                   functools.partial(engine.execute_call, jobs[1], functools.partial(call, 1)),
+                                   tick])
+
+    assert fast.return_code == 0 and fast.duration == 0.1
+    assert blocked.status == 'timeout' and blocked.output == jobs[1].output and blocked.duration < 1
+    assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.9
+
+
+def test_partition_cores():
+    assert partition_cores(3, list(range(8))) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+    assert partition_cores(4, [0, 1]) == [[0], [1]]
+
+
+def test_engine_pinning(tmp_path):
+    engine = AsyncEngine(logging.getLogger('test'), parallel=2, pinning=True)
+    code = "import os; print(sorted(os.sched_getaffinity(0)), os.environ['OMP_NUM_THREADS'])"
+    jobs = [make_job(tmp_path, f"job{i}", code) for i in range(2)]
+
+    executions = engine.run([functools.partial(engine.execute, job) for job in jobs])
+    sets = partition_cores(2)
+    # on a single core both jobs share it
+    core_sets = [sets[i % len(sets)] for i in range(2)]
+
+    assert [e.cores for e in executions] == [len(cores) for cores in core_sets]
+
+    for job, cores in zip(jobs, core_sets):
+        assert f"{cores} {len(cores)}" in next(tmp_path.glob(f"*.{job.name}.stdout")).read_text()
+
+
+def test_engine_pinning_alone(tmp_path):
+    engine = AsyncEngine(logging.getLogger('test'), parallel=1, pinning=True)
+    code = "import os; print(len(os.sched_getaffinity(0)), os.environ.get('OMP_NUM_THREADS'))"
+    job = make_job(tmp_path, 'alone', code)
+
+    execution, = engine.run([functools.partial(engine.execute, job)])
+
+    # a job running alone is not pinned and keeps the default thread pools
+    assert execution.cores is None
+    assert f"{len(os.sched_getaffinity(0))} None" in next(tmp_path.glob('*.alone.stdout')).read_text()
+
+
+def test_engine_cancel(tmp_path):
+    engine = AsyncEngine(logging.getLogger('test'), interval=0.05)
+    job = make_job(tmp_path, 'sleep', "import time; time.sleep(30)")
+    pids = []
+
+    async def cancel():
+        task = asyncio.ensure_future(engine._run([functools.partial(engine.execute, job)]))
+
+        while not engine._running:
+            await asyncio.sleep(0.05)
+
+        pids.extend(engine._running)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+    deadline = time.time() + 5
+
+    # the tool, child of the killed shell, is reaped by init
+    while time.time() < deadline:
+        try:
+            os.killpg(pids[0], 0)
+        except ProcessLookupError:
+            break
+
+        time.sleep(0.1)
+    else:
+        pytest.fail("The process group of the cancelled job is still running")
@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trustdnn.core.evaluation import Evaluation, get_outcome
+
+
+def make_data(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    notifications = pd.DataFrame({'notification': rng.choice(['Correct', 'incorrect', 'UNCERTAIN'], size=n)})
+    labels = pd.DataFrame({'y': rng.integers(0, 10, size=n)})
+    predictions = pd.DataFrame({'y': np.where(rng.random(n) < 0.8, labels['y'], rng.integers(0, 10, size=n))})
+
+    return notifications, labels, predictions
+
+
+def legacy_counts(notifications, labels, predictions, invert=False):
+    # row-wise reference implementation the vectorized engine replaced
+    notifications = notifications.copy()
+    notifications['notification'] = notifications['notification'].apply(lambda x: x.lower())
+    notifications['notification'] = notifications['notification'].apply(lambda x: 'incorrect' if x == 'uncertain' else x)
+    results = (notifications.merge(predictions.rename(columns={'y': 'pred_label'}), left_index=True, right_index=True)
+               .merge(labels.rename(columns={'y': 'true_label'}), left_index=True, right_index=True))
+    outcomes = results.apply(lambda x: get_outcome(x['notification'], x['true_label'], x['pred_label'], invert), axis=1)
+    ground_truth = results.apply(lambda x: x['true_label'] == x['pred_label'], axis=1)
+
+    return outcomes.value_counts(), ground_truth.value_counts()
+
+
+@pytest.mark.parametrize('n', [2000, 10000])
+def test_evaluation_matches_legacy(n):
+    notifications, labels, predictions = make_data(n)
+
+    for invert in [False, True]:
+        evaluation = Evaluation(notifications.copy(), labels.copy(), predictions.copy(), invert=invert)
+        outcomes, ground_truth = legacy_counts(notifications, labels, predictions, invert)
+        counts = evaluation.to_dict()
+
+        assert counts['tps'] == outcomes.get('tp', 0)
+        assert counts['fps'] == outcomes.get('fp', 0)
+        assert counts['tns'] == outcomes.get('tn', 0)
+        assert counts['fns'] == outcomes.get('fn', 0)
+        assert counts['gt_correct'] == ground_truth.get(True, 0)
+        assert counts['gt_incorrect'] == ground_truth.get(False, 0)
+        assert counts['correct'] + counts['incorrect'] + counts['uncertain'] == len(notifications)
+
+
+def test_evaluation_aligns_on_index():
+    notifications, labels, predictions = make_data(100)
+    evaluation = Evaluation(notifications.iloc[10:], labels, predictions.iloc[:90])
+
+    assert evaluation.gt_correct + evaluation.gt_incorrect == 80
+
+
+def test_evaluation_from_chunks():
+    notifications, labels, predictions = make_data(1000)
+    evaluation = Evaluation(notifications, labels, predictions, invert=True)
+
+    def chunks(df, size=128):
+        return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+    streamed = Evaluation.from_chunks(zip(chunks(notifications), chunks(labels), chunks(predictions)), invert=True)
+
+    assert streamed.to_dict() == evaluation.to_dict()
+    assert streamed.performance() == evaluation.performance()
+
+
+@pytest.mark.benchmark
+def test_evaluation_benchmark():
+    # timings only, the equivalence is checked by test_evaluation_matches_legacy
+    notifications, labels, predictions = make_data(10000)
+
+    start = time.perf_counter()
+    legacy_counts(notifications, labels, predictions)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    Evaluation(notifications, labels, predictions)
+    vectorized = time.perf_counter() - start
+
+    print(f"\nEvaluation of 10k samples: row-wise {legacy:.4f}s, vectorized {vectorized:.4f}s "
+          f"({legacy / vectorized:.1f}x)")
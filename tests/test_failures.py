@@ -0,0 +1,41 @@
+from pathlib import Path
+
+from trustdnn.core.failures import RetryPolicy, classify, get_signal
+from trustdnn.core.journal import Journal
+from trustdnn.core.objects import Execution
+
+
+def make_execution(status: str, return_code: int) -> Execution:
+    return Execution(timestamp=0, output=Path('out'), executed=False, status=status, duration=1, mem_mean=0,
+                     mem_median=0, mem_peak=0, return_code=return_code)
+
+
+def test_classify():
+    assert classify(make_execution('success', 0)) is None
+    assert classify(make_execution('timeout', -9)) == 'timeout'
+    assert classify(make_execution('error', -9)) == 'oom'
+    # the shell reports the signal that killed the tool
+    assert get_signal(137) == 9 and classify(make_execution('error', 139)) == 'signal'
+    assert classify(make_execution('error', 1), "tensorflow.python.framework.errors_impl.ResourceExhaustedError") == \
+        'oom'
+    assert classify(make_execution('error', 1), "ValueError: bad shape") == 'error'
+    # the rules of the tool are matched before the default ones
+    assert classify(make_execution('error', 1), "Cannot allocate memory: bad config",
+                    {r"bad config": 'permanent'}) == 'permanent'
+
+
+def test_retry_policy():
+    policy = RetryPolicy(retries=2, backoff=1, shrink_batch=True)
+
+    assert policy.should_retry('oom', 0) and policy.should_retry('transient', 1)
+    assert not policy.should_retry('oom', 2) and not policy.should_retry('error', 0)
+    assert [policy.delay(attempt) for attempt in range(3)] == [1, 2, 4]
+    assert policy.batch_size('oom', 128) == 64 and policy.batch_size('timeout', 128) == 128
+
+
+def test_journal(tmp_path):
+    journal = Journal(tmp_path / 'journal.jsonl')
+    journal.record(attempt=0, status='error', stderr=tmp_path / 'log.stderr')
+    journal.record(attempt=1, status='success')
+
+    assert [(entry['attempt'], entry['status']) for entry in journal.read()] == [(0, 'error'), (1, 'success')]
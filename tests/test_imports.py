@@ -0,0 +1,29 @@
+import sys
+import subprocess
+
+HEAVY_MODULES = ['pandas', 'numpy', 'seaborn', 'matplotlib', 'psutil']
+
+
+def import_times(module: str) -> dict:
+    # -X importtime reports "import time: self [us] | cumulative | imported package" lines on stderr
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], capture_output=True,
+                            text=True, check=True)
+    times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def test_main_import_time():
+    times = import_times('trustdnn.main')
+    heavy = [module for module in HEAVY_MODULES if module in times]
+
+    print(f"\nImport of trustdnn.main: {times['trustdnn.main'] / 1000:.1f}ms")
+
+    assert not heavy, f"trustdnn.main imports {', '.join(heavy)} at startup"
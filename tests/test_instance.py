@@ -0,0 +1,105 @@
+import logging
+
+from types import SimpleNamespace
+
+from trustdnn.core.failures import classify, read_tail
+from trustdnn.core.objects import Instance
+from trustdnn.handlers.instance import InstanceHandler
+from trustdnn.handlers.tool import ToolPlugin
+
+
+def make_handler() -> InstanceHandler:
+    handler = InstanceHandler()
+    handler.app = SimpleNamespace(log=logging.getLogger('test'))
+
+    return handler
+
+
+def make_instance(tmp_path) -> Instance:
+    working_dir = tmp_path / 'm1'
+    working_dir.mkdir()
+
+    return Instance(dataset=SimpleNamespace(name='d1'), model=SimpleNamespace(name='m1'), working_dir=working_dir,
+                    phase='infer')
+
+
+def infer_command(model, dataset, working_dir, **kwargs):
+    return working_dir / 'output.csv', 'infer'
+
+
+def test_forced_run_keeps_previous_output(tmp_path):
+    handler, instance = make_handler(), make_instance(tmp_path)
+    output = instance.working_dir / 'output.csv'
+    output.write_text('previous')
+
+    def fail(model, dataset, working_dir):
+        output.write_text('partial')
+        raise RuntimeError('failed')
+
+    def succeed(model, dataset, working_dir):
+        output.write_text('new')
+
+    # the output exists, the run is skipped unless forced
+    assert handler(instance, str, infer_command, tmp_path, in_process_call=succeed) is None
+
+    # a failed run restores the output of the previous run
+    execution = handler(instance, str, infer_command, tmp_path, force=True, in_process_call=fail)
+    assert execution.status == 'unknown' and output.read_text() == 'previous'
+    assert not InstanceHandler.get_previous_output(output).exists()
+
+    execution = handler(instance, str, infer_command, tmp_path, force=True, in_process_call=succeed)
+    assert execution.status == 'success' and output.read_text() == 'new'
+    assert not InstanceHandler.get_previous_output(output).exists()
+
+
+def test_execute_in_process(tmp_path):
+    handler, instance = make_handler(), make_instance(tmp_path)
+    output = instance.working_dir / 'output.csv'
+
+    def infer(model, dataset, working_dir):
+        data = bytearray(50 * 2 ** 20)
+        (working_dir / 'output.csv').write_text(str(len(data)))
+
+    execution = handler.execute_in_process(infer, instance, tmp_path, output=output)
+
+    assert execution.status == 'success' and execution.return_code == 0 and execution.output == output
+    assert execution.mem_peak >= 0 and execution.mem_mean >= 0
+    assert not execution.stderr.exists()
+
+
+def test_execute_in_process_error(tmp_path):
+    handler, instance = make_handler(), make_instance(tmp_path)
+
+    def infer(model, dataset, working_dir):
+        raise MemoryError('out of memory')
+
+    execution = handler.execute_in_process(infer, instance, tmp_path, output=instance.working_dir / 'output.csv')
+
+    assert execution.status == 'error' and execution.return_code == 1 and execution.mem_peak >= 0
+    # the traceback is written to the stderr of the execution, where the failures are classified from
+    assert execution.stderr == tmp_path / f"{execution.timestamp}.stderr"
+    assert 'MemoryError: out of memory' in execution.stderr.read_text()
+    assert classify(execution, read_tail(execution.stderr)) == 'oom'
+
+
+def test_runs_in_process():
+    class Tool(ToolPlugin):
+        class Meta:
+            label = 'tool'
+
+        def analyze_command(self, model, dataset, working_dir, **kwargs):
+            return working_dir / 'analysis', ''
+
+        def infer_command(self, model, dataset, working_dir, **kwargs):
+            return working_dir / 'output', ''
+
+        def get_notifications(self, output, **kwargs):
+            return None
+
+        def infer(self, model, dataset, working_dir, **kwargs):
+            pass
+
+    tool = Tool('tool')
+
+    assert tool.runs_in_process('infer') and Tool.in_process_phases == {'infer'} and not Tool.serves_with_command
+    assert not tool.runs_in_process('analyze') and not tool.runs_in_process('serve')
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from trustdnn.core.evaluation import Evaluation, encode_notifications
+from trustdnn.core.notifications import NotificationArtifact
+
+
+def test_artifact(tmp_path):
+    output = tmp_path / 'results.csv'
+    output.write_text('notification\ncorrect\nincorrect\n')
+    artifact = NotificationArtifact(output)
+    assert not artifact.fresh
+
+    artifact.save(np.array([0, 1], dtype=np.int8), np.array([0.9, 0.2]))
+    assert artifact.fresh
+    assert isinstance(artifact.codes, np.memmap)
+    assert artifact.codes.tolist() == [0, 1]
+    assert artifact.scores.tolist() == [0.9, 0.2]
+
+    output.write_text('notification\ncorrect\nincorrect\nuncertain\n')
+    assert not artifact.fresh
+
+
+def test_artifact_sources(tmp_path):
+    output, source = tmp_path / 'performance.json', tmp_path / 'pred_labels_test.npy'
+    output.write_text('{}')
+    np.save(source, np.array([[0, 0], [0, 1]]))
+    artifact = NotificationArtifact(output, sources=[output, source])
+    artifact.save(np.array([0, 1], dtype=np.int8))
+    assert artifact.fresh and artifact.scores is None
+
+    # the output is unchanged but the notifications are read from another file
+    np.save(source, np.array([[0, 0], [0, 1], [1, 1]]))
+    assert not artifact.fresh
+
+
+def test_evaluation_from_codes():
+    rng = np.random.default_rng(0)
+    notifications = pd.DataFrame({'notification': rng.choice(['correct', 'Incorrect', 'uncertain'], size=1000)})
+    labels = pd.DataFrame({'y': rng.integers(0, 3, size=1000)})
+    predictions = pd.DataFrame({'y': rng.integers(0, 3, size=990)})
+    codes = encode_notifications(notifications['notification'])
+
+    for invert in [False, True]:
+        expected = Evaluation(notifications, labels, predictions, invert=invert)
+        evaluation = Evaluation(codes, labels, predictions, invert=invert)
+        assert evaluation.to_dict() == expected.to_dict()
+        assert evaluation.performance() == expected.performance()
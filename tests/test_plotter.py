@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from trustdnn.core.plotter import Plotter
+
+DATA = pd.DataFrame({'x': [1, 2, 1, 2], 'y': [1.0, 2.0, 2.0, 3.0], 'tool': ['t1', 't1', 't2', 't2']})
+
+
+def draw(plotter: Plotter, tags: list):
+    plotter.fig_size = (4, 3)
+
+    for tag in tags:
+        plotter.line_plot(DATA, x='x', y='y', hue='tool', tag=tag)
+
+
+def test_figure_disabled(tmp_path):
+    plotter = Plotter(figures_path=tmp_path, enabled=False)
+    draw(plotter, ['a', 'b'])
+    plotter.render()
+
+    assert list(tmp_path.glob('*.png')) == []
+
+
+def test_figure_drawn(tmp_path):
+    draw(Plotter(figures_path=tmp_path), ['a'])
+
+    assert [path.name for path in tmp_path.glob('*.png')] == ['line_plot_a.png']
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_figure_deferred(tmp_path, workers):
+    plotter = Plotter(figures_path=tmp_path, deferred=True, workers=workers)
+    draw(plotter, ['a', 'b', 'c'])
+
+    # queued until rendered, with the settings of the plotter when queued
+    assert list(tmp_path.glob('*.png')) == []
+    assert [figure[0]['fig_size'] for figure in plotter._figures] == [(4, 3)] * 3
+
+    plotter.render()
+
+    assert sorted(path.name for path in tmp_path.glob('*.png')) == [f"line_plot_{tag}.png" for tag in 'abc']
+    # the queue is emptied by render
+    plotter.render()
+    assert len(list(tmp_path.glob('*.png'))) == 3
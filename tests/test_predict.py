@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from trustdnn.core.model import Model
+from trustdnn.core.predict import is_up_to_date, load_features, to_labels
+
+
+def test_to_labels():
+    # the class with the highest probability
+    assert to_labels([[0.1, 0.7, 0.2], [0.6, 0.3, 0.1]]).tolist() == [1, 0]
+    # the thresholded probability of a single sigmoid output, with or without the output dimension
+    assert to_labels([[0.2], [0.9], [0.5]]).tolist() == [0, 1, 0]
+    assert to_labels(np.array([0.7, 0.1])).tolist() == [1, 0]
+
+
+def test_is_up_to_date(tmp_path):
+    model, features, output = tmp_path / 'model.h5', tmp_path / 'x.npy', tmp_path / 'predictions.npy'
+    model.write_text('model')
+    features.write_text('features')
+    assert not is_up_to_date(output, model, features)
+
+    output.write_text('predictions')
+    os.utime(model, ns=(1, 1))
+    os.utime(features, ns=(1, 1))
+    assert is_up_to_date(output, model, features)
+    # missing inputs are ignored
+    assert is_up_to_date(output, model, tmp_path / 'missing.npy')
+
+    # the model changed after the predictions were generated
+    os.utime(model, ns=(output.stat().st_mtime_ns + 10 ** 9,) * 2)
+    assert not is_up_to_date(output, model, features)
+
+
+def test_load_features(tmp_path):
+    np.save(tmp_path / 'x.npy', np.arange(6).reshape(3, 2))
+    (tmp_path / 'x.csv').write_text('a,b\n0,1\n2,3\n')
+
+    assert isinstance(load_features(tmp_path / 'x.npy'), np.memmap)
+    assert load_features(tmp_path / 'x.csv', headers=True).tolist() == [[0, 1], [2, 3]]
+
+
+def test_model_predictions(tmp_path):
+    model_path = tmp_path / 'm1.h5'
+    model_path.write_text('model')
+    csv_path = tmp_path / 'predictions' / 'm1.csv'
+    csv_path.parent.mkdir()
+    model = Model(model_path, 'd1', csv_path)
+
+    # missing predictions only fail once they are read
+    assert model.predictions_path == csv_path.with_suffix('.npy')
+
+    with pytest.raises(FileNotFoundError, match='benchmark predict'):
+        model.predictions
+
+    with pytest.raises(FileNotFoundError):
+        next(model.iter_predictions(2))
+
+    pd.DataFrame({'y': [0, 1, 1]}).to_csv(csv_path, index=False)
+    assert model.predictions_path == csv_path
+    assert model.predictions['y'].tolist() == [0, 1, 1]
+
+    # the binary predictions written by 'benchmark predict' take precedence over the CSV ones
+    np.save(csv_path.with_suffix('.npy'), np.array([1, 0, 0], dtype=np.int32))
+    model = Model(model_path, 'd1', csv_path)
+    assert model.predictions_path == csv_path.with_suffix('.npy')
+    assert model.predictions['y'].tolist() == [1, 0, 0]
+    assert [chunk['y'].tolist() for chunk in model.iter_predictions(2)] == [[1, 0], [0]]
@@ -0,0 +1,26 @@
+import os
+import json
+
+from trustdnn.core.registry import ConfigCache, config_hash
+
+
+def test_config_cache(tmp_path):
+    path = tmp_path / 'tool.json'
+    path.write_text(json.dumps({'command': 'tool.main'}))
+    configs = ConfigCache()
+
+    config = configs.get(path)
+    assert config == {'command': 'tool.main'}
+    assert configs.get(path) is config
+
+    path.write_text(json.dumps({'command': 'tool.cli'}))
+    os.utime(path, ns=(0, 0))
+    assert configs.get(path) == {'command': 'tool.cli'}
+
+    path.unlink()
+    assert configs.get(path) is None
+
+
+def test_config_hash():
+    assert config_hash({'a': 1, 'b': '~/x'}) == config_hash({'b': '~/x', 'a': 1})
+    assert config_hash({'a': 1}) != config_hash({'a': 2})
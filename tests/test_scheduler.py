@@ -0,0 +1,65 @@
+import asyncio
+
+import pandas as pd
+
+from trustdnn.core.scheduler import MemoryScheduler, estimate_memory, BASELINE_MEMORY, MODEL_FACTOR, DATA_FACTOR
+
+
+def test_estimate_memory(tmp_path):
+    executions = pd.DataFrame([
+        {'tool': 'prophecy', 'phase': 'analyze', 'dataset': 'd1', 'model': 'm1', 'status': 'success', 'mem_peak': 100},
+        {'tool': 'prophecy', 'phase': 'analyze', 'dataset': 'd1', 'model': 'm2', 'status': 'success', 'mem_peak': 300},
+        {'tool': 'prophecy', 'phase': 'analyze', 'dataset': 'd1', 'model': 'm1', 'status': 'error', 'mem_peak': 900}
+    ])
+    model, features = tmp_path / 'model.h5', tmp_path / 'x.npy'
+    model.write_bytes(b'0' * 10)
+    features.write_bytes(b'0' * 100)
+
+    assert estimate_memory(executions, 'prophecy', 'analyze', 'd1', 'm1') == 120
+    # falls back to the executions on the same dataset, then to the size of the files
+    assert estimate_memory(executions, 'prophecy', 'analyze', 'd1', 'm3') == 360
+    assert estimate_memory(executions, 'prophecy', 'infer', 'd1', 'm1', [model, features]) == \
+        BASELINE_MEMORY + 10 * MODEL_FACTOR + 100 * DATA_FACTOR
+
+
+def test_scheduler_first_fit_decreasing():
+    async def run():
+        scheduler = MemoryScheduler(budget=10, parallel=4)
+        admitted = []
+
+        async def job(name, estimate):
+            await scheduler.acquire(estimate)
+            admitted.append(name)
+            await asyncio.sleep(0.01)
+            scheduler.release(estimate)
+
+        await scheduler.acquire(10)
+        tasks = [asyncio.create_task(job(name, estimate)) for name, estimate in [('s1', 2), ('l', 8), ('s2', 3)]]
+        await asyncio.sleep(0)
+        scheduler.release(10)
+        await asyncio.sleep(0)
+        # the large job goes first and the smallest one fills the remaining memory
+        assert admitted == ['l', 's1']
+        await asyncio.gather(*tasks)
+
+        assert admitted == ['l', 's1', 's2']
+
+    asyncio.run(run())
+
+
+def test_scheduler_exclusive():
+    async def run():
+        scheduler = MemoryScheduler(parallel=4)
+        await scheduler.acquire()
+        exclusive = asyncio.create_task(scheduler.acquire(exclusive=True))
+        other = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        # the exclusive job holds back the queue until the running job finishes, then runs alone
+        assert not exclusive.done() and not other.done()
+        scheduler.release()
+        await asyncio.sleep(0)
+        assert exclusive.done() and not other.done()
+        scheduler.release()
+        await other
+
+    asyncio.run(run())
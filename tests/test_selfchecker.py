@@ -0,0 +1,49 @@
+import numpy as np
+
+from trustdnn.core.notifications import NotificationArtifact
+from trustdnn.plugins.selfchecker import SelfChecker
+
+
+def test_to_notifications():
+    # columns: predictions of the layers, layer-based prediction, prediction of the model
+    pred_labels = np.array([[0, 1, 1], [2, 0, 1], [1, 3, 3], [0, 2, 0]])
+    notifications = SelfChecker._to_notifications(pred_labels)['notification']
+
+    assert notifications.tolist() == ['correct', 'incorrect', 'correct', 'incorrect']
+    assert list(notifications.cat.categories) == ['correct', 'incorrect']
+
+
+def test_notifications_from_pred_labels(tmp_path):
+    output = tmp_path / 'performance.json'
+    output.write_text('{}')
+    np.save(tmp_path / 'pred_labels_test.npy', np.array([[1, 1, 1], [0, 1, 0], [2, 2, 2]]))
+    tool = SelfChecker()
+
+    assert SelfChecker.get_pred_labels_path(output) == tmp_path / 'pred_labels_test.npy'
+    assert tool.get_notifications(output)['notification'].tolist() == ['correct', 'incorrect', 'correct']
+    assert [chunk['notification'].tolist() for chunk in tool.iter_notifications(output, chunk_size=2)] == \
+        [['correct', 'incorrect'], ['correct']]
+
+
+def test_load_notifications(tmp_path, monkeypatch):
+    output = tmp_path / 'performance.json'
+    output.write_text('{}')
+    np.save(tmp_path / 'pred_labels_test.npy', np.array([[1, 1, 1], [0, 1, 0]]))
+    tool = SelfChecker()
+
+    assert tool.load_notifications(output).tolist() == [0, 1]
+    assert tool.get_notification_artifact(output).fresh
+
+    # the artifact is converted again once the predictions change, even if performance.json does not
+    np.save(tmp_path / 'pred_labels_test.npy', np.array([[1, 1, 1], [0, 1, 0], [0, 2, 2]]))
+    assert not tool.get_notification_artifact(output).fresh
+    assert tool.load_notifications(output).tolist() == [0, 1, 0]
+
+    def read_only(*args, **kwargs):
+        raise PermissionError('Read-only file system')
+
+    # outputs in read-only directories are converted in memory
+    monkeypatch.setattr(NotificationArtifact, 'save', read_only)
+    np.save(tmp_path / 'pred_labels_test.npy', np.array([[1, 0, 1]]))
+    assert tool.load_notifications(output).tolist() == [1]
+    assert tool.load_scores(output) is None
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import numpy as np
+
+from types import SimpleNamespace
+
+from trustdnn.core.objects import Instance
+from trustdnn.core.serve import LoadGenerator, NotificationServer
+from trustdnn.handlers.serving import ServeOptions, ServingRunner
+from trustdnn.handlers.tool import ToolPlugin
+
+
+def notify(features: np.ndarray):
+    return ('correct', 0.9) if features.sum() >= 0 else 'incorrect'
+
+
+def test_closed_loop():
+    features = np.array([[1.0, 2.0], [-3.0, 1.0], [0.5, 0.5]])
+    server = NotificationServer(notify)
+    server.start()
+
+    try:
+        result = asyncio.run(LoadGenerator('127.0.0.1', server.port, features, requests=7, concurrency=2).generate())
+    finally:
+        server.stop()
+
+    assert result.indices.tolist() == [0, 1, 2, 0, 1, 2, 0]
+    assert result.notifications == ['correct', 'incorrect', 'correct'] * 2 + ['correct']
+    assert not np.isnan(result.latencies).any()
+
+    # the offline inference disagrees on the second sample
+    summary = result.summary(offline=np.array([0, 0, 0], dtype=np.int8))
+
+    assert summary['requests'] == 7 and summary['errors'] == 0
+    assert summary['latency_p50'] <= summary['latency_p99'] <= summary['latency_max']
+    assert summary['agreement'] == 5 / 7
+
+
+def test_open_loop_errors():
+    features = np.zeros((4, 2))
+    server = NotificationServer(lambda x: 1 / 0)
+    server.start()
+
+    try:
+        result = asyncio.run(LoadGenerator('127.0.0.1', server.port, features, rate=200, concurrency=2).generate())
+    finally:
+        server.stop()
+
+    summary = result.summary()
+
+    assert summary['errors'] == 4 and summary['latency_p50'] is None and summary['agreement'] is None
+
+
+class InProcessTool(ToolPlugin):
+    class Meta:
+        label = 'in_process_tool'
+
+    def __init__(self, **kw):
+        super().__init__('in_process_tool', **kw)
+
+    def analyze_command(self, model, dataset, working_dir, **kwargs):
+        return working_dir / 'analysis', ''
+
+    def infer_command(self, model, dataset, working_dir, **kwargs):
+        return working_dir / 'output', ''
+
+    def get_notifications(self, output, **kwargs):
+        return None
+
+    def serve(self, model, dataset, working_dir, **kwargs):
+        return notify
+
+
+def test_serve_without_command(tmp_path):
+    features = np.array([[1.0, 2.0], [-3.0, 1.0]])
+    instance = Instance(dataset=SimpleNamespace(test=SimpleNamespace(features=features)), model=SimpleNamespace(),
+                        working_dir=tmp_path, phase='serve')
+    runner = ServingRunner(SimpleNamespace(log=logging.getLogger('test')), tmp_path, ServeOptions(ready_timeout=5))
+    tool = InProcessTool()
+
+    # served in-process without -ip, as the tool has no server command
+    assert tool.supports_serving() and not tool.has_serve_command()
+    served = asyncio.run(runner.serve(tool, instance, log_name='serve'))
+    assert served['result'].notifications == ['correct', 'incorrect']
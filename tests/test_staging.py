@@ -0,0 +1,58 @@
+import numpy as np
+
+from trustdnn.core.dataset.base import Dataset
+from trustdnn.core.staging import Stager
+
+
+def make_dataset(path, samples: int) -> Dataset:
+    for split in ['train', 'val', 'test']:
+        (path / split).mkdir(parents=True)
+        np.save(path / split / 'x.npy', np.zeros((samples, 4)))
+        np.save(path / split / 'y.npy', np.zeros(samples, dtype=np.int32))
+
+    return Dataset(path)
+
+
+def test_stage_datasets_lru(tmp_path):
+    first, second = make_dataset(tmp_path / 'bench' / 'A', 100), make_dataset(tmp_path / 'bench' / 'B', 100)
+    # room for a single dataset
+    stager = Stager(tmp_path / 'scratch', budget=12000)
+
+    staged = stager.stage_dataset(first)
+
+    assert staged.name == 'A' and staged.test.features_path.is_relative_to(tmp_path / 'scratch')
+    assert stager.stage_dataset(first) is staged
+
+    # in use by two instances, the second dataset is not staged
+    assert stager.stage_dataset(second) is second
+
+    stager.release_dataset(first, staged)
+    stager.release_dataset(first, staged)
+    staged_second = stager.stage_dataset(second)
+
+    assert staged_second is not second and not staged.path.exists()
+    # a new stager reuses the staged copies
+    assert list(Stager(tmp_path / 'scratch', budget=12000)._staged) == [Stager.get_key(second)]
+
+
+def test_stage_working_dir(tmp_path):
+    stager = Stager(tmp_path / 'scratch')
+    working_dir = tmp_path / 'workdir' / 'model'
+    working_dir.mkdir(parents=True)
+    (working_dir / 'analysis.csv').write_text('rules')
+
+    staged = stager.stage_working_dir(working_dir)
+    (staged / 'analysis.csv').write_text('new rules')
+    (staged / 'output').mkdir()
+    (staged / 'output' / 'notifications.csv').write_text('correct')
+
+    # files of the staged working directory are not replaced when staged again
+    assert stager.stage_working_dir(working_dir) == staged and (staged / 'analysis.csv').read_text() == 'new rules'
+
+    stager.copy_back(staged, working_dir)
+    stager.cleanup()
+
+    assert (working_dir / 'analysis.csv').read_text() == 'new rules'
+    assert (working_dir / 'output' / 'notifications.csv').read_text() == 'correct'
+    assert stager.map_path(staged / 'output', staged, working_dir) == working_dir / 'output'
+    assert not staged.exists()
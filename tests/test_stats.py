@@ -0,0 +1,20 @@
+import numpy as np
+
+from trustdnn.core.stats import mad_outliers, permutation_test
+
+
+def test_mad_outliers():
+    durations = np.array([10.1, 9.9, 10.0, 10.2, 9.8, 25.0])
+
+    assert mad_outliers(durations).tolist() == [False] * 5 + [True]
+    assert not mad_outliers(durations[:2]).any()
+    assert not mad_outliers(np.full(5, 3.0)).any()
+
+
+def test_permutation_test():
+    rng = np.random.default_rng(0)
+    baseline = rng.normal(10, 0.5, 8)
+
+    assert permutation_test(baseline, baseline + 5) < 0.01
+    assert permutation_test(baseline, rng.permutation(baseline)) == 1.0
+    assert np.isnan(permutation_test(baseline[:1], baseline))
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from trustdnn.core.sweep import pareto_front, summarize_sweep
+
+
+def test_pareto_front():
+    memory = pd.Series([100, 200, 200, 300, 400])
+    throughput = pd.Series([10, 30, 20, 25, 40])
+
+    assert pareto_front(memory, throughput).tolist() == [True, True, False, False, True]
+
+
+def test_summarize_sweep():
+    executions = pd.DataFrame({'tool': 'selfchecker', 'benchmark': 'trustbench', 'dataset': 'BM', 'model': 'm1',
+                               'batch_size': [32, 32, 128, 128, 256], 'threads': [1, 1, 1, 1, 2],
+                               'cores': [None, None, None, None, 2],
+                               'status': ['success', 'success', 'success', 'success', 'timeout'],
+                               'duration': [4.0, 6.0, 2.0, 2.0, 1.0], 'mem_peak': [100, 100, 300, 300, 500]})
+
+    summary = summarize_sweep(executions, {'BM': 1000})
+
+    assert summary[['batch_size', 'threads', 'runs']].values.tolist() == [[32, 1, 2], [128, 1, 2]]
+    assert summary['throughput'].tolist() == [200.0, 500.0]
+    assert summary['pareto'].tolist() == [True, True]
+
+
+def test_summarize_sweep_without_threads():
+    executions = pd.DataFrame({'tool': 'selfchecker', 'benchmark': 'trustbench', 'dataset': 'BM', 'model': 'm1',
+                               'batch_size': 32, 'cores': [1, 2], 'status': 'success', 'duration': [4.0, 2.0],
+                               'mem_peak': [100, 200]})
+
+    # the runs were pinned to as many cores as threads
+    assert summarize_sweep(executions, {'BM': 1000})['threads'].tolist() == [1, 2]
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+import pandas as pd
+
+from trustdnn.core.watch import ExecutionFollower, LineFollower
+
+
+def test_line_follower(tmp_path):
+    path = tmp_path / 'log'
+    follower = LineFollower(path)
+    assert follower.read() == []
+
+    path.write_text('a\nb')
+    # the line being written is read once it is complete
+    assert follower.read() == ['a']
+
+    with path.open('a') as f:
+        f.write('\nc\n')
+
+    assert follower.read() == ['b', 'c']
+    assert follower.read() == []
+
+
+def test_execution_follower_journal(tmp_path):
+    follower = ExecutionFollower(tmp_path)
+    entries = [{'model': 'm1', 'status': 'error', 'repetition': 0, 'retry_in': 5.0},
+               {'model': 'm1', 'status': 'success', 'repetition': 0, 'retry_in': None},
+               {'model': 'm2', 'status': 'success', 'repetition': None, 'retry_in': None},
+               {'model': 'm2', 'status': 'exceeded', 'repetition': 0, 'requeued': True}]
+    (tmp_path / 'journal.jsonl').write_text(''.join(json.dumps(entry) + '\n' for entry in entries))
+
+    # only the last attempts of the measured runs are executions
+    assert follower.read()[['model', 'status']].values.tolist() == [['m1', 'success']]
+    assert follower.read().empty
+
+
+def test_execution_follower_csv(tmp_path):
+    path = tmp_path / 'executions.csv'
+    follower = ExecutionFollower(tmp_path)
+    pd.DataFrame([{'model': 'm1', 'duration': 1.0}]).to_csv(path, index=False)
+    assert follower.read()['model'].tolist() == ['m1']
+
+    # rewritten with a new column, only the new row is read
+    pd.DataFrame([{'model': 'm1', 'duration': 1.0}, {'model': 'm2', 'duration': 2.0, 'cores': 4}]).to_csv(
+        path, index=False)
+    new = follower.read()
+    assert new['model'].tolist() == ['m2'] and new['cores'].tolist() == [4]
+
+
+def test_evaluate_new_outputs(evaluate):
+    def evaluate_outputs(jobs, cache, workers=None):
+        if any(job['output'] == 'removed' for job in jobs):
+            raise FileNotFoundError(jobs[0]['output'])
+
+        if any(job['output'] == 'broken' for job in jobs):
+            raise KeyError('notification')
+
+        return [{'output': job['output']} for job in jobs]
+
+    evaluate.evaluate_outputs = evaluate_outputs
+
+    # the outputs replaced or removed in the meantime are skipped
+    assert evaluate.evaluate_new_outputs([{'output': 'a'}, {'output': 'removed'}], cache=None) == \
+        [{'output': 'a'}, None]
+
+    # other errors are not mistaken for replaced outputs
+    with pytest.raises(KeyError):
+        evaluate.evaluate_new_outputs([{'output': 'a'}, {'output': 'broken'}], cache=None)
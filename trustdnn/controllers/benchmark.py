@@ -0,0 +1,90 @@
+import os
+import multiprocessing
+
+from cement import Controller, ex
+from concurrent.futures import ProcessPoolExecutor
+
+from trustdnn.handlers.benchmark import BenchmarkPlugin
+from trustdnn.core.exc import TrustDNNError
+
+
+class Benchmark(Controller):
+    class Meta:
+        label = 'benchmark'
+        stacked_on = 'base'
+        stacked_type = 'nested'
+
+        # text displayed at the top of --help output
+        description = 'Command for preparing the models and datasets of a benchmark.'
+
+        # text displayed at the bottom of --help output
+        epilog = 'Usage: trustdnn benchmark -b trustbench predict -j 4'
+
+        # controller level arguments. ex: 'trustdnn --version'
+        arguments = [
+            (['-b', '--benchmark'], {'help': 'Benchmark name', 'type': str, 'required': True}),
+            (['-m', '--models'], {'help': 'Target models (defaults to all)', 'nargs': "*", 'type': str,
+                                  'required': False})
+        ]
+
+    def _default(self):
+        """Default action if no sub-command is passed."""
+
+        self.app.args.print_help()
+
+    @ex(
+        help='Generates the predictions of the models on the test split of their dataset',
+        arguments=[
+            (['-bs', '--batch_size'], {'help': 'Number of samples per batch', 'type': int, 'default': 128}),
+            (['-j', '--jobs'], {'help': 'Number of models predicted in parallel', 'type': int, 'default': 1}),
+            (['-f', '--force'], {'help': 'Regenerates the predictions that are up to date', 'action': 'store_true'})
+        ]
+    )
+    def predict(self):
+        from trustdnn.core.predict import predict, is_up_to_date
+
+        benchmark = self.app.get_plugin_handler(name=self.app.pargs.benchmark, kind=BenchmarkPlugin)
+        models = benchmark.models
+
+        if self.app.pargs.models:
+            missing = set(self.app.pargs.models) - set(models)
+
+            if missing:
+                raise TrustDNNError(f"Models {', '.join(sorted(missing))} not found in benchmark {benchmark}")
+
+            models = {name: models[name] for name in self.app.pargs.models}
+
+        jobs = {}
+
+        for name, model in models.items():
+            dataset = benchmark.get_dataset(model.dataset)
+
+            if dataset is None:
+                self.app.log.warning(f"Dataset {model.dataset} of model {name} not found in benchmark {benchmark}")
+                continue
+
+            test = dataset.test
+
+            if not self.app.pargs.force and is_up_to_date(model.npy_predictions_path, model.path,
+                                                          test.features_path):
+                self.app.log.info(f"Predictions of {name} are up to date")
+                continue
+
+            jobs[name] = dict(model_path=model.path, features_path=test.features_path,
+                              output=model.npy_predictions_path, batch_size=self.app.pargs.batch_size,
+                              headers=test.headers)
+
+        if not jobs:
+            return
+
+        workers = min(self.app.pargs.jobs, len(jobs))
+        # the cores are split among the workers, so that parallel models do not oversubscribe the CPU
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # TensorFlow is not fork-safe, workers are spawned
+        context = multiprocessing.get_context('spawn')
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = {name: executor.submit(predict, threads=threads, **job) for name, job in jobs.items()}
+
+            for name, future in futures.items():
+                self.app.log.info(f"Predicted {future.result()} samples with {name} in {jobs[name]['output']}")
@@ -0,0 +1,140 @@
+import functools
+
+from pathlib import Path
+from typing import Dict, List, Tuple, TYPE_CHECKING
+from cement import Controller, ex
+
+from trustdnn.handlers.benchmark import BenchmarkPlugin
+from trustdnn.handlers.tool import ToolPlugin
+from trustdnn.core.objects import Instance
+from trustdnn.core.exc import TrustDNNError
+
+if TYPE_CHECKING:
+    from trustdnn.core.campaign import CampaignSpec
+
+# the instances of each tool, benchmark and model, by phase
+Workload = Dict[Tuple[str, str, str], Tuple[ToolPlugin, Dict[str, Instance]]]
+
+
+class Campaign(Controller):
+    class Meta:
+        label = 'campaign'
+        stacked_on = 'base'
+        stacked_type = 'nested'
+
+        # text displayed at the top of --help output
+        description = 'Command for executing several tools on several benchmarks as a single workload.'
+
+        # text displayed at the bottom of --help output
+        epilog = 'Usage: trustdnn campaign run spec.yml'
+
+    def _default(self):
+        """Default action if no sub-command is passed."""
+
+        self.app.args.print_help()
+
+    def get_models(self, benchmark: BenchmarkPlugin, datasets: List[str] = None, models: List[str] = None) -> list:
+        """
+            Models of the benchmark on the given datasets, or the given models
+        """
+        for name in datasets or []:
+            if benchmark.get_dataset(name) is None:
+                raise TrustDNNError(f"Dataset {name} not found in benchmark {benchmark}")
+
+        for name in models or []:
+            if benchmark.get_model(name) is None:
+                raise TrustDNNError(f"Model {name} not found in benchmark {benchmark}")
+
+        selected = [benchmark.get_model(name) for name in models] if models else list(benchmark.models.values())
+
+        return [model for model in selected if not datasets or model.dataset in datasets]
+
+    async def run_phases(self, runner, tool: ToolPlugin, benchmark: str, instances: List[Instance]):
+        """
+            Runs the phases of a tool on a model in order, the inference is skipped when the analysis fails
+        """
+        for i, instance in enumerate(instances):
+            execution = await runner.run_instance(tool, benchmark, instance)
+
+            # None when the output of the phase exists
+            if execution is not None and execution.status != 'success' and i < len(instances) - 1:
+                self.app.log.warning(f"Skipping the next phases of {tool} on {instance}, the {instance.phase} "
+                                     f"failed")
+                break
+
+    def get_workload(self, spec: 'CampaignSpec') -> Workload:
+        """
+            Instances of each tool, benchmark and model of the spec, by phase. The working directories follow the
+            layout of the execute command (<workdir>/<tool>/<id>/<model>), which has no benchmark: a model name found
+            in several benchmarks of a tool is rejected instead of mixing their outputs.
+        """
+        workload: Workload = {}
+        # benchmark of the instances in each working directory
+        benchmarks: Dict[Path, str] = {}
+
+        for entry in spec.matrix:
+            for benchmark_name in entry.benchmarks:
+                # plugins are initialized once, the tools share the datasets and models of the benchmark
+                benchmark = self.app.get_plugin_handler(name=benchmark_name, kind=BenchmarkPlugin)
+                models = self.get_models(benchmark, entry.datasets, entry.models)
+
+                for tool_name in entry.tools:
+                    tool = self.app.get_plugin_handler(name=tool_name, kind=ToolPlugin)
+
+                    for model in models:
+                        dataset = benchmark.get_dataset(model.dataset)
+
+                        if dataset is None:
+                            self.app.log.warning(f"Dataset {model.dataset} of model {model.name} not found in "
+                                                 f"benchmark {benchmark}")
+                            continue
+
+                        working_dir = spec.workdir / tool_name / spec.id / model.name
+                        shared = benchmarks.setdefault(working_dir, benchmark_name)
+
+                        if shared != benchmark_name:
+                            raise TrustDNNError(f"Model {model.name} of benchmarks {shared} and {benchmark_name} "
+                                                f"would share the working directory {working_dir} of {tool_name}, "
+                                                f"run them in campaigns with different ids")
+
+                        _, instances = workload.setdefault((tool_name, benchmark_name, model.name), (tool, {}))
+
+                        for phase in entry.phases:
+                            instances[phase] = Instance(dataset=dataset, model=model, working_dir=working_dir,
+                                                        phase=phase)
+
+        return workload
+
+    @ex(
+        help='Runs the executions of the tools on the benchmarks listed in a campaign spec',
+        arguments=[
+            (['spec'], {'help': 'Path to the campaign spec (YAML)', 'type': str})
+        ]
+    )
+    def run(self):
+        from trustdnn.core.campaign import CampaignSpec, PHASES
+        from trustdnn.handlers.runner import Runner, RunOptions
+
+        spec = CampaignSpec.load(Path(self.app.pargs.spec).expanduser())
+
+        try:
+            options = RunOptions(**spec.options)
+        except TypeError as e:
+            raise TrustDNNError(f"Invalid options in the campaign spec: {e}")
+
+        workload = self.get_workload(spec)
+
+        if not workload:
+            self.app.log.warning("The campaign spec has no instances")
+            return
+
+        for _, instances in workload.values():
+            for instance in instances.values():
+                instance.working_dir.mkdir(parents=True, exist_ok=True)
+
+        self.app.log.info(f"Running {sum(len(instances) for _, instances in workload.values())} instances of "
+                          f"{len(workload)} tool and model pairs")
+        runner = Runner(self.app, spec.workdir, options)
+        runner.run([functools.partial(self.run_phases, runner, tool, benchmark_name,
+                                      [instances[phase] for phase in PHASES if phase in instances])
+                    for (_, benchmark_name, _), (tool, instances) in workload.items()])
@@ -1,12 +1,47 @@
-import pandas as pd
+import os
+import multiprocessing
 
 from pathlib import Path
+from typing import List, Optional, TYPE_CHECKING
 from cement import Controller, ex
-from trustdnn.core.evaluation import Evaluation
+from concurrent.futures import ProcessPoolExecutor
+from trustdnn.core.constants import METRICS
 from trustdnn.handlers.benchmark import BenchmarkPlugin
 from trustdnn.handlers.tool import ToolPlugin
 from trustdnn.core.exc import TrustDNNError
-from trustdnn.core.plotter import Plotter
+
+# pandas, numpy and the plotting libraries are imported by the actions that use them, to keep the CLI startup fast
+if TYPE_CHECKING:
+    import pandas as pd
+    from trustdnn.core.cache import ResultCache
+    from trustdnn.core.evaluation import Evaluation
+
+# options of the evaluation of the outputs, shared by the effectiveness and watch actions
+EFFECTIVENESS_ARGUMENTS = [
+    (['-i', '--invert'], {'help': 'Sets the positive class the mis-classifications', 'action': 'store_true'}),
+    (['-j', '--jobs'], {'help': 'Number of worker processes (defaults to the number of CPUs)', 'type': int}),
+    (['-cs', '--chunk_size'], {'help': 'Streams the outputs, labels and predictions in chunks of this size',
+                               'type': int}),
+    (['-bt', '--bootstrap'], {'help': 'Number of bootstrap resamples for the confidence intervals (0 disables)',
+                              'type': int, 'default': 1000}),
+    (['-cl', '--confidence'], {'help': 'Confidence level of the intervals', 'type': float, 'default': 0.95})
+]
+
+# split processed by each phase: the analysis is measured against the validation split and the inference against the
+# test split
+PHASE_SPLITS = {'analyze': 'val', 'infer': 'test'}
+
+# controller inherited by the forked evaluation workers
+_evaluator = None
+
+
+def _init_worker(evaluator):
+    global _evaluator
+    _evaluator = evaluator
+
+
+def _evaluate_output(job: dict) -> dict:
+    return _evaluator.evaluate_output(**job)
 
 
 class Evaluate(Controller):
@@ -23,7 +58,9 @@ class Evaluate(Controller):
 
         # controller level arguments. ex: 'trustdnn --version'
         arguments = [
-            (['-wd', '--workdir'], {'help': 'Working directory', 'type': str, 'required': True})
+            (['-wd', '--workdir'], {'help': 'Working directory (required by all commands except compare)',
+                                    'type': str}),
+            (['--no-plots'], {'help': 'Skips drawing the figures', 'action': 'store_true', 'dest': 'no_plots'})
         ]
 
     def __init__(self, **kw):
@@ -68,31 +105,181 @@ class Evaluate(Controller):
 
         return tool.get_notifications(output_path)
 
-    def get_test_labels(self, dataset_name: str, benchmark_name: str):
+    def get_dataset(self, dataset_name: str, benchmark_name: str):
         benchmark = self.get_benchmark(benchmark_name)
         dataset = benchmark.get_dataset(dataset_name)
 
         if dataset is None:
             raise TrustDNNError(f"Dataset {dataset_name} not found in benchmark {benchmark_name}")
 
-        return dataset.test.labels
+        return dataset
 
-    def get_predictions(self, model_name: str, benchmark: str):
-        benchmark = self.get_benchmark(benchmark)
+    def get_model(self, model_name: str, benchmark_name: str):
+        benchmark = self.get_benchmark(benchmark_name)
         model = benchmark.get_model(model_name)
 
         if model is None:
-            raise TrustDNNError(f"Model {model_name} not found in benchmark {benchmark}")
+            raise TrustDNNError(f"Model {model_name} not found in benchmark {benchmark_name}")
+
+        return model
+
+    def get_test_labels(self, dataset_name: str, benchmark_name: str):
+        return self.get_dataset(dataset_name, benchmark_name).test.labels
+
+    def get_predictions(self, model_name: str, benchmark: str):
+        return self.get_model(model_name, benchmark).predictions
+
+    def get_feature_slices(self, dataset_name: str, benchmark_name: str, names: List[str], bins: int) -> dict:
+        """
+            Groups of the test samples by the given features, numeric features with more unique values than bins are
+            split in quantile bins. The groups are indexed as the test labels, the features being in the same order.
+        """
+        import pandas as pd
+
+        if not names:
+            return {}
+
+        features = self.get_dataset(dataset_name, benchmark_name).test.features
+        index = self.get_test_labels(dataset_name, benchmark_name).index
+
+        if not isinstance(features, pd.DataFrame):
+            features = pd.DataFrame(features.reshape(len(features), -1))
+            features.columns = features.columns.astype(str)
+
+        slices = {}
+
+        for name in names:
+            if name not in features.columns:
+                self.app.log.warning(f"Feature {name} not found in dataset {dataset_name}")
+                continue
+
+            values = features[name]
+
+            if pd.api.types.is_numeric_dtype(values) and values.nunique() > bins:
+                values = pd.qcut(values, q=bins, duplicates='drop')
+
+            size = min(len(values), len(index))
+            slices[name] = pd.Series(values.to_numpy()[:size], index=index[:size])
+
+        return slices
+
+    def get_evaluation(self, tool: str, output: str, dataset: str, benchmark: str, model: str, invert: bool = False,
+                       chunk_size: int = None) -> 'Evaluation':
+        from trustdnn.core.evaluation import Evaluation
+
+        if chunk_size:
+            chunks = zip(self.get_tool(tool).iter_notification_codes(output, chunk_size),
+                         self.get_dataset(dataset, benchmark).test.iter_labels(chunk_size),
+                         self.get_model(model, benchmark).iter_predictions(chunk_size))
+            evaluation = Evaluation.from_chunks(chunks, invert=invert)
+        else:
+            notifications = self.get_tool(tool).load_notifications(output)
+            labels = self.get_test_labels(dataset, benchmark)
+            predictions = self.get_predictions(model, benchmark)
+            evaluation = Evaluation(notifications=notifications, labels=labels, predictions=predictions,
+                                    invert=invert)
+
+        return evaluation
+
+    def evaluate_output(self, tool: str, output: str, dataset: str, benchmark: str, model: str,
+                        invert: bool = False, chunk_size: int = None, bootstrap: int = 0,
+                        confidence: float = 0.95) -> dict:
+        from trustdnn.core.bootstrap import bootstrap_ci
+
+        evaluation = self.get_evaluation(tool, output, dataset, benchmark, model, invert, chunk_size)
+        effectiveness = evaluation.performance()
+
+        if bootstrap:
+            effectiveness.update(bootstrap_ci(evaluation.counts, n_resamples=bootstrap, confidence=confidence))
+
+        effectiveness.update(evaluation.to_dict())
+
+        return effectiveness
+
+    def output_key(self, job: dict) -> str:
+        """
+            Memoization key of an output, changes when the files its notifications are read from, the labels or the
+            predictions change
+        """
+        from trustdnn.core.cache import ResultCache, fingerprint
+
+        dataset = self.get_dataset(job['dataset'], job['benchmark'])
+        model = self.get_model(job['model'], job['benchmark'])
+        sources = self.get_tool(job['tool']).get_notification_sources(job['output'])
+
+        return ResultCache.key(job['tool'], job['output'], [fingerprint(source) for source in sources],
+                               fingerprint(dataset.test.labels_path), fingerprint(model.predictions_path),
+                               job['invert'], job.get('bootstrap', 0), job.get('confidence', 0.95))
+
+    def get_cache(self, clear: bool = False) -> 'ResultCache':
+        """
+            Cache of the effectiveness of the outputs of the working directory
+        :param clear: ignores the results cached by previous runs, which are replaced once the outputs are evaluated
+        """
+        from trustdnn.core.cache import ResultCache
+
+        cache = ResultCache(self.working_dir / '.cache' / 'effectiveness.json')
+
+        if clear:
+            cache.entries.clear()
+
+        return cache
+
+    def evaluate_outputs(self, jobs: List[dict], cache: 'ResultCache', workers: int = None) -> List[dict]:
+        """
+            Evaluates the outputs that are not in the cache in a process pool
+        :param jobs: keyword arguments for evaluate_output
+        :param cache: cache with the results of previous evaluations
+        :param workers: number of worker processes
+        :return: results in the same order as the jobs
+        """
+        keys = [self.output_key(job) for job in jobs]
+        missing = {key: job for key, job in zip(keys, jobs) if key not in cache}
+
+        self.app.log.info(f"Evaluating {len(missing)} outputs ({len(set(keys)) - len(missing)} cached)")
+
+        if len(missing) > 1 and workers != 1:
+            # load labels and predictions once so that the forked workers share them
+            for job in missing.values():
+                if not job.get('chunk_size'):
+                    self.get_test_labels(job['dataset'], job['benchmark'])
+                    self.get_predictions(job['model'], job['benchmark'])
+
+            workers = min(workers or os.cpu_count(), len(missing))
+            context = multiprocessing.get_context('fork')
 
-        return model.predictions
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(self,)) as executor:
+                for key, result in zip(missing, executor.map(_evaluate_output, missing.values())):
+                    cache[key] = result
+        else:
+            for key, job in missing.items():
+                cache[key] = self.evaluate_output(**job)
+
+        if missing:
+            cache.save()
+
+        return [dict(cache.get(key)) for key in keys]
 
     def _parse_working_dir(self):
-        self._working_dir = Path(self.app.pargs.workdir).expanduser()
+        if getattr(self.app.pargs, '__dispatch__', None) == f"{self.Meta.label}.compare":
+            # compare takes its own working directories and writes to the output directory
+            self._working_dir = Path(self.app.pargs.output or self.app.pargs.workdirs[-1]).expanduser()
+            self._working_dir.mkdir(parents=True, exist_ok=True)
+        elif self.app.pargs.workdir:
+            self._working_dir = Path(self.app.pargs.workdir).expanduser()
+        elif hasattr(self.app.pargs, '__dispatch__'):
+            self.app.log.error("the following arguments are required: -wd/--workdir")
+            exit(1)
 
     def _post_argument_parsing(self):
         if self.app.pargs.__controller_namespace__ == self.Meta.label:
+            from trustdnn.core.plotter import Plotter
+
             self._parse_working_dir()
-            self._plotter = Plotter(figures_path=self.working_dir)
+            # figures are queued and drawn concurrently at the end of each command
+            self._plotter = Plotter(figures_path=self.working_dir, enabled=not self.app.pargs.no_plots,
+                                    deferred=True)
 
 
     @property
@@ -107,10 +294,16 @@ class Evaluate(Controller):
     @ex(
         help='Computes the efficiency of the executions under a working directory',
         arguments=[
-            (['-f', '--force'], {'help': 'Force re-computation of results', 'action': 'store_true'})
+            (['-f', '--force'], {'help': 'Force re-computation of results', 'action': 'store_true'}),
+            (['-bl', '--baseline'], {'help': 'Tool whose inference executions are the plain model inference',
+                                     'type': str}),
+            (['--mad'], {'help': 'Rejects repetitions whose duration is more than this number of MADs away from the '
+                                 'median of their group (0 disables)', 'type': float, 'default': 3.5})
         ]
     )
     def efficiency(self):
+        import pandas as pd
+
         efficiency_path = self.working_dir / "efficiency.csv"
 
         if efficiency_path.exists() and not self.app.pargs.force:
@@ -124,39 +317,116 @@ class Evaluate(Controller):
             exit(1)
 
         executions = pd.read_csv(executions_path, index_col=False)
+        df = self.get_efficiency(executions, self.app.pargs.mad, self.app.pargs.baseline)
+        df.to_csv(self.working_dir / "efficiency.csv", index=False)
+        self.plot_efficiency(df)
+        self.plotter.render()
+
+    def get_phase_samples(self, phase: str, dataset: str, benchmark: str) -> Optional[int]:
+        """
+            Number of samples the phase processes, None for phases without a split (e.g., serve) or when the size of
+            the split is not available
+        """
+        if phase not in PHASE_SPLITS:
+            return None
+
+        try:
+            return getattr(self.get_dataset(dataset, benchmark), PHASE_SPLITS[phase]).size
+        except (TrustDNNError, OSError, ValueError) as e:
+            self.app.log.warning(f"Could not get the size of the {PHASE_SPLITS[phase]} split of {dataset}: {e}")
+            return None
+
+    def get_efficiency(self, executions: 'pd.DataFrame', mad: float = None, baseline: str = None) -> 'pd.DataFrame':
+        """
+            Duration and memory of the successful executions per tool, phase and dataset
+        :param executions: executions of the working directory
+        :param mad: rejects the repetitions whose duration is more than this number of MADs away from the median of
+            their group
+        :param baseline: tool whose inference executions are the plain model inference
+        """
+        import pandas as pd
+        from trustdnn.core.stats import mad_outliers
+
         successful_executions = executions[executions['status'] == 'success']
 
+        if mad and 'group' in successful_executions.columns:
+            outliers = pd.Series(False, index=successful_executions.index)
+
+            # executions without group (single runs) are kept
+            for _, rows in successful_executions.groupby('group'):
+                outliers[rows.index] = mad_outliers(rows['duration'].to_numpy(), mad)
+
+            self.app.log.info(f"Rejected {outliers.sum()} outlier repetitions")
+            successful_executions = successful_executions[~outliers]
+
         results = []
 
         for tool_phase_dataset, rows in successful_executions.groupby(['tool', 'phase', 'dataset']):
             tool, phase, dataset = tool_phase_dataset
             average_duration = round(rows['duration'].mean(), 2)
             average_memory = round(rows['mem_peak'].mean() / (1024**2), 2)
+            p50, p95, p99 = rows['duration'].quantile([0.5, 0.95, 0.99]).round(2)
+            mean_duration = rows['duration'].mean()
+            samples = self.get_phase_samples(phase, dataset, rows['benchmark'].iloc[0])
+            # the throughput and latency are unknown without samples and for runs shorter than the resolution
+            throughput = round(samples / mean_duration, 2) if samples and mean_duration > 0 else float('nan')
+            latency = round(mean_duration / samples * 1000, 4) if samples else float('nan')
+
             results.append({
                 'tool': tool,
                 'phase': phase,
                 'dataset': dataset,
                 'duration': average_duration,
-                'memory': average_memory
+                'memory': average_memory,
+                'runs': len(rows),
+                'duration_std': round(rows['duration'].std(), 2),
+                'duration_p50': p50,
+                'duration_p95': p95,
+                'duration_p99': p99,
+                'samples': samples if samples is not None else float('nan'),
+                'samples_per_second': throughput,
+                'latency_ms': latency
             })
 
         df = pd.DataFrame(results)
-        df.to_csv(self.working_dir / "efficiency.csv", index=False)
+
+        if baseline:
+            baseline_df = df[(df['tool'] == baseline) & (df['phase'] == 'infer')]
+
+            if baseline_df.empty:
+                self.app.log.warning(f"No successful inference executions for baseline {baseline}")
+
+            baseline_duration = df['dataset'].map(baseline_df.set_index('dataset')['duration'])
+            is_infer = df['phase'] == 'infer'
+            # relative slowdown of the inference with the tool over the plain model inference
+            df['overhead'] = (df['duration'] / baseline_duration).where(is_infer).round(2)
+            df['overhead_seconds'] = (df['duration'] - baseline_duration).where(is_infer).round(2)
+
+        return df
+
+    def plot_efficiency(self, df: 'pd.DataFrame'):
         self.plotter.fig_size = (11, 9)
         self.plotter.stacked_bar_plot(df, x='dataset', y='duration', stack='phase', hue='tool', y_label='Duration (s)',
                                       tag='efficiency', x_label='Tool')
         self.plotter.stacked_bar_plot(df, x='dataset', y='memory', stack='phase', hue='tool', y_label='Memory (MiB)',
                                       tag='efficiency_memory', x_label='Tool')
 
+    def plot_effectiveness(self, df: 'pd.DataFrame'):
+        self.plotter.fig_size = (27, 7)
+        self.plotter.bar_plot(df, x='model', y='mcc', hue='tool', y_label='MCC', tag='effectiveness', x_label='Models',
+                              error_bars=True)
+
     @ex(
         help='Computes the effectiveness of the executions under a working directory',
         arguments=[
             (['-f', '--force'], {'help': 'Force re-computation of results', 'action': 'store_true'}),
-            (['-i', '--invert'], {'help': 'Sets the positive class the mis-classifications', 'action': 'store_true'}),
-            (['-rwd', '--replace_workdir'], {'help': 'Replace the working dir (old:new)', 'type': str})
-        ]
+            (['-rwd', '--replace_workdir'], {'help': 'Replace the working dir (old:new)', 'type': str}),
+            (['-nc', '--no_cache'], {'help': 'Ignore the results cached by previous runs', 'action': 'store_true'})
+        ] + EFFECTIVENESS_ARGUMENTS
     )
     def effectiveness(self):
+        import pandas as pd
+
         effectiveness_path = self.working_dir / "effectiveness.csv"
 
         if effectiveness_path.exists() and not self.app.pargs.force:
@@ -173,38 +443,48 @@ class Evaluate(Controller):
         infer_success_executions = executions[(executions['phase'] == 'infer') & (executions['status'] == 'success')]
         results = []
 
-        print(f"Parsing {len(infer_success_executions)} successful executions")
+        self.app.log.info(f"Parsing {len(infer_success_executions)} successful executions")
 
         if self.app.pargs.replace_workdir:
             old, new = self.app.pargs.replace_workdir.split(':')
             infer_success_executions['output'] = infer_success_executions['output'].str.replace(old, new)
             # executions.to_csv(executions_path, index=False)
 
+        runs = []
+        jobs = []
+
         for tool_model, rows in infer_success_executions.groupby(['tool', 'model']):
             tool_name, model = tool_model
-            tool = self.get_tool(tool_name)
 
             for i, row in rows.iterrows():
-                if not tool.has_metrics:
-                    notifications = self.get_notifications(tool_name, row['output'])
-                    labels = self.get_test_labels(row['dataset'], row['benchmark'])
-                    predictions = self.get_predictions(model, row['benchmark'])
-                    evaluation = Evaluation(notifications=notifications, labels=labels, predictions=predictions,
-                                            invert=self.app.pargs.invert)
-
-                    effectiveness = evaluation.performance()
-                    effectiveness.update(evaluation.to_dict())
-                else:
-                    effectiveness = tool.get_metrics(row['output'])
-                    effectiveness['correct'] = None
-                    effectiveness['incorrect'] = None
-                    effectiveness['uncertain'] = None
-
-                effectiveness['tool'] = tool_name
-                effectiveness['model'] = model
-                effectiveness['run'] = i
-
-                results.append(effectiveness)
+                jobs.append(self.get_effectiveness_job(row))
+                runs.append((tool_name, model, i))
+
+        cache = self.get_cache(clear=self.app.pargs.no_cache)
+        # the cached rows are merged with the ones of the new or changed outputs
+        evaluated = self.evaluate_outputs(jobs, cache, self.app.pargs.jobs)
+
+        for (tool_name, model, i), effectiveness in zip(runs, evaluated):
+            effectiveness['tool'] = tool_name
+            effectiveness['model'] = model
+            effectiveness['run'] = i
+
+            results.append(effectiveness)
+
+        self.save_effectiveness(results)
+        self.plotter.render()
+
+    def get_effectiveness_job(self, row: dict) -> dict:
+        """
+            Keyword arguments of evaluate_output for the output of an inference execution
+        """
+        return {'tool': row['tool'], 'output': row['output'], 'dataset': row['dataset'],
+                'benchmark': row['benchmark'], 'model': row['model'], 'invert': self.app.pargs.invert,
+                'chunk_size': self.app.pargs.chunk_size, 'bootstrap': self.app.pargs.bootstrap,
+                'confidence': self.app.pargs.confidence}
+
+    def save_effectiveness(self, results: List[dict]):
+        import pandas as pd
 
         df = pd.DataFrame(results)
 
@@ -213,6 +493,337 @@ class Evaluate(Controller):
         best.to_csv(self.working_dir / "best.csv", index=False)
 
         df.to_csv(self.working_dir / "effectiveness.csv", index=False)
-        self.plotter.fig_size = (27, 7)
-        self.plotter.bar_plot(df, x='model', y='mcc', hue='tool', y_label='MCC', tag='effectiveness', x_label='Models',
-                              error_bars=True)
+        self.plot_effectiveness(df)
+
+    @ex(
+        help='Draws the efficiency, memory and effectiveness figures from the results under a working directory'
+    )
+    def plot(self):
+        import pandas as pd
+
+        for name, plot in [("efficiency.csv", self.plot_efficiency), ("effectiveness.csv", self.plot_effectiveness)]:
+            path = self.working_dir / name
+
+            if path.exists():
+                plot(pd.read_csv(path, index_col=False))
+            else:
+                self.app.log.warning(f"Results file not found in {path}")
+
+        self.plotter.render()
+
+    @ex(
+        help='Follows the executions of a running campaign and evaluates the inference outputs as they complete',
+        arguments=[
+            (['-bl', '--baseline'], {'help': 'Tool whose inference executions are the plain model inference',
+                                     'type': str}),
+            (['--mad'], {'help': 'Rejects repetitions whose duration is more than this number of MADs away from the '
+                                 'median of their group (0 disables)', 'type': float, 'default': 3.5}),
+            (['--interval'], {'help': 'Seconds between checks for new executions', 'type': float, 'default': 1.0}),
+            (['--refresh'], {'help': 'Minimum seconds between refreshes of the tables and figures', 'type': float,
+                             'default': 30.0}),
+            (['--idle_timeout'], {'help': 'Stops after this number of seconds without new executions (runs until '
+                                          'interrupted by default)', 'type': float})
+        ] + EFFECTIVENESS_ARGUMENTS
+    )
+    def watch(self):
+        import time
+        import pandas as pd
+        from trustdnn.core.watch import ExecutionFollower
+
+        follower = ExecutionFollower(self.working_dir)
+        # shared with the effectiveness action, outputs evaluated while watching are not evaluated again
+        cache = self.get_cache()
+        executions = pd.DataFrame()
+        results = []
+        last_refresh, last_change, changed = 0.0, time.time(), False
+
+        self.app.log.info(f"Watching the executions in {self.working_dir}")
+
+        try:
+            while True:
+                new = follower.read()
+
+                if len(new):
+                    last_change, changed = time.time(), True
+                    # indexes continue the ones of the previous executions, as the rows of executions.csv
+                    new.index = range(len(executions), len(executions) + len(new))
+                    executions = pd.concat([executions, new])
+                    infer = new[(new['phase'] == 'infer') & (new['status'] == 'success')]
+                    jobs = [self.get_effectiveness_job(row) for _, row in infer.iterrows()]
+
+                    for i, effectiveness in zip(infer.index, self.evaluate_new_outputs(jobs, cache)):
+                        if effectiveness is not None:
+                            effectiveness.update({'tool': infer.at[i, 'tool'], 'model': infer.at[i, 'model'],
+                                                  'run': i})
+                            results.append(effectiveness)
+
+                if changed and time.time() - last_refresh >= self.app.pargs.refresh:
+                    self.refresh_results(executions, results)
+                    last_refresh, changed = time.time(), False
+
+                if self.app.pargs.idle_timeout and time.time() - last_change >= self.app.pargs.idle_timeout:
+                    break
+
+                time.sleep(self.app.pargs.interval)
+        except KeyboardInterrupt:
+            pass
+
+        if changed:
+            self.refresh_results(executions, results)
+
+    def evaluate_new_outputs(self, jobs: List[dict], cache: 'ResultCache') -> list:
+        """
+            Evaluates the outputs of the executions that just completed. The output of a repetition is replaced by the
+            next repetition, outputs that changed or disappeared in the meantime are skipped (None).
+        """
+        if not jobs:
+            return []
+
+        try:
+            return self.evaluate_outputs(jobs, cache, self.app.pargs.jobs)
+        except (FileNotFoundError, ValueError) as e:
+            # removed, or read while being replaced
+            if len(jobs) == 1:
+                self.app.log.warning(f"Could not evaluate {jobs[0]['output']}, it was replaced or removed: "
+                                     f"{type(e).__name__}: {e}")
+                return [None]
+
+        return [result for job in jobs for result in self.evaluate_new_outputs([job], cache)]
+
+    def refresh_results(self, executions: 'pd.DataFrame', results: List[dict]):
+        """
+            Saves and draws the efficiency and effectiveness of the executions followed so far
+        """
+        if (executions['status'] == 'success').any():
+            df = self.get_efficiency(executions, self.app.pargs.mad, self.app.pargs.baseline)
+            df.to_csv(self.working_dir / "efficiency.csv", index=False)
+            self.plot_efficiency(df)
+
+        if results:
+            self.save_effectiveness(results)
+
+        self.plotter.render()
+        self.app.log.info(f"Refreshed the results of {len(executions)} executions ({len(results)} evaluated)")
+
+    @ex(
+        help='Paired bootstrap test comparing the effectiveness of two tools on the same models',
+        arguments=[
+            (['-t', '--tools'], {'help': 'Baseline and candidate tools', 'nargs': 2, 'type': str, 'required': True}),
+            (['-mt', '--metric'], {'help': 'Metric to compare', 'choices': METRICS, 'default': 'mcc'}),
+            (['-i', '--invert'], {'help': 'Sets the positive class the mis-classifications', 'action': 'store_true'}),
+            (['-bt', '--bootstrap'], {'help': 'Number of bootstrap resamples', 'type': int, 'default': 10000}),
+            (['-cl', '--confidence'], {'help': 'Confidence level of the intervals', 'type': float, 'default': 0.95})
+        ]
+    )
+    def paired(self):
+        import pandas as pd
+        from trustdnn.core.bootstrap import paired_bootstrap
+
+        executions_path = self.working_dir / "executions.csv"
+
+        if not executions_path.exists():
+            self.app.log.error(f"Executions file not found in {executions_path}")
+            exit(1)
+
+        tool_a, tool_b = self.app.pargs.tools
+        executions = pd.read_csv(executions_path, index_col=False)
+        infer_success_executions = executions[(executions['phase'] == 'infer') & (executions['status'] == 'success')]
+        results = []
+
+        for model, rows in infer_success_executions.groupby('model'):
+            # latest successful output of each tool
+            outputs = rows.drop_duplicates('tool', keep='last').set_index('tool')
+
+            if tool_a not in outputs.index or tool_b not in outputs.index:
+                self.app.log.warning(f"Skipping model {model}: missing executions for {tool_a} or {tool_b}")
+                continue
+
+            outcomes = []
+
+            for tool_name in [tool_a, tool_b]:
+                row = outputs.loc[tool_name]
+                evaluation = self.get_evaluation(tool_name, row['output'], row['dataset'], row['benchmark'], model,
+                                                 invert=self.app.pargs.invert)
+                outcomes.append(evaluation.outcomes)
+
+            test = {'model': model, 'metric': self.app.pargs.metric, 'tool_a': tool_a, 'tool_b': tool_b}
+            test.update(paired_bootstrap(*outcomes, metric=self.app.pargs.metric,
+                                         n_resamples=self.app.pargs.bootstrap, confidence=self.app.pargs.confidence))
+            results.append(test)
+
+        df = pd.DataFrame(results)
+        df.to_csv(self.working_dir / f"paired_{tool_a}_{tool_b}.csv", index=False)
+        self.app.log.info(f"Paired bootstrap test of {tool_a} and {tool_b}:\n{df.to_string(index=False)}")
+
+    @ex(
+        help='Computes the ROC and PR curves of the executions of tools that emit confidence scores',
+        arguments=[
+            (['-i', '--invert'], {'help': 'Sets the positive class the mis-classifications', 'action': 'store_true'})
+        ]
+    )
+    def curves(self):
+        import pandas as pd
+        from trustdnn.core.curves import Curves
+        from trustdnn.core.evaluation import get_column
+
+        executions_path = self.working_dir / "executions.csv"
+
+        if not executions_path.exists():
+            self.app.log.error(f"Executions file not found in {executions_path}")
+            exit(1)
+
+        executions = pd.read_csv(executions_path, index_col=False)
+        infer_success_executions = executions[(executions['phase'] == 'infer') & (executions['status'] == 'success')]
+        curves = []
+        summaries = []
+
+        for i, row in infer_success_executions.iterrows():
+            scores = self.get_tool(row['tool']).load_scores(row['output'])
+
+            if scores is None:
+                continue
+
+            labels = self.get_test_labels(row['dataset'], row['benchmark'])
+            predictions = self.get_predictions(row['model'], row['benchmark'])
+            # scores are aligned with the labels and predictions by position
+            size = min(len(scores), len(labels), len(predictions))
+            evaluation = Curves(scores[:size], get_column(labels)[:size],
+                                get_column(predictions)[:size], invert=self.app.pargs.invert)
+
+            run = {'tool': row['tool'], 'model': row['model'], 'run': i}
+            curve = pd.DataFrame(evaluation.to_dict())
+            curves.append(curve.assign(**run))
+            summary = dict(run)
+            summary.update(evaluation.summary())
+            summaries.append(summary)
+
+        if not summaries:
+            self.app.log.warning(f"No executions of tools that emit scores in {self.working_dir}")
+            return
+
+        df = pd.concat(curves, ignore_index=True)
+        df.to_csv(self.working_dir / "curves.csv", index=False)
+        pd.DataFrame(summaries).to_csv(self.working_dir / "curves_summary.csv", index=False)
+
+        df['label'] = df['tool'] + ' ' + df['model'] + ' ' + df['run'].astype(str)
+        self.plotter.fig_size = (11, 9)
+        self.plotter.line_plot(df, x='fpr', y='tpr', hue='label', x_label='FPR', y_label='TPR', tag='roc')
+        self.plotter.line_plot(df, x='recall', y='precision', hue='label', tag='pr')
+        self.plotter.render()
+
+    @ex(
+        help='Computes the effectiveness per true class, predicted class and feature slice of the executions',
+        arguments=[
+            (['-i', '--invert'], {'help': 'Sets the positive class the mis-classifications', 'action': 'store_true'}),
+            (['-s', '--slices'], {'help': 'Features of the test split to slice by (column names or indexes)',
+                                  'nargs': '*', 'type': str, 'default': []}),
+            (['--bins'], {'help': 'Number of quantile bins for numeric features', 'type': int, 'default': 4})
+        ]
+    )
+    def breakdown(self):
+        import pandas as pd
+        from trustdnn.core.breakdown import Breakdown
+
+        executions_path = self.working_dir / "executions.csv"
+
+        if not executions_path.exists():
+            self.app.log.error(f"Executions file not found in {executions_path}")
+            exit(1)
+
+        executions = pd.read_csv(executions_path, index_col=False)
+        infer_success_executions = executions[(executions['phase'] == 'infer') & (executions['status'] == 'success')]
+        results = []
+        feature_slices = {}
+
+        for i, row in infer_success_executions.iterrows():
+            evaluation = self.get_evaluation(row['tool'], row['output'], row['dataset'], row['benchmark'],
+                                             row['model'], invert=self.app.pargs.invert)
+
+            if (row['benchmark'], row['dataset']) not in feature_slices:
+                feature_slices[(row['benchmark'], row['dataset'])] = self.get_feature_slices(
+                    row['dataset'], row['benchmark'], self.app.pargs.slices, self.app.pargs.bins)
+
+            slices = {'true_class': evaluation.true_labels, 'predicted_class': evaluation.pred_labels}
+            slices.update(feature_slices[(row['benchmark'], row['dataset'])])
+
+            df = Breakdown(evaluation.outcomes, slices, index=evaluation.index).to_frame()
+            results.append(df.assign(tool=row['tool'], model=row['model'], run=i))
+
+        if not results:
+            self.app.log.warning(f"No executions to break down in {self.working_dir}")
+            return
+
+        pd.concat(results, ignore_index=True).to_csv(self.working_dir / "effectiveness_breakdown.csv", index=False)
+
+    @ex(
+        help='Compares the efficiency and effectiveness results of two campaigns (baseline and candidate)',
+        arguments=[
+            (['-wd', '--workdir'], {'help': 'Working directories of the baseline and candidate campaigns',
+                                    'action': 'append', 'dest': 'workdirs', 'required': True}),
+            (['-o', '--output'], {'help': 'Output directory (defaults to the candidate working directory)',
+                                  'type': str}),
+            (['-mt', '--metrics'], {'help': 'Effectiveness metrics to compare', 'nargs': '+', 'choices': METRICS,
+                                    'default': ['mcc']}),
+            (['-a', '--alpha'], {'help': 'Significance level', 'type': float, 'default': 0.05}),
+            (['-bt', '--bootstrap'], {'help': 'Number of permutation/bootstrap resamples', 'type': int,
+                                      'default': 10000})
+        ]
+    )
+    def compare(self):
+        import pandas as pd
+        from trustdnn.core.comparison import Comparison
+
+        if len(self.app.pargs.workdirs) != 2:
+            raise TrustDNNError("compare takes exactly two working directories: -wd baseline -wd candidate")
+
+        workdirs = [Path(workdir).expanduser() for workdir in self.app.pargs.workdirs]
+        comparison = Comparison(alpha=self.app.pargs.alpha, n_resamples=self.app.pargs.bootstrap)
+        executions = []
+        effectiveness = []
+
+        for workdir in workdirs:
+            executions_path = workdir / "executions.csv"
+
+            if not executions_path.exists():
+                self.app.log.error(f"Executions file not found in {executions_path}")
+                exit(1)
+
+            df = pd.read_csv(executions_path, index_col=False)
+            executions.append(df[df['status'] == 'success'])
+
+            effectiveness_path = workdir / "effectiveness.csv"
+
+            if effectiveness_path.exists():
+                results = pd.read_csv(effectiveness_path, index_col=False)
+                # the run is the index of the execution
+                effectiveness.append(results.assign(dataset=results['run'].map(df['dataset'])))
+            else:
+                self.app.log.warning(f"Effectiveness file not found in {effectiveness_path}, "
+                                     f"run 'evaluate effectiveness' first to compare the metrics")
+
+        comparison.efficiency(*executions)
+
+        if len(effectiveness) == 2:
+            comparison.effectiveness(*effectiveness, metrics=self.app.pargs.metrics)
+
+        df = comparison.to_frame()
+
+        if df.empty:
+            self.app.log.warning("No common tool, dataset and model between the campaigns")
+            return
+
+        df.to_csv(self.working_dir / "regression_report.csv", index=False)
+        significant = df[df['significant']]
+        self.app.log.info(f"{len(significant)} significant changes, {int(df['regression'].sum())} regressions "
+                          f"(report saved in {self.working_dir / 'regression_report.csv'})")
+
+        if significant.empty:
+            return
+
+        self.app.log.info(f"Significant changes:\n{significant.to_string(index=False)}")
+        significant = significant.assign(label=significant['tool'] + ' ' + significant['phase'] + ' ' +
+                                         significant['model'].astype(str))
+        self.plotter.fig_size = (16, max(4, len(significant) // 2))
+        self.plotter.bar_plot(significant, x='change', y='label', hue='kind', x_label='Change (%)', y_label='',
+                              tag='regressions', orient='h')
+        self.plotter.render()
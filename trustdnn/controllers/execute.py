@@ -1,4 +1,4 @@
-import pandas as pd
+import functools
 
 from typing import Dict
 from pathlib import Path
@@ -6,9 +6,10 @@ from cement import Controller, ex
 
 from trustdnn.handlers.benchmark import BenchmarkPlugin
 from trustdnn.handlers.tool import ToolPlugin
-from trustdnn.core.objects import Execution, Instance
+from trustdnn.core.objects import Instance
 from trustdnn.core.dataset import Dataset
 from trustdnn.core.model import Model
+from trustdnn.core.constants import DEFAULT_SCRATCH
 
 
 class Execute(Controller):
@@ -30,7 +31,28 @@ class Execute(Controller):
             (['-t', '--tool'], {'help': 'Tool name', 'type': str, 'required': True}),
             (['-id'], {'help': 'Identifier for execution.',  'type': str, 'required': True}),
             (['-d', '--datasets'], {'help': 'Dataset name', 'nargs': "*", 'type': str, 'required': False}),
-            (['-m', '--models'], {'help': 'Target model', 'nargs': "*", 'type': str, 'required': False})
+            (['-m', '--models'], {'help': 'Target model', 'nargs': "*", 'type': str, 'required': False}),
+            (['--repeat'], {'help': 'Number of measured runs per instance', 'type': int, 'default': 1}),
+            (['--warmup'], {'help': 'Number of discarded warm-up runs per instance', 'type': int, 'default': 0}),
+            (['-ip', '--in_process'], {'help': 'Runs the tool in the same process, for tools that support it',
+                                       'action': 'store_true'}),
+            (['-p', '--parallel'], {'help': 'Number of instances executed at the same time', 'type': int,
+                                    'default': 1}),
+            (['--timeout'], {'help': 'Seconds after which an execution is killed', 'type': float}),
+            (['-mb', '--memory_budget'], {'help': 'Memory in GiB shared by the parallel executions', 'type': float}),
+            (['--no_pinning'], {'help': 'Runs the executions on all cores, without limiting their threads',
+                                'action': 'store_true'}),
+            (['--retries'], {'help': 'Number of retries of the executions with transient failures', 'type': int,
+                             'default': 0}),
+            (['--backoff'], {'help': 'Seconds before the first retry, doubled on each retry', 'type': float,
+                             'default': 5.0}),
+            (['--retry_alone'], {'help': 'Runs the retries when no other execution runs', 'action': 'store_true'}),
+            (['--shrink_batch'], {'help': 'Halves the batch size of the tool on the retries of executions that ran '
+                                          'out of memory', 'action': 'store_true'}),
+            (['--stage'], {'help': f"Stages the datasets and working directories on a local directory "
+                                   f"(default {DEFAULT_SCRATCH})", 'nargs': '?', 'const': DEFAULT_SCRATCH,
+                           'type': str}),
+            (['--stage_budget'], {'help': 'GiB of staged datasets kept in the staging directory', 'type': float})
         ]
 
     def __init__(self, **kw):
@@ -122,57 +144,149 @@ class Execute(Controller):
     def benchmark(self):
         return self._benchmark
 
-    def save_execution(self, instance: Instance, execution: Execution):
-        if execution.status == 'exists':
-            return
-
-        path = self.working_dir / "executions.csv"
-
-        execution = execution.to_dict()
-        execution['tool'] = self.app.pargs.tool
-        execution['benchmark'] = self.app.pargs.benchmark
-        execution['dataset'] = instance.dataset.name
-        execution['model'] = instance.model.name
-        execution['phase'] = instance.phase
-        execution['output'] = str(execution['output'])
-
-        if path.exists():
-            executions = pd.read_csv(path, index_col=False)
-            executions = executions.append(execution, ignore_index=True)
-        else:
-            executions = pd.DataFrame([execution])
-
-        executions.to_csv(path, index=False)
-
     def _default(self):
         """Default action if no sub-command is passed."""
 
         self.app.args.print_help()
 
+    def run_instances(self):
+        """
+            Runs the instances with the warm-up and repetition protocol, up to --parallel instances at the same time
+        """
+        from trustdnn.handlers.runner import Runner, RunOptions
+
+        runner = Runner(self.app, self.working_dir, RunOptions.from_args(self.app.pargs))
+        runner.run_instances(self._tool, self.app.pargs.benchmark, self.instances)
+
     @ex(
         help='Offline analysis of a tool on a dataset from a given benchmark'
     )
     def analyze(self):
-        instance_handler = self.app.handler.get('handlers', 'instance', setup=True)
-
-        for instance in self.instances:
-            self.app.log.info(f"Running inference on {instance}")
-            execution = instance_handler(instance=instance, command_call=self._tool.run_command,
-                                         tool_path=self._tool.path, sub_command_call=self._tool.analyze_command)
-            if execution:
-                self.save_execution(instance, execution)
+        self.run_instances()
 
     @ex(
         help='Runs a tool on a dataset from a given benchmark'
     )
     def infer(self):
-        instance_handler = self.app.handler.get('handlers', 'instance', setup=True)
+        self.run_instances()
+
+    def get_sweep_instance(self, instance: Instance, sweep_dir: Path) -> Instance:
+        """
+            The inference of the instance in the sweep directory, so that the runs of the sweep leave the outputs of
+            the instance as they are. The files of the instance, such as the outputs of the analysis, are copied
+            when they changed since the last sweep.
+        """
+        from trustdnn.core.staging import sync
+
+        working_dir = sweep_dir / self._tool.name / instance.model.name
+        working_dir.mkdir(parents=True, exist_ok=True)
+        sync(instance.working_dir, working_dir)
+
+        return Instance(dataset=instance.dataset, model=instance.model, working_dir=working_dir, phase='infer')
+
+    async def sweep_instance(self, runner, instance: Instance, batch_sizes: list, threads: list):
+        """
+            Runs the inference of the instance with each configuration, one after the other on the same output
+        """
+        from trustdnn.handlers.instance import get_available_cores
+
+        cores = get_available_cores()
+
+        for batch_size in batch_sizes:
+            # the default batch size of the tool is saved with its runs as well
+            batch_size = batch_size or getattr(self._tool, 'batch_size', None)
+            kwargs = {'batch_size': batch_size} if batch_size else {}
+
+            for count in threads:
+                self.app.log.info(f"Sweeping {self._tool} on {instance.model.name} with batch size "
+                                  f"{batch_size or 'default'} and {count or 'all'} threads")
+                # the runs without a thread count use all the cores, and are saved with their number
+                await runner.run_instance(self._tool, self.app.pargs.benchmark, instance,
+                                          cores=cores[:count] if count else None,
+                                          columns={'threads': count or len(cores)}, **kwargs)
 
-        for instance in self.instances:
-            self.app.log.info(f"Running inference on {instance}")
+    @ex(
+        help='Runs the inference of a tool with a range of batch sizes and threads and draws the throughput-memory '
+             'Pareto front',
+        arguments=[
+            (['-bs', '--batch_sizes'], {'help': 'Batch sizes of the inference', 'nargs': '+', 'type': int}),
+            (['-th', '--threads'], {'help': 'Number of threads (and cores) of the inference', 'nargs': '+',
+                                    'type': int}),
+            (['--no-plots'], {'help': 'Skips drawing the figure', 'action': 'store_true', 'dest': 'no_plots'})
+        ]
+    )
+    def sweep(self):
+        import dataclasses
+        import pandas as pd
+
+        from trustdnn.handlers.runner import Runner, RunOptions
+        from trustdnn.handlers.instance import get_available_cores
+        from trustdnn.core.sweep import summarize_sweep
+        from trustdnn.core.plotter import Plotter
+
+        batch_sizes = self.app.pargs.batch_sizes or [None]
+        threads = self.app.pargs.threads or [None]
+        available = len(get_available_cores())
+
+        if self.app.pargs.batch_sizes and getattr(self._tool, 'batch_size', None) is None:
+            self.app.log.warning(f"{self._tool} has no batch size, sweeping only the threads")
+            batch_sizes = [None]
+
+        if any(count > available for count in threads if count):
+            self.app.log.warning(f"Skipping the thread counts above the {available} available cores")
+            threads = [count for count in threads if not count or count <= available] or [None]
+
+        options = RunOptions.from_args(self.app.pargs)
+
+        if options.in_process:
+            self.app.log.warning("The sweep runs the commands of the tool, ignoring --in_process")
+
+        # one run at a time, so that the configurations are measured alone, each replacing the output of the last
+        options = dataclasses.replace(options, parallel=1, in_process=False)
+        sweep_dir = self.working_dir / 'sweep'
+        sweep_dir.mkdir(exist_ok=True)
+        runner = Runner(self.app, sweep_dir, options)
+        runner.force = True
+        instances = [self.get_sweep_instance(instance, sweep_dir) for instance in self.instances]
+        runner.run([functools.partial(self.sweep_instance, runner, instance, batch_sizes, threads)
+                    for instance in instances])
+
+        executions_path = sweep_dir / 'executions.csv'
+
+        if not executions_path.exists():
+            self.app.log.warning("The sweep has no executions")
+            return
+
+        executions = pd.read_csv(executions_path, index_col=False)
+        executions = executions[executions['tool'] == self._tool.name]
+        summary = summarize_sweep(executions, {dataset.name: dataset.test.size for dataset in
+                                               self._parse_datasets().values()})
+        summary.to_csv(sweep_dir / f"{self._tool.name}.csv", index=False)
+        self.app.log.info(f"Sweep results saved to {sweep_dir / f'{self._tool.name}.csv'}")
 
-            execution = instance_handler(instance=instance, command_call=self._tool.run_command,
-                                         tool_path=self._tool.path, sub_command_call=self._tool.infer_command)
+        for _, row in summary[summary['pareto']].iterrows():
+            self.app.log.info(f"Pareto front of {self._tool} on {row['model']}: batch size {row['batch_size']}, "
+                              f"{row['threads']} threads, {row['throughput']:.1f} samples/s, "
+                              f"{row['mem_peak'] / 1024 ** 2:.1f} MiB")
+
+        plotter = Plotter(figures_path=sweep_dir, enabled=not self.app.pargs.no_plots)
+        plotter.pareto_plot(summary, tag=self._tool.name)
+
+    @ex(
+        help='Serves a tool on a dataset from a given benchmark and measures its latency under load',
+        arguments=[
+            (['-c', '--concurrency'], {'help': 'Number of concurrent clients, or of connections with --rate',
+                                       'type': int, 'default': 1}),
+            (['-r', '--rate'], {'help': 'Arrival rate in requests per second (open loop)', 'type': float}),
+            (['-n', '--requests'], {'help': 'Number of requests, one per test sample by default', 'type': int}),
+            (['--port'], {'help': 'Port of the endpoint, a free port by default', 'type': int}),
+            (['--ready_timeout'], {'help': 'Seconds to wait for the endpoint to be ready', 'type': float,
+                                   'default': 120.0}),
+            (['--request_timeout'], {'help': 'Seconds after which a request fails', 'type': float, 'default': 30.0})
+        ]
+    )
+    def serve(self):
+        from trustdnn.handlers.serving import ServingRunner, ServeOptions
 
-            if execution:
-                self.save_execution(instance, execution)
+        runner = ServingRunner(self.app, self.working_dir, ServeOptions.from_args(self.app.pargs))
+        runner.run_instances(self._tool, self.app.pargs.benchmark, self.instances)
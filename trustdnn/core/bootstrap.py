@@ -0,0 +1,138 @@
+import numpy as np
+
+from typing import Dict
+
+from trustdnn.core.constants import OUTCOMES, METRICS
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+
+    return np.divide(numerator, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape),
+                     where=denominator > 0)
+
+
+def compute_metrics(counts: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+        Vectorized version of the Evaluation metrics (fractions, not percentages)
+    :param counts: array with the tp, fp, tn and fn counts in the last axis
+    :return: dictionary with the metrics over the leading axes
+    """
+    counts = np.asarray(counts, dtype=float)
+    tp, fp, tn, fn = (counts[..., i] for i in range(len(OUTCOMES)))
+
+    precision = _safe_divide(tp, tp + fp)
+    recall = _safe_divide(tp, tp + fn)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+    mcc = _safe_divide(tp * tn - fp * fn, np.sqrt((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn)))
+
+    return {'mcc': mcc, 'f1': f1, 'precision': precision, 'recall': recall}
+
+
+def resample_counts(counts: np.ndarray, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """
+        Resamples the outcome vector with replacement. The counts of a resample of n outcomes follow a multinomial
+        distribution with the observed frequencies, so all resamples are drawn in a single batched operation instead
+        of materializing n_resamples x n indices.
+    :param counts: counts of each category of the outcome vector
+    :param n_resamples: number of resamples
+    :param rng: random generator
+    :return: array (n_resamples, len(counts)) with the counts of each resample
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    total = counts.sum()
+
+    if total == 0:
+        return np.zeros((n_resamples, len(counts)), dtype=np.int64)
+
+    return rng.multinomial(total, counts / total, size=n_resamples)
+
+
+def bootstrap_ci(counts: np.ndarray, n_resamples: int = 1000, confidence: float = 0.95,
+                 seed: int = 0) -> Dict[str, float]:
+    """
+        Percentile bootstrap confidence intervals of the metrics
+    :param counts: tp, fp, tn and fn counts
+    :param n_resamples: number of resamples
+    :param confidence: confidence level
+    :param seed: seed for the random generator
+    :return: dictionary with the lower and upper bound of each metric, in the same scale of Evaluation.performance
+    """
+    resamples = resample_counts(counts, n_resamples, np.random.default_rng(seed))
+    metrics = compute_metrics(resamples)
+    alpha = (1 - confidence) / 2
+    intervals = {}
+
+    for metric in METRICS:
+        low, high = np.quantile(metrics[metric], [alpha, 1 - alpha]).tolist()
+
+        if metric == 'mcc':
+            intervals[f"{metric}_low"], intervals[f"{metric}_high"] = round(low, 3), round(high, 3)
+        else:
+            intervals[f"{metric}_low"], intervals[f"{metric}_high"] = round(low * 100, 2), round(high * 100, 2)
+
+    return intervals
+
+
+def paired_bootstrap(outcomes_a: np.ndarray, outcomes_b: np.ndarray, metric: str = 'mcc', n_resamples: int = 10000,
+                     confidence: float = 0.95, seed: int = 0) -> Dict[str, float]:
+    """
+        Paired bootstrap test for the difference (b - a) of a metric between two tools evaluated on the same samples.
+        Samples are resampled jointly through the counts of the (outcome_a, outcome_b) pairs.
+    :param outcomes_a: outcome codes of the first tool
+    :param outcomes_b: outcome codes of the second tool
+    :param metric: metric to compare
+    :param n_resamples: number of resamples
+    :param confidence: confidence level
+    :param seed: seed for the random generator
+    :return: dictionary with the observed difference, its confidence interval and the two-sided p-value
+    """
+    if len(outcomes_a) != len(outcomes_b):
+        raise ValueError(f"Outcomes have different lengths ({len(outcomes_a)} != {len(outcomes_b)})")
+
+    n_outcomes = len(OUTCOMES)
+    pairs = np.bincount(outcomes_a.astype(np.int64) * n_outcomes + outcomes_b, minlength=n_outcomes ** 2)
+    resamples = resample_counts(pairs, n_resamples, np.random.default_rng(seed)).reshape(-1, n_outcomes, n_outcomes)
+
+    pairs = pairs.reshape(n_outcomes, n_outcomes)
+    value_a = compute_metrics(pairs.sum(axis=1))[metric]
+    value_b = compute_metrics(pairs.sum(axis=0))[metric]
+    # summing over the outcomes of a (axis 1) leaves the counts of b and vice versa
+    differences = compute_metrics(resamples.sum(axis=1))[metric] - compute_metrics(resamples.sum(axis=2))[metric]
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(differences, [alpha, 1 - alpha])
+    p_value = min(1.0, 2 * min(np.mean(differences <= 0), np.mean(differences >= 0)))
+
+    return {
+        'value_a': float(value_a),
+        'value_b': float(value_b),
+        'difference': float(value_b - value_a),
+        'low': float(low),
+        'high': float(high),
+        'p_value': float(p_value)
+    }
+
+
+def bootstrap_difference(counts_a: np.ndarray, counts_b: np.ndarray, metric: str = 'mcc', n_resamples: int = 10000,
+                         seed: int = 0) -> Dict[str, float]:
+    """
+        Unpaired bootstrap test for the difference (b - a) of a metric when only the counts of each evaluation are
+        available
+    :param counts_a: tp, fp, tn and fn counts of the first evaluation
+    :param counts_b: tp, fp, tn and fn counts of the second evaluation
+    :param metric: metric to compare
+    :param n_resamples: number of resamples
+    :param seed: seed for the random generator
+    :return: dictionary with the observed difference and the two-sided p-value
+    """
+    rng = np.random.default_rng(seed)
+    resamples_a = compute_metrics(resample_counts(counts_a, n_resamples, rng))[metric]
+    resamples_b = compute_metrics(resample_counts(counts_b, n_resamples, rng))[metric]
+    differences = resamples_b - resamples_a
+    p_value = min(1.0, 2 * min(np.mean(differences <= 0), np.mean(differences >= 0)))
+
+    return {
+        'difference': float(compute_metrics(counts_b)[metric] - compute_metrics(counts_a)[metric]),
+        'p_value': float(p_value)
+    }
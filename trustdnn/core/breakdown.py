@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from typing import Dict, Union
+
+from trustdnn.core.evaluation import OUTCOMES
+from trustdnn.core.bootstrap import compute_metrics
+
+
+class Breakdown:
+    def __init__(self, outcomes: np.ndarray, slices: Dict[str, Union[np.ndarray, pd.Series]],
+                 index: pd.Index = None):
+        """
+            Outcome counts per group of each slice, computed with a single bincount over the combined group codes
+        :param outcomes: outcome codes of the samples (see Evaluation.outcomes)
+        :param slices: name of the slice mapped to the group of each sample, arrays are aligned with the outcomes by
+            position and series on the index of the outcomes
+        :param index: index of the samples of the outcomes (see Evaluation.index), required by the series
+        """
+        n_outcomes = len(OUTCOMES)
+        self.slices = []
+        self.groups = []
+        codes = []
+        offset = 0
+
+        for name, values in slices.items():
+            if isinstance(values, pd.Series):
+                # samples missing from the slice have no group
+                values = values.reindex(index).to_numpy()
+
+            group_codes, uniques = pd.factorize(pd.Series(values[:len(outcomes)]), sort=True)
+            valid = group_codes >= 0
+            codes.append((offset + group_codes[valid]) * n_outcomes + outcomes[:len(group_codes)][valid])
+            self.slices.extend([name] * len(uniques))
+            self.groups.extend(uniques)
+            offset += len(uniques)
+
+        combined = np.concatenate(codes) if codes else np.array([], dtype=np.int64)
+        self.counts = np.bincount(combined, minlength=offset * n_outcomes).reshape(offset, n_outcomes)
+
+    def to_frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.counts, columns=['tps', 'fps', 'tns', 'fns'])
+        df.insert(0, 'group', self.groups)
+        df.insert(0, 'slice', self.slices)
+        df['total'] = self.counts.sum(axis=1)
+
+        metrics = compute_metrics(self.counts)
+        df['mcc'] = np.round(metrics['mcc'], 3)
+
+        for metric in ['f1', 'precision', 'recall']:
+            df[metric] = np.round(metrics[metric] * 100.0, 2)
+
+        return df
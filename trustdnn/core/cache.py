@@ -0,0 +1,76 @@
+import json
+import hashlib
+
+import numpy as np
+
+from pathlib import Path
+from typing import Any, Union
+
+
+def fingerprint(path: Union[Path, str, None]) -> str:
+    """
+        Cheap fingerprint of a file based on its path, modification time and size
+    :param path: path to the file
+    :return: fingerprint of the file
+    """
+    if path is None:
+        return 'none'
+
+    path = Path(path)
+
+    if not path.exists():
+        return f"{path}:missing"
+
+    stat = path.stat()
+
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def to_builtin(value: Any):
+    if isinstance(value, np.generic):
+        return value.item()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ResultCache:
+    def __init__(self, path: Path):
+        """
+            JSON file that memoizes results by key
+        :param path: path to the cache file
+        """
+        self.path = path
+        self._entries = None
+
+    @staticmethod
+    def key(*parts) -> str:
+        return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+
+    @property
+    def entries(self) -> dict:
+        if self._entries is None:
+            self._entries = {}
+
+            if self.path.exists():
+                with self.path.open() as f:
+                    self._entries = json.load(f)
+
+        return self._entries
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.entries.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __setitem__(self, key: str, value: Any):
+        self.entries[key] = value
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+
+        with tmp_path.open('w') as f:
+            json.dump(self.entries, f, default=to_builtin)
+
+        tmp_path.replace(self.path)
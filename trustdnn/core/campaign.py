@@ -0,0 +1,94 @@
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+from trustdnn.core.exc import TrustDNNError
+
+# order in which the phases of an instance run, the inference uses the output of the analysis
+PHASES = ['analyze', 'infer']
+
+
+def _as_list(value: Union[str, List[str], None], key: str) -> Optional[List[str]]:
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        return [value]
+
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise TrustDNNError(f"'{key}' must be a name or a list of names")
+
+    return value
+
+
+@dataclass
+class CampaignEntry:
+    """
+        Tools x benchmarks x datasets x models x phases, all datasets and models of the benchmarks by default
+    """
+    tools: List[str]
+    benchmarks: List[str]
+    datasets: Optional[List[str]] = None
+    models: Optional[List[str]] = None
+    phases: List[str] = field(default_factory=lambda: list(PHASES))
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> 'CampaignEntry':
+        unknown = set(entry) - {'tools', 'benchmarks', 'datasets', 'models', 'phases'}
+
+        if unknown:
+            raise TrustDNNError(f"Unknown keys in the campaign matrix: {', '.join(sorted(unknown))}")
+
+        for key in ['tools', 'benchmarks']:
+            if not entry.get(key):
+                raise TrustDNNError(f"Entries of the campaign matrix require '{key}'")
+
+        phases = _as_list(entry.get('phases'), 'phases') or list(PHASES)
+        invalid = set(phases) - set(PHASES)
+
+        if invalid:
+            raise TrustDNNError(f"Invalid phases {', '.join(sorted(invalid))}, choose from {', '.join(PHASES)}")
+
+        return cls(tools=_as_list(entry['tools'], 'tools'), benchmarks=_as_list(entry['benchmarks'], 'benchmarks'),
+                   datasets=_as_list(entry.get('datasets'), 'datasets'),
+                   models=_as_list(entry.get('models'), 'models'),
+                   phases=sorted(phases, key=PHASES.index))
+
+
+@dataclass
+class CampaignSpec:
+    workdir: Path
+    id: str
+    matrix: List[CampaignEntry]
+    # options of the execute command
+    options: dict = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> 'CampaignSpec':
+        """
+            Parses and validates a YAML campaign spec
+        """
+        import yaml
+
+        if not path.exists():
+            raise TrustDNNError(f"Campaign spec {path} not found")
+
+        with path.open() as f:
+            spec = yaml.safe_load(f)
+
+        if not isinstance(spec, dict):
+            raise TrustDNNError(f"Campaign spec {path} must be a mapping")
+
+        for key in ['workdir', 'id', 'matrix']:
+            if not spec.get(key):
+                raise TrustDNNError(f"Campaign spec {path} requires '{key}'")
+
+        if not isinstance(spec['matrix'], list) or not all(isinstance(entry, dict) for entry in spec['matrix']):
+            raise TrustDNNError("'matrix' must be a list of entries")
+
+        if not isinstance(spec.get('options', {}), dict):
+            raise TrustDNNError("'options' must be a mapping")
+
+        return cls(workdir=Path(spec['workdir']).expanduser(), id=str(spec['id']),
+                   matrix=[CampaignEntry.from_dict(entry) for entry in spec['matrix']],
+                   options=spec.get('options') or {})
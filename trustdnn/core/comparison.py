@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from typing import List
+
+from trustdnn.core.stats import permutation_test
+from trustdnn.core.bootstrap import bootstrap_difference
+
+# quantity of the efficiency comparison mapped to its column in the executions and its scale
+EFFICIENCY = {'duration': ('duration', 1), 'memory': ('mem_peak', 1024 ** 2)}
+COUNTS = ['tps', 'fps', 'tns', 'fns']
+
+
+def _change(baseline: float, candidate: float) -> float:
+    return round((candidate - baseline) / abs(baseline) * 100, 2) if baseline else np.nan
+
+
+class Comparison:
+    def __init__(self, alpha: float = 0.05, n_resamples: int = 10000, seed: int = 0):
+        """
+            Compares the results of a baseline and a candidate campaign
+        :param alpha: significance level of the tests
+        :param n_resamples: number of resamples of the permutation and bootstrap tests
+        :param seed: seed for the random generators
+        """
+        self.alpha = alpha
+        self.n_resamples = n_resamples
+        self.seed = seed
+        self.rows = []
+
+    def _add(self, kind: str, tool: str, phase: str, dataset: str, model: str, baseline: float, candidate: float,
+             p_value: float, test: str, lower_is_better: bool):
+        significant = bool(not np.isnan(p_value) and p_value < self.alpha)
+        worse = candidate > baseline if lower_is_better else candidate < baseline
+
+        self.rows.append({
+            'kind': kind, 'tool': tool, 'phase': phase, 'dataset': dataset, 'model': model,
+            'baseline': round(baseline, 4), 'candidate': round(candidate, 4), 'change': _change(baseline, candidate),
+            'p_value': p_value, 'test': test, 'significant': significant, 'regression': significant and worse
+        })
+
+    def efficiency(self, baseline: pd.DataFrame, candidate: pd.DataFrame):
+        """
+            Compares the duration and peak memory of the successful executions of each tool, phase, dataset and
+            model. Repeated runs are compared with a permutation test, single runs are only reported.
+        """
+        keys = ['tool', 'phase', 'dataset', 'model']
+        candidate_groups = dict(list(candidate.groupby(keys)))
+
+        for key, rows_a in baseline.groupby(keys):
+            if key not in candidate_groups:
+                continue
+
+            rows_b = candidate_groups[key]
+
+            for kind, (column, scale) in EFFICIENCY.items():
+                values_a = rows_a[column].to_numpy() / scale
+                values_b = rows_b[column].to_numpy() / scale
+                p_value = permutation_test(values_a, values_b, self.n_resamples, self.seed)
+                self._add(kind, *key, baseline=values_a.mean(), candidate=values_b.mean(), p_value=p_value,
+                          test='none' if np.isnan(p_value) else 'permutation', lower_is_better=True)
+
+    def effectiveness(self, baseline: pd.DataFrame, candidate: pd.DataFrame, metrics: List[str]):
+        """
+            Compares the metrics of each tool and model. Repeated runs are compared with a permutation test over the
+            runs, single runs with a bootstrap test over the counts of their last run.
+        """
+        candidate_groups = dict(list(candidate.groupby(['tool', 'model'])))
+
+        for (tool, model), rows_a in baseline.groupby(['tool', 'model']):
+            if (tool, model) not in candidate_groups:
+                continue
+
+            rows_b = candidate_groups[(tool, model)]
+            dataset = rows_a['dataset'].iloc[0] if 'dataset' in rows_a.columns else None
+
+            for metric in metrics:
+                values_a, values_b = rows_a[metric].to_numpy(dtype=float), rows_b[metric].to_numpy(dtype=float)
+                p_value, test = permutation_test(values_a, values_b, self.n_resamples, self.seed), 'permutation'
+
+                if np.isnan(p_value) and rows_a[COUNTS].notna().all(axis=None) and rows_b[COUNTS].notna().all(axis=None):
+                    p_value = bootstrap_difference(rows_a[COUNTS].iloc[-1].to_numpy(dtype=np.int64),
+                                                   rows_b[COUNTS].iloc[-1].to_numpy(dtype=np.int64), metric,
+                                                   self.n_resamples, self.seed)['p_value']
+                    test = 'bootstrap'
+
+                self._add(metric, tool, 'infer', dataset, model, baseline=values_a.mean(), candidate=values_b.mean(),
+                          p_value=p_value, test='none' if np.isnan(p_value) else test, lower_is_better=False)
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.rows)
@@ -0,0 +1,6 @@
+# kept free of heavy imports, the controllers use them to declare their arguments
+NOTIFICATIONS = ('correct', 'incorrect', 'uncertain')
+OUTCOMES = ('tp', 'fp', 'tn', 'fn')
+METRICS = ('mcc', 'f1', 'precision', 'recall')
+# tmpfs directory where the datasets and working directories are staged by default
+DEFAULT_SCRATCH = '/dev/shm/trustdnn'
@@ -0,0 +1,89 @@
+import numpy as np
+
+from typing import Dict
+
+from trustdnn.core.bootstrap import compute_metrics
+
+
+def _area(x: np.ndarray, y: np.ndarray) -> float:
+    # trapezoidal rule
+    return float(np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2))
+
+
+class Curves:
+    def __init__(self, scores: np.ndarray, true_labels: np.ndarray, pred_labels: np.ndarray, invert: bool = False):
+        """
+            ROC and PR curves over all the thresholds of the scores, computed in a single sorted pass. A sample is
+            notified as correct when its score is greater or equal than the threshold. The positives are the samples
+            whose prediction is correct (misclassified with invert).
+        :param scores: confidence of the tool that the prediction is correct
+        :param true_labels: true labels
+        :param pred_labels: predicted labels
+        :param invert: sets the positive class to the mis-classifications (lower scores are positives)
+        """
+        scores = np.asarray(scores, dtype=float)
+        is_positive = np.asarray(true_labels) == np.asarray(pred_labels)
+
+        if invert:
+            scores = -scores
+            is_positive = ~is_positive
+
+        order = np.argsort(-scores, kind='mergesort')
+        scores = scores[order]
+        is_positive = is_positive[order]
+
+        # last position of each distinct score, every sample up to it is notified as positive
+        last = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1] if len(scores) else np.array([], dtype=int)
+        true_pos = np.cumsum(is_positive)[last]
+        false_pos = (last + 1) - true_pos
+
+        positives = int(is_positive.sum())
+        negatives = len(is_positive) - positives
+
+        # prepend the threshold above the maximum score, where nothing is notified as positive
+        self.thresholds = -np.r_[np.inf, scores[last]] if invert else np.r_[np.inf, scores[last]]
+        self.true_pos = np.r_[0, true_pos]
+        self.false_pos = np.r_[0, false_pos]
+        self.false_neg = positives - self.true_pos
+        self.true_neg = negatives - self.false_pos
+
+        counts = np.stack([self.true_pos, self.false_pos, self.true_neg, self.false_neg], axis=-1)
+        metrics = compute_metrics(counts)
+
+        self.tpr = metrics['recall']
+        self.fpr = self.false_pos / negatives if negatives > 0 else np.zeros(len(self.false_pos))
+        self.precision = metrics['precision']
+        self.recall = metrics['recall']
+        self.mcc = metrics['mcc']
+        self.invert = invert
+
+    @property
+    def roc_auc(self) -> float:
+        return _area(self.fpr, self.tpr)
+
+    @property
+    def average_precision(self) -> float:
+        return float(np.sum(np.diff(self.recall) * self.precision[1:]))
+
+    @property
+    def best(self) -> int:
+        return int(np.argmax(self.mcc))
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "roc_auc": round(self.roc_auc, 4),
+            "average_precision": round(self.average_precision, 4),
+            # with invert, samples with scores lower or equal than the threshold are positives
+            "best_threshold": float(self.thresholds[self.best]) + 0.0,
+            "best_mcc": round(float(self.mcc[self.best]), 3)
+        }
+
+    def to_dict(self) -> Dict[str, np.ndarray]:
+        return {
+            "threshold": self.thresholds,
+            "tpr": self.tpr,
+            "fpr": self.fpr,
+            "precision": self.precision,
+            "recall": self.recall,
+            "mcc": self.mcc
+        }
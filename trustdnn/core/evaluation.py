@@ -1,7 +1,9 @@
 import pandas as pd
 import numpy as np
 
-from typing import Any
+from typing import Any, Iterable, Tuple, Union
+
+from trustdnn.core.constants import NOTIFICATIONS, OUTCOMES
 
 
 def get_outcome(outcome, true_label, pred_label, invert: bool = False) -> str:
@@ -23,44 +25,138 @@ def get_outcome(outcome, true_label, pred_label, invert: bool = False) -> str:
             return 'fn'
 
 
-class Evaluation:
-    def __init__(self, notifications: pd.DataFrame, labels: pd.DataFrame, predictions: pd.DataFrame,
-                 invert: bool = False):
+def encode_notifications(notifications: pd.Series) -> np.ndarray:
+    """
+        Encodes notifications into their index in NOTIFICATIONS (-1 for unknown values). Only the unique values are
+        lowercased, so the cost is independent of the number of samples.
+    :param notifications: series with the notifications
+    :return: array with the codes of the notifications
+    """
+    codes, uniques = pd.factorize(notifications)
+    lookup = np.array([NOTIFICATIONS.index(u.lower()) if u.lower() in NOTIFICATIONS else -1 for u in uniques] + [-1],
+                      dtype=np.int8)
+
+    # factorize marks missing values with -1, which maps to the trailing -1 of the lookup
+    return lookup[codes]
+
+
+def get_outcomes(notifications: np.ndarray, true_labels: np.ndarray, pred_labels: np.ndarray,
+                 invert: bool = False) -> np.ndarray:
+    """
+        Vectorized version of get_outcome, uncertain notifications are considered incorrect.
+    :param notifications: encoded notifications
+    :param true_labels: true labels
+    :param pred_labels: predicted labels
+    :param invert: sets the positive class to the mis-classifications
+    :return: array with the index of the outcome in OUTCOMES for each sample
+    """
+    is_positive = notifications == NOTIFICATIONS.index('correct')
+
+    if invert:
+        is_positive = ~is_positive
+
+    is_different = true_labels != pred_labels
 
-        # transform notifications to lowercase
-        notifications['notification'] = notifications['notification'].apply(lambda x: x.lower())
-        notification_counts = notifications['notification'].value_counts()
+    return (2 * ~is_positive + is_different).astype(np.int8)
 
-        self.correct = notification_counts.get('correct', 0)
-        self.incorrect = notification_counts.get('incorrect', 0)
-        self.uncertain = notification_counts.get('uncertain', 0)
 
-        # transform all uncertain notifications to incorrect
-        notifications['notification'] = notifications['notification'].apply(lambda x: 'incorrect' if x == 'uncertain' else x)
-        labels.rename(columns={'y': 'true_label'}, inplace=True)
-        predictions.rename(columns={'y': 'pred_label'}, inplace=True)
+def get_codes(notifications: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+    # notifications are either a frame with the notification column or already encoded (see NotificationArtifact)
+    if isinstance(notifications, pd.DataFrame):
+        return encode_notifications(notifications['notification'])
 
-        self.results = (notifications.merge(predictions, left_index=True, right_index=True)
-                        .merge(labels, left_index=True, right_index=True))
+    return np.asarray(notifications)
 
-        outcomes = self.results.apply(lambda x: get_outcome(x['notification'], x['true_label'], x['pred_label'], invert),
-                                      axis=1)
-        outcomes_counts = outcomes.value_counts()
 
-        ground_truth = self.results.apply(lambda x: x['true_label'] == x['pred_label'], axis=1)
-        ground_truth_counts = ground_truth.value_counts()
+def get_column(df: pd.DataFrame, column: str = 'y') -> np.ndarray:
+    return (df[column] if column in df.columns else df.iloc[:, 0]).to_numpy()
 
-        self.gt_correct = ground_truth_counts.get(True, 0)
-        self.gt_incorrect = ground_truth_counts.get(False, 0)
 
-        self.true_pos = outcomes_counts.get('tp', 0)
-        self.false_pos = outcomes_counts.get('fp', 0)
-        self.true_neg = outcomes_counts.get('tn', 0)
-        self.false_neg = outcomes_counts.get('fn', 0)
+class Evaluation:
+    def __init__(self, notifications: Union[pd.DataFrame, np.ndarray], labels: pd.DataFrame,
+                 predictions: pd.DataFrame, invert: bool = False):
+        self._reset()
+        codes = get_codes(notifications)
+        self._count_notifications(codes)
+
+        # align the three frames on their index (same semantics as an inner merge), encoded notifications are indexed
+        # by position
+        notifications_index = notifications.index if isinstance(notifications, pd.DataFrame) else \
+            pd.RangeIndex(len(codes))
+        index = notifications_index
+
+        if not (index.equals(predictions.index) and index.equals(labels.index)):
+            index = index.intersection(predictions.index).intersection(labels.index)
+            codes = codes[notifications_index.get_indexer(index)]
+            predictions = predictions.loc[index]
+            labels = labels.loc[index]
+
+        self.true_labels = get_column(labels)
+        self.pred_labels = get_column(predictions)
+        self.outcomes = get_outcomes(codes, self.true_labels, self.pred_labels, invert)
+        self._count_outcomes(self.outcomes)
 
-        self.total = len(notifications)
         self.labels = labels
         self.predictions = predictions
+        # index of the evaluated samples, the outcomes are aligned with it
+        self.index = index
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Tuple[Union[pd.DataFrame, np.ndarray], pd.DataFrame, pd.DataFrame]],
+                    invert: bool = False) -> 'Evaluation':
+        """
+            Streaming evaluation that accumulates the counts over positionally aligned chunks, so only one chunk of the
+            notifications, labels and predictions is held in memory at a time. The per-sample arrays are not kept.
+        :param chunks: iterable of (notifications, labels, predictions) chunks
+        :param invert: sets the positive class to the mis-classifications
+        :return: evaluation with the accumulated counts
+        """
+        evaluation = cls.__new__(cls)
+        evaluation._reset()
+
+        for notifications, labels, predictions in chunks:
+            codes = get_codes(notifications)
+            evaluation._count_notifications(codes)
+            # a shorter chunk only happens at the end of a file, which an inner merge would also drop
+            size = min(len(codes), len(labels), len(predictions))
+            outcomes = get_outcomes(codes[:size], get_column(labels)[:size], get_column(predictions)[:size], invert)
+            evaluation._count_outcomes(outcomes)
+
+        return evaluation
+
+    def _reset(self):
+        self.correct = self.incorrect = self.uncertain = 0
+        self.true_pos = self.false_pos = self.true_neg = self.false_neg = 0
+        self.total = 0
+        self.true_labels = self.pred_labels = self.outcomes = None
+        self.labels = self.predictions = self.index = None
+
+    def _count_notifications(self, codes: np.ndarray):
+        correct, incorrect, uncertain = np.bincount(codes[codes >= 0], minlength=len(NOTIFICATIONS)).tolist()
+        self.correct += correct
+        self.incorrect += incorrect
+        self.uncertain += uncertain
+        self.total += len(codes)
+
+    def _count_outcomes(self, outcomes: np.ndarray):
+        # python ints avoid overflowing the products in the mcc for large test sets
+        true_pos, false_pos, true_neg, false_neg = np.bincount(outcomes, minlength=len(OUTCOMES)).tolist()
+        self.true_pos += true_pos
+        self.false_pos += false_pos
+        self.true_neg += true_neg
+        self.false_neg += false_neg
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.array([self.true_pos, self.false_pos, self.true_neg, self.false_neg], dtype=np.int64)
+
+    @property
+    def gt_correct(self):
+        return self.true_pos + self.true_neg
+
+    @property
+    def gt_incorrect(self):
+        return self.false_pos + self.false_neg
 
     @property
     def retrieved(self):
@@ -86,8 +182,8 @@ class Evaluation:
     @property
     def mcc(self):
         covar = self.true_pos * self.true_neg - self.false_pos * self.false_neg
-        denom = np.sqrt((self.true_pos + self.false_pos) * (self.true_pos + self.false_neg) *
-                        (self.true_neg + self.false_pos) * (self.true_neg + self.false_neg))
+        denom = np.sqrt(float((self.true_pos + self.false_pos) * (self.true_pos + self.false_neg) *
+                              (self.true_neg + self.false_pos) * (self.true_neg + self.false_neg)))
 
         if denom == 0:
             print(f"Warning: MCC denominator is zero. True Pos: {self.true_pos}, False Pos: {self.false_pos}, "
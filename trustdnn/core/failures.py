@@ -0,0 +1,100 @@
+import re
+import signal
+
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from trustdnn.core.objects import Execution
+
+# failures that may not happen again on a retry
+TRANSIENT = ('oom', 'signal', 'timeout', 'transient')
+
+# stderr patterns of all the tools, the rules in the configuration of a tool are matched first
+DEFAULT_RULES = {
+    r"MemoryError|Cannot allocate memory|ResourceExhaustedError|std::bad_alloc|[Oo]ut of memory": 'oom',
+    r"Resource temporarily unavailable|Too many open files|Device or resource busy|Connection (reset|refused)":
+        'transient'
+}
+
+# only the end of the log is searched, where the error of the failed command is
+TAIL_SIZE = 64 * 1024
+
+
+def get_signal(return_code: int) -> Optional[int]:
+    """
+        Signal that killed the command, from the return code of the process or of the shell running it (128 + signal)
+    """
+    if return_code < 0:
+        return -return_code
+
+    if 128 < return_code <= 128 + signal.NSIG:
+        return return_code - 128
+
+    return None
+
+
+def read_tail(path: Optional[Path], size: int = TAIL_SIZE) -> str:
+    if path is None or not path.exists():
+        return ''
+
+    with path.open('rb') as f:
+        f.seek(max(path.stat().st_size - size, 0))
+
+        return f.read().decode(errors='replace')
+
+
+def classify(execution: Execution, stderr: str = '', rules: Dict[str, str] = None) -> Optional[str]:
+    """
+        Classifies the failure of an execution by its status, the patterns of its stderr, and its return code
+    :param execution: the execution
+    :param stderr: the stderr of the execution
+    :param rules: regular expressions of the tool mapped to the failure they identify
+    :return: the failure, None if the execution succeeded
+    """
+    if execution.status in ('success', 'exists'):
+        return None
+
+    # the engine killed the execution, for exceeding the timeout or its estimated memory
+    if execution.status in ('timeout', 'exceeded'):
+        return execution.status
+
+    for pattern, failure in {**(rules or {}), **DEFAULT_RULES}.items():
+        if re.search(pattern, stderr):
+            return failure
+
+    signal_number = get_signal(execution.return_code)
+
+    if signal_number == signal.SIGKILL:
+        # not killed by the engine, most likely by the kernel OOM killer
+        return 'oom'
+
+    if signal_number is not None:
+        return 'signal'
+
+    return 'error'
+
+
+@dataclass
+class RetryPolicy:
+    """
+        Retries the transient failures with an exponential backoff, the retries can run alone and, for tools with a
+        batch size, with the batch size halved after running out of memory
+    """
+    retries: int = 0
+    backoff: float = 5.0
+    factor: float = 2.0
+    alone: bool = False
+    shrink_batch: bool = False
+
+    def should_retry(self, failure: Optional[str], attempt: int) -> bool:
+        return failure in TRANSIENT and attempt < self.retries
+
+    def delay(self, attempt: int) -> float:
+        return self.backoff * self.factor ** attempt
+
+    def batch_size(self, failure: str, batch_size: Optional[int]) -> Optional[int]:
+        if self.shrink_batch and batch_size and failure == 'oom':
+            return max(1, batch_size // 2)
+
+        return batch_size
@@ -0,0 +1,27 @@
+import json
+import time
+
+from pathlib import Path
+
+
+class Journal:
+    def __init__(self, path: Path):
+        """
+            Append-only log of the execution attempts, one JSON object per line
+        :param path: path to the journal.jsonl file
+        """
+        self.path = path
+
+    def record(self, **entry):
+        entry = {'time': round(time.time(), 3), **entry}
+
+        # a single write per line, so that readers following the journal never see a partial entry
+        with self.path.open('a') as f:
+            f.write(json.dumps(entry, default=str) + '\n')
+
+    def read(self) -> list:
+        if not self.path.exists():
+            return []
+
+        with self.path.open() as f:
+            return [json.loads(line) for line in f if line.strip()]
@@ -1,5 +1,8 @@
-import pandas as pd
 from pathlib import Path
+from typing import Any, Callable, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class Model:
@@ -11,17 +14,70 @@ class Model:
         self.dataset: str = dataset
         self.path: Path = path
 
-        # look for predictions in predictions directory
-        self.predictions_path: Path = predictions_path
-
-        if not self.predictions_path.exists():
-            raise ValueError(f"Predictions file {self.predictions_path} does not exist")
+        # look for predictions in predictions directory, the binary predictions written by 'benchmark predict' take
+        # precedence over the CSV ones
+        self.csv_predictions_path: Path = predictions_path
+        self.npy_predictions_path: Path = predictions_path.with_suffix('.npy')
 
         self._predictions = None
+        self._loaded = None
 
     @property
-    def predictions(self) -> pd.DataFrame:
+    def predictions_path(self) -> Path:
+        if self.npy_predictions_path.exists() or not self.csv_predictions_path.exists():
+            return self.npy_predictions_path
+
+        return self.csv_predictions_path
+
+    def _check_predictions(self):
+        if not self.predictions_path.exists():
+            raise FileNotFoundError(f"Predictions file {self.predictions_path} does not exist, generate them with "
+                                    f"'trustdnn benchmark predict'")
+
+    @property
+    def predictions(self) -> 'pd.DataFrame':
         if self._predictions is None:
-            self._predictions = pd.read_csv(self.predictions_path)
+            import numpy as np
+            import pandas as pd
+
+            self._check_predictions()
+
+            if self.predictions_path.suffix == '.npy':
+                self._predictions = pd.DataFrame({'y': np.load(self.predictions_path)})
+            else:
+                self._predictions = pd.read_csv(self.predictions_path)
 
         return self._predictions
+
+    def iter_predictions(self, chunk_size: int) -> Iterator['pd.DataFrame']:
+        """
+            Reads the predictions in chunks without loading the whole file
+        """
+        import numpy as np
+        import pandas as pd
+
+        self._check_predictions()
+
+        if self.predictions_path.suffix == '.npy':
+            predictions = np.load(self.predictions_path, mmap_mode='r')
+
+            for start in range(0, len(predictions), chunk_size):
+                yield pd.DataFrame({'y': np.asarray(predictions[start:start + chunk_size])})
+        else:
+            yield from pd.read_csv(self.predictions_path, chunksize=chunk_size)
+
+    def load(self, loader: Callable[[Path], Any] = None) -> Any:
+        """
+            Loads the model once, the in-process executions of the instances that share the model reuse it
+        :param loader: function loading the model file, defaults to Keras load_model
+        :return: the loaded model
+        """
+        if self._loaded is None:
+            if loader is None:
+                from tensorflow import keras
+
+                loader = lambda path: keras.models.load_model(path, compile=False)
+
+            self._loaded = loader(self.path)
+
+        return self._loaded
@@ -0,0 +1,92 @@
+import os
+import json
+import numpy as np
+
+from pathlib import Path
+from typing import List, Optional, Union
+
+from trustdnn.core.cache import fingerprint
+
+
+def _tmp_path(path: Path) -> Path:
+    # the execution and a watching evaluation can convert the same output at the same time
+    return path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+
+def _save(path: Path, values: np.ndarray):
+    tmp_path = _tmp_path(path)
+
+    try:
+        with tmp_path.open('wb') as f:
+            np.save(f, values)
+
+        tmp_path.replace(path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+class NotificationArtifact:
+    def __init__(self, output: Union[Path, str], sources: List[Union[Path, str]] = None):
+        """
+            Canonical notifications of a tool output, stored next to it: the notification codes (int8 index in
+            NOTIFICATIONS, -1 for unknown values) and the optional float scores, as npy files that are memory-mapped
+            when loaded. The artifact is stale once the output or any other file the notifications are read from
+            changes.
+        :param output: path to the output of the tool
+        :param sources: files the notifications are read from (defaults to the output)
+        """
+        self.output = Path(output)
+        self.sources = [Path(source) for source in sources] if sources else [self.output]
+        self.codes_path = self.output.with_name(f"{self.output.name}.notifications.npy")
+        self.scores_path = self.output.with_name(f"{self.output.name}.scores.npy")
+        self.meta_path = self.output.with_name(f"{self.output.name}.notifications.json")
+
+    @property
+    def fingerprints(self) -> List[str]:
+        return [fingerprint(source) for source in self.sources]
+
+    @property
+    def meta(self) -> Optional[dict]:
+        if not self.meta_path.exists():
+            return None
+
+        with self.meta_path.open() as f:
+            return json.load(f)
+
+    @property
+    def fresh(self) -> bool:
+        meta = self.meta
+
+        # artifacts saved before the sources were recorded are converted again
+        return meta is not None and meta.get('sources') == self.fingerprints and self.codes_path.exists()
+
+    @property
+    def codes(self) -> np.ndarray:
+        return np.load(self.codes_path, mmap_mode='r')
+
+    @property
+    def scores(self) -> Optional[np.ndarray]:
+        if not self.meta['scores']:
+            return None
+
+        return np.load(self.scores_path, mmap_mode='r')
+
+    def save(self, codes: np.ndarray, scores: np.ndarray = None):
+        _save(self.codes_path, np.asarray(codes, dtype=np.int8))
+
+        if scores is not None:
+            _save(self.scores_path, np.asarray(scores, dtype=np.float64))
+
+        # written last, an interrupted conversion leaves the artifact stale
+        tmp_path = _tmp_path(self.meta_path)
+
+        try:
+            with tmp_path.open('w') as f:
+                json.dump({'output': fingerprint(self.output), 'sources': self.fingerprints, 'size': len(codes),
+                           'scores': scores is not None}, f)
+
+            tmp_path.replace(self.meta_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional, Dict, List
 from trustdnn.core.dataset.base import Dataset
 from trustdnn.core.model import Model
 
@@ -15,6 +16,15 @@ class Execution:
     mem_median: float
     mem_peak: float
     return_code: int
+    group: Optional[str] = None
+    repetition: Optional[int] = None
+    # number of cores the execution was pinned to
+    cores: Optional[int] = None
+    # class of the failure and number of retries before the execution
+    failure: Optional[str] = None
+    attempt: int = 0
+    # stderr log of the execution
+    stderr: Optional[Path] = None
 
     def to_dict(self):
         return {
@@ -26,7 +36,12 @@ class Execution:
             "mem_median": self.mem_median,
             "mem_peak": self.mem_peak,
             "return_code": self.return_code,
-            "output": self.output
+            "output": self.output,
+            "group": self.group,
+            "repetition": self.repetition,
+            "cores": self.cores,
+            "failure": self.failure,
+            "attempt": self.attempt
         }
 
 
@@ -39,3 +54,22 @@ class Instance:
 
     def __str__(self):
         return f"<Instance: {self.phase} - {self.working_dir} - {self.model.name} - {self.dataset.name}>"
+
+
+@dataclass
+class Job:
+    command: str
+    output: Path
+    log_path: Path
+    cwd: Path
+    name: Optional[str] = None
+    env: Optional[Dict[str, str]] = None
+    # estimated peak memory in bytes, used for admission when running under a memory budget
+    memory: Optional[int] = None
+    # cores the job is pinned to, its numerical libraries use as many threads
+    cores: Optional[List[int]] = None
+    # admitted only when no other job runs
+    exclusive: bool = False
+
+    def __str__(self):
+        return f"<Job: {self.command} - {self.output}>"
@@ -1,11 +1,37 @@
+import os
+import functools
+import multiprocessing
 import pandas as pd
-import seaborn as sns
-import numpy as np
 
-from matplotlib import pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+
+# set once per process, when the first figure is drawn
+_theme = None
+
+
+def _pyplot(style: str, context: str, font_scale: float):
+    """
+        Imports matplotlib with a non-interactive backend and sets the seaborn theme. Plotting libraries are only
+        imported when a figure is drawn.
+    """
+    global _theme
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+    import seaborn as sns
+    from matplotlib import pyplot as plt
+
+    if _theme != (style, context, font_scale):
+        sns.set_theme(style=style, context=context, rc={"grid.linewidth": 3}, font_scale=font_scale)
+        _theme = (style, context, font_scale)
+
+    return sns, plt
 
 
 def generate_colors_and_shades(n_colors, n_shades):
+    import seaborn as sns
+
     # Define a palette
     palette = sns.color_palette("Set2", n_colors)
 
@@ -21,17 +47,80 @@ def generate_colors_and_shades(n_colors, n_shades):
     return colors_and_shades_hex
 
 
+def figure(method):
+    """
+        Skips the figure when plots are disabled and queues it when the plotter is deferred
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.enabled:
+            return
+
+        if self.deferred:
+            self._figures.append((self.settings, method.__name__, args, kwargs))
+            return
+
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _render(settings: dict, name: str, args: tuple, kwargs: dict):
+    fig_size = settings.pop('fig_size')
+    plotter = Plotter(**settings)
+    plotter.fig_size = fig_size
+    getattr(plotter, name)(*args, **kwargs)
+
+
 class Plotter:
     def __init__(self, figures_path, style: str = "darkgrid", context: str = "paper", font_scale: float = 1.8,
-                 palette: str = 'Set2'):
+                 palette: str = 'Set2', enabled: bool = True, deferred: bool = False, workers: int = None):
+        """
+            :param figures_path: directory where the figures are saved
+            :param enabled: whether figures are drawn at all
+            :param deferred: queues the figures, which are drawn concurrently by render
+            :param workers: number of processes drawing the queued figures (defaults to one per figure)
+        """
         self.fig_size = (16, 9)
         self.font_size = 20
         self.labels_size = 24
         self.font_scale = font_scale
         self.palette = palette
         self.figures_path = figures_path
-        sns.set_theme(style=style, context=context, rc={"grid.linewidth": 3}, font_scale=font_scale)
-
+        self.style = style
+        self.context = context
+        self.enabled = enabled
+        self.deferred = deferred
+        self.workers = workers
+        self._figures = []
+
+    @property
+    def settings(self) -> dict:
+        return {'figures_path': self.figures_path, 'style': self.style, 'context': self.context,
+                'font_scale': self.font_scale, 'palette': self.palette, 'fig_size': self.fig_size}
+
+    def _pyplot(self):
+        return _pyplot(self.style, self.context, self.font_scale)
+
+    def render(self):
+        """
+            Draws the queued figures, each in its own worker process
+        """
+        figures, self._figures = self._figures, []
+
+        if len(figures) <= 1 or self.workers == 1:
+            for figure_args in figures:
+                _render(*figure_args)
+            return
+
+        workers = min(self.workers or os.cpu_count(), len(figures))
+        context = multiprocessing.get_context('fork')
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            for future in [executor.submit(_render, *figure_args) for figure_args in figures]:
+                future.result()
+
+    @figure
     def box_plot(self, df: pd.DataFrame, x: str, y: str, tag: str, hue: str = None, x_label: str = None,
                  y_label: str = None, invert: bool = False, rotate: bool = False):
 
@@ -45,6 +134,7 @@ class Plotter:
             x, y = y, x
             x_label, y_label = y_label, x_label
 
+        sns, plt = self._pyplot()
         output_path = self.figures_path / f'box_plot_{tag}.png'
         plt.figure(figsize=self.fig_size)
 
@@ -60,8 +150,9 @@ class Plotter:
 
         plt.tight_layout()
         plt.savefig(output_path)
-        plt.show()
+        plt.close()
 
+    @figure
     def bar_plot(self, data: pd.DataFrame, x: str, y: str, tag: str, hue: str = None, x_label: str = None,
                  y_label: str = None, transparent: bool = False, error_bars: bool = False, orient: str = 'v'):
         if not x_label:
@@ -70,6 +161,7 @@ class Plotter:
         if not y_label:
             y_label = y.capitalize()
 
+        sns, plt = self._pyplot()
         output_path = self.figures_path / f'bar_plot_{tag}.png'
         plt.figure(figsize=self.fig_size)
 
@@ -86,10 +178,12 @@ class Plotter:
         plt.legend(loc='best', fontsize=self.labels_size)
         plt.tight_layout()
         plt.savefig(str(output_path), transparent=transparent)
-        plt.show()
+        plt.close()
 
+    @figure
     def stacked_bar_plot(self, data: pd.DataFrame, x: str, stack: str, hue: str, y: str, y_label: str, tag: str,
                          transparent: bool = False, x_label: str = None):
+        _, plt = self._pyplot()
         output_path = self.figures_path / f'stacked_bar_plot_{tag}.png'
         fix, ax = plt.subplots(figsize=self.fig_size)
 
@@ -121,4 +215,60 @@ class Plotter:
         plt.legend(loc='best', fontsize=self.labels_size)
         plt.tight_layout()
         plt.savefig(str(output_path), transparent=transparent)
-        plt.show()
+        plt.close()
+
+    @figure
+    def line_plot(self, data: pd.DataFrame, x: str, y: str, tag: str, hue: str = None, x_label: str = None,
+                  y_label: str = None, transparent: bool = False):
+        if not x_label:
+            x_label = x.capitalize()
+
+        if not y_label:
+            y_label = y.capitalize()
+
+        sns, plt = self._pyplot()
+        output_path = self.figures_path / f'line_plot_{tag}.png'
+        plt.figure(figsize=self.fig_size)
+
+        # Line plot
+        sns.lineplot(data=data, x=x, y=y, hue=hue, palette=self.palette, linewidth=2.5, errorbar=None)
+
+        plt.xlabel(x_label, fontweight='bold', fontsize=self.font_size)
+        plt.ylabel(y_label, fontweight='bold', fontsize=self.font_size)
+
+        plt.legend(loc='best', fontsize=self.labels_size)
+        plt.tight_layout()
+        plt.savefig(str(output_path), transparent=transparent)
+        plt.close()
+
+    @figure
+    def pareto_plot(self, data: pd.DataFrame, tag: str, hue: str = 'model', transparent: bool = False):
+        """
+            Throughput against peak memory of the configurations, with the Pareto front of each hue value drawn as a
+            step line and the points labeled by batch size and threads
+        """
+        sns, plt = self._pyplot()
+        output_path = self.figures_path / f'pareto_plot_{tag}.png'
+        plt.figure(figsize=self.fig_size)
+        data = data.assign(memory=data['mem_peak'] / 1024 ** 2)
+        colors = dict(zip(data[hue].unique(), sns.color_palette(self.palette, data[hue].nunique())))
+
+        sns.scatterplot(data=data, x='memory', y='throughput', hue=hue, style='pareto', palette=colors, s=200)
+
+        for value, group in data[data['pareto']].groupby(hue):
+            group = group.sort_values('memory')
+            plt.step(group['memory'], group['throughput'], where='post', color=colors[value], linewidth=2.5)
+
+        for _, row in data.iterrows():
+            batch_size = 'default' if pd.isna(row['batch_size']) else int(row['batch_size'])
+            threads = 'all' if pd.isna(row['threads']) else int(row['threads'])
+            plt.annotate(f"{batch_size}/{threads}", (row['memory'], row['throughput']), textcoords='offset points',
+                         xytext=(6, 6), fontsize=self.font_size - 6)
+
+        plt.xlabel('Peak memory (MiB)', fontweight='bold', fontsize=self.font_size)
+        plt.ylabel('Samples per second', fontweight='bold', fontsize=self.font_size)
+
+        plt.legend(loc='best', fontsize=self.labels_size - 6)
+        plt.tight_layout()
+        plt.savefig(str(output_path), transparent=transparent)
+        plt.close()
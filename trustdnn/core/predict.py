@@ -0,0 +1,89 @@
+import os
+
+from pathlib import Path
+from typing import Union
+
+
+def is_up_to_date(output: Path, *inputs: Path) -> bool:
+    """
+        Checks if the output exists and is newer than all the inputs it was generated from
+    """
+    if not output.exists():
+        return False
+
+    mtime = output.stat().st_mtime_ns
+
+    return all(mtime >= path.stat().st_mtime_ns for path in inputs if path.exists())
+
+
+def load_features(path: Path, headers: bool = False):
+    """
+        Memory-maps npy features, CSV features are read into memory
+    """
+    import numpy as np
+
+    if path.suffix == '.npy':
+        return np.load(path, mmap_mode='r')
+
+    import pandas as pd
+
+    return pd.read_csv(path, header='infer' if headers else None).to_numpy()
+
+
+def to_labels(outputs):
+    """
+        Predicted labels from the outputs of the model: the class with the highest probability, or the thresholded
+        probability of models with a single sigmoid output
+    """
+    import numpy as np
+
+    outputs = np.asarray(outputs)
+
+    if outputs.ndim > 1 and outputs.shape[-1] > 1:
+        return outputs.argmax(axis=-1)
+
+    return (outputs.reshape(len(outputs)) > 0.5).astype(np.int64)
+
+
+def predict(model_path: Union[Path, str], features_path: Union[Path, str], output: Union[Path, str],
+            batch_size: int = 128, threads: int = None, headers: bool = False) -> int:
+    """
+        Batched CPU inference of a Keras model over the features, the predicted labels are written as int32 npy.
+        Meant to run in a spawned worker process, TensorFlow is imported and configured in the worker.
+    :param model_path: path to the .h5 model
+    :param features_path: path to the test features (npy or csv)
+    :param output: path to the predictions file
+    :param batch_size: number of samples per batch
+    :param threads: number of threads used by the TensorFlow operations (defaults to TensorFlow's choice)
+    :param headers: whether the CSV features have a header row
+    :return: number of predicted samples
+    """
+    import numpy as np
+
+    # CPU only, must be set before TensorFlow is imported
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+
+    if threads:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    model = tf.keras.models.load_model(model_path, compile=False)
+    features = load_features(Path(features_path), headers)
+    labels = np.empty(len(features), dtype=np.int32)
+
+    for start in range(0, len(features), batch_size):
+        batch = np.asarray(features[start:start + batch_size], dtype=np.float32)
+        labels[start:start + len(batch)] = to_labels(model.predict_on_batch(batch))
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(f"{output.name}.tmp")
+
+    with tmp_path.open('wb') as f:
+        np.save(f, labels)
+
+    tmp_path.replace(output)
+
+    return len(labels)
@@ -0,0 +1,120 @@
+import json
+import hashlib
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from importlib.metadata import entry_points, EntryPoint
+
+# entry point group for plugins distributed in other packages, e.g. in their pyproject.toml:
+#   [project.entry-points."trustdnn.plugins"]
+#   mytool = "mypackage.trustdnn_plugin"
+# the module must define load(app), like the built-in plugins
+ENTRY_POINT_GROUP = 'trustdnn.plugins'
+
+
+def config_hash(config: dict) -> str:
+    return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ConfigCache:
+    def __init__(self):
+        """
+            Parsed JSON configs, re-read only when the modification time or the size of the file changes
+        """
+        self._entries: Dict[Path, Tuple[Tuple[int, int], dict]] = {}
+
+    def get(self, path: Path) -> Optional[dict]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._entries.pop(path, None)
+            return None
+
+        version = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+
+        if entry is None or entry[0] != version:
+            with path.open() as f:
+                entry = (version, json.load(f))
+
+            self._entries[path] = entry
+
+        return entry[1]
+
+
+class PluginRegistry:
+    def __init__(self, app, config_path: Path):
+        """
+            Discovers, configures and memoizes the plugins of the application
+        :param app: the application
+        :param config_path: directory with a sub-directory of JSON configs for each kind of plugin
+        """
+        self.app = app
+        self.config_path = config_path
+        self.configs = ConfigCache()
+        self._entry_points = None
+        self._instances = {}
+
+    @property
+    def entry_points(self) -> Dict[str, EntryPoint]:
+        if self._entry_points is None:
+            eps = entry_points()
+            # entry_points() returns a dict of groups before Python 3.10
+            group = eps.select(group=ENTRY_POINT_GROUP) if hasattr(eps, 'select') else eps.get(ENTRY_POINT_GROUP, [])
+            self._entry_points = {ep.name: ep for ep in group}
+
+        return self._entry_points
+
+    def get_config(self, section: str, name: str) -> Optional[dict]:
+        return self.configs.get(self.config_path / section / f"{name}.json")
+
+    def load(self, name: str):
+        """
+            Registers the handler of the plugin, from the plugin directories and the trustdnn.plugins package first
+            and from the installed entry points otherwise
+        """
+        if self.app.handler.registered('plugins', name):
+            return
+
+        try:
+            self.app.plugin.load_plugin(name)
+        except ModuleNotFoundError as mnf:
+            # errors raised by the dependencies of the plugin are not masked
+            if mnf.name != f"{self.app._meta.plugin_module}.{name}" or name not in self.entry_points:
+                raise
+
+            self.entry_points[name].load().load(self.app)
+
+        self.app.log.info(f'Loaded plugin {name}')
+
+    def get(self, name: str, kind: type, section: str, **kw):
+        """
+            Gets the plugin initialized with its config. Instances are memoized by name and config hash, so each
+            plugin is initialized only once while its config is unchanged.
+        :param name: label of the plugin
+        :param kind: type of the plugin
+        :param section: sub-directory with the configs of the kind of plugin
+        :param kw: defaults for the arguments missing in the config
+        :return: handler for the plugin
+        """
+        config = self.get_config(section, name)
+
+        if config is None:
+            raise KeyError(f'No configuration found for plugin {name}')
+
+        config = {**kw, **config}
+        key = (name, config_hash(config))
+
+        if key not in self._instances:
+            self.load(name)
+            handler = self.app.handler.get('plugins', name)
+
+            if not issubclass(handler, kind):
+                raise TypeError(f'Plugin {name} is not of type {kind.__name__}')
+
+            plugin = handler(**config)
+            plugin._setup(self.app)
+            self._instances[key] = plugin
+            self.app.log.info(f'Initialized plugin {name}')
+
+        return self._instances[key]
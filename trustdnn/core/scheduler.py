@@ -0,0 +1,112 @@
+import asyncio
+import itertools
+
+from pathlib import Path
+from typing import Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# margin over the largest peak observed in previous executions
+HISTORY_MARGIN = 1.2
+# size-based estimate when there is no history: interpreter and framework baseline plus a multiple of the files read
+BASELINE_MEMORY = 512 * 1024 ** 2
+MODEL_FACTOR = 4
+DATA_FACTOR = 2
+
+
+def estimate_memory(executions: Optional['pd.DataFrame'], tool: str, phase: str, dataset: str, model: str,
+                    files: Iterable[Path] = ()) -> int:
+    """
+        Estimates the peak memory of an execution from the successful executions of the same tool and phase on the
+        same model, or on the same dataset, falling back to the size of the files it reads
+    :param executions: previous executions (executions.csv)
+    :param tool: name of the tool
+    :param phase: analyze or infer
+    :param dataset: name of the dataset
+    :param model: name of the model
+    :param files: model and split files read by the execution
+    :return: estimated peak memory in bytes
+    """
+    if executions is not None and len(executions):
+        history = executions[(executions['tool'] == tool) & (executions['phase'] == phase) &
+                             (executions['status'] == 'success')]
+
+        for column, value in [('model', model), ('dataset', dataset)]:
+            peaks = history.loc[history[column] == value, 'mem_peak'].dropna()
+
+            if len(peaks):
+                return int(peaks.max() * HISTORY_MARGIN)
+
+    size = 0
+
+    for i, path in enumerate(files):
+        if path.exists():
+            size += path.stat().st_size * (MODEL_FACTOR if i == 0 else DATA_FACTOR)
+
+    return BASELINE_MEMORY + size
+
+
+class MemoryScheduler:
+    def __init__(self, budget: float = None, parallel: int = 1):
+        """
+            Admits jobs while the sum of their estimated peak memory fits in the budget. Queued jobs are admitted
+            first-fit decreasing: the largest job that fits goes first and smaller jobs fill the remaining memory.
+            A job larger than the budget is admitted alone. Exclusive jobs are also admitted alone, the queue is held
+            back until the running jobs finish.
+        :param budget: memory budget in bytes (unlimited by default)
+        :param parallel: maximum number of jobs running at the same time
+        """
+        self.budget = budget if budget else float('inf')
+        self.parallel = parallel
+        self.used = 0
+        self.running = 0
+        self.exclusive = False
+        self._waiting: List[tuple] = []
+        self._order = itertools.count()
+
+    def _fits(self, estimate: int, exclusive: bool) -> bool:
+        if self.running == 0:
+            return True
+
+        if exclusive or self.exclusive:
+            return False
+
+        return self.running < self.parallel and self.used + estimate <= self.budget
+
+    def _dispatch(self):
+        self._waiting = [entry for entry in self._waiting if not entry[3].cancelled()]
+        # jobs waiting to run alone are admitted before the others
+        exclusive = [entry for entry in self._waiting if entry[2]]
+
+        for entry in sorted(exclusive or self._waiting, key=lambda e: (-e[0], e[1])):
+            estimate, _, is_exclusive, future = entry
+
+            if self._fits(estimate, is_exclusive):
+                self._waiting.remove(entry)
+                self.used += estimate
+                self.running += 1
+                self.exclusive = is_exclusive
+                future.set_result(None)
+
+    async def acquire(self, estimate: int = 0, exclusive: bool = False):
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append((estimate, next(self._order), exclusive, future))
+        self._dispatch()
+        await future
+
+    def resize(self, reserved: int, memory: int):
+        """
+            Changes the memory reserved by a running job
+        """
+        self.used += memory - reserved
+        self._dispatch()
+
+    def release(self, estimate: int = 0):
+        self.used -= estimate
+        self.running -= 1
+
+        if self.running == 0:
+            self.exclusive = False
+
+        self._dispatch()
@@ -0,0 +1,345 @@
+import json
+import time
+import socket
+import asyncio
+import threading
+import numpy as np
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from trustdnn.core.exc import TrustDNNError
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+HOST = '127.0.0.1'
+# the endpoint answers a POST with the JSON body {"index": i, "features": [...]} of one sample with the JSON body
+# {"notification": "correct"} (and optionally "score"), and a GET on the health path once the tool is ready
+NOTIFY_PATH = '/notify'
+HEALTH_PATH = '/health'
+PERCENTILES = (50, 90, 95, 99)
+
+
+def get_free_port(host: str = HOST) -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+
+        return s.getsockname()[1]
+
+
+def encode_sample(index: int, features: np.ndarray) -> bytes:
+    return json.dumps({'index': int(index), 'features': np.asarray(features).tolist()}).encode()
+
+
+class Connection:
+    def __init__(self, host: str, port: int):
+        """
+            HTTP/1.1 connection to the endpoint, kept alive between requests unless the server closes it
+        """
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+
+        self._reader, self._writer = None, None
+
+    async def _send(self, method: str, path: str, body: bytes) -> bytes:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n")
+        self._writer.write(head.encode() + body)
+        await self._writer.drain()
+
+        return await self._reader.readline()
+
+    async def request(self, method: str, path: str, body: bytes = b'') -> Tuple[int, bytes]:
+        """
+            Sends the request and reads the response
+        :return: the status code and the body of the response
+        """
+        reused = self._writer is not None
+        status_line = await self._send(method, path, body)
+
+        if not status_line and reused:
+            # the server closed the idle connection
+            await self.close()
+            status_line = await self._send(method, path, body)
+
+        if not status_line:
+            await self.close()
+            raise ConnectionResetError(f"Connection to {self.host}:{self.port} closed without response")
+
+        status, headers = int(status_line.split()[1]), {}
+
+        while True:
+            line = await self._reader.readline()
+
+            if line in (b'\r\n', b'\n', b''):
+                break
+
+            key, value = line.decode().split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            data = await self._reader.readexactly(int(headers['content-length']))
+        else:
+            # without length, the body ends with the connection
+            data = await self._reader.read()
+
+        if headers.get('connection', '').lower() == 'close' or 'content-length' not in headers or \
+                status_line.startswith(b'HTTP/1.0') and headers.get('connection', '').lower() != 'keep-alive':
+            await self.close()
+
+        return status, data
+
+
+async def wait_until_ready(host: str, port: int, timeout: float, alive: Callable[[], bool] = None,
+                           interval: float = 0.2):
+    """
+        Polls the health path of the endpoint until it answers
+    :param alive: checks that the server is still running, a server that exits fails immediately
+    """
+    deadline = time.monotonic() + timeout
+    connection = Connection(host, port)
+
+    try:
+        while time.monotonic() < deadline:
+            if alive is not None and not alive():
+                raise TrustDNNError("The server exited before it was ready")
+
+            try:
+                status, _ = await connection.request('GET', HEALTH_PATH)
+
+                if status == 200:
+                    return
+            except (OSError, asyncio.IncompleteReadError, ValueError, IndexError):
+                await connection.close()
+
+            await asyncio.sleep(interval)
+    finally:
+        await connection.close()
+
+    raise TrustDNNError(f"The server on port {port} was not ready after {timeout}s")
+
+
+@dataclass
+class LoadResult:
+    # index of the test sample of each request, in the order the requests were issued
+    indices: np.ndarray
+    # seconds from the arrival of the request to its response, nan for failed requests
+    latencies: np.ndarray
+    notifications: List[Optional[str]]
+    duration: float
+
+    def summary(self, offline: np.ndarray = None) -> dict:
+        """
+            Latency percentiles (ms), throughput of the answered requests, and the share of the answered requests
+            with the same notification as the offline inference
+        :param offline: notification codes of the offline inference, by test sample
+        """
+        answered = ~np.isnan(self.latencies)
+        latencies = self.latencies[answered] * 1000
+        summary = {'requests': len(self.indices), 'errors': int((~answered).sum()),
+                   'duration': round(self.duration, 3),
+                   'throughput': round(answered.sum() / self.duration, 3) if self.duration > 0 else None}
+
+        summary['latency_mean'] = float(latencies.mean()) if len(latencies) else None
+
+        for percentile in PERCENTILES:
+            summary[f"latency_p{percentile}"] = float(np.percentile(latencies, percentile)) if len(latencies) else None
+
+        summary['latency_max'] = float(latencies.max()) if len(latencies) else None
+        summary['agreement'] = None
+
+        if offline is not None and answered.any():
+            import pandas as pd
+            from trustdnn.core.evaluation import encode_notifications
+
+            codes = encode_notifications(pd.Series([self.notifications[i] for i in np.flatnonzero(answered)],
+                                                   dtype=object))
+            summary['agreement'] = float(np.mean(codes == np.asarray(offline)[self.indices[answered]]))
+
+        return summary
+
+
+class LoadGenerator:
+    def __init__(self, host: str, port: int, features: Union[np.ndarray, 'pd.DataFrame'], requests: int = None,
+                 concurrency: int = 1, rate: float = None, timeout: float = 30.0, seed: int = 0):
+        """
+            Replays the test samples against the endpoint of a tool, in order and cycling over them.
+            Closed loop by default: each of the concurrent clients sends its next request once it gets a response.
+            With a rate, open loop: requests arrive as a Poisson process, independently of the responses, and wait
+            for one of the concurrent connections; their latency counts from the arrival, so the queueing of a slow
+            server is measured instead of slowing down the arrivals.
+        :param features: features of the test samples, as an array or a frame with one row per sample
+        :param requests: number of requests, one per test sample by default
+        :param concurrency: number of concurrent connections
+        :param rate: arrival rate in requests per second
+        :param timeout: seconds after which a request fails
+        :param seed: seed of the arrival times
+        """
+        self.host = host
+        self.port = port
+        self.features = np.asarray(features)
+        self.requests = requests or len(features)
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.timeout = timeout
+        self.seed = seed
+
+    async def _send(self, connection: Connection, request: int, arrival: float, latencies: np.ndarray,
+                    notifications: list):
+        index = request % len(self.features)
+        body = encode_sample(index, self.features[index])
+
+        try:
+            status, data = await asyncio.wait_for(connection.request('POST', NOTIFY_PATH, body), self.timeout)
+
+            if status == 200:
+                notifications[request] = json.loads(data)['notification']
+                latencies[request] = time.perf_counter() - arrival
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, KeyError, IndexError):
+            # the state of the connection is unknown after a failed request
+            await connection.close()
+
+    async def _closed_loop(self, latencies: np.ndarray, notifications: list):
+        requests = iter(range(self.requests))
+
+        async def client():
+            connection = Connection(self.host, self.port)
+
+            try:
+                for request in requests:
+                    await self._send(connection, request, time.perf_counter(), latencies, notifications)
+            finally:
+                await connection.close()
+
+        await asyncio.gather(*[client() for _ in range(self.concurrency)])
+
+    async def _open_loop(self, latencies: np.ndarray, notifications: list):
+        connections = asyncio.Queue()
+
+        for _ in range(self.concurrency):
+            connections.put_nowait(Connection(self.host, self.port))
+
+        async def send(request: int, arrival: float):
+            connection = await connections.get()
+
+            try:
+                await self._send(connection, request, arrival, latencies, notifications)
+            finally:
+                connections.put_nowait(connection)
+
+        arrivals = np.cumsum(np.random.default_rng(self.seed).exponential(1 / self.rate, self.requests))
+        start, tasks = time.perf_counter(), []
+
+        for request, offset in enumerate(arrivals):
+            delay = start + offset - time.perf_counter()
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            tasks.append(asyncio.ensure_future(send(request, start + offset)))
+
+        await asyncio.gather(*tasks)
+
+        while not connections.empty():
+            await connections.get_nowait().close()
+
+    async def generate(self) -> LoadResult:
+        latencies = np.full(self.requests, np.nan)
+        notifications: List[Optional[str]] = [None] * self.requests
+        start = time.perf_counter()
+
+        if self.rate:
+            await self._open_loop(latencies, notifications)
+        else:
+            await self._closed_loop(latencies, notifications)
+
+        return LoadResult(indices=np.arange(self.requests) % len(self.features), latencies=latencies,
+                          notifications=notifications, duration=time.perf_counter() - start)
+
+
+class NotificationServer:
+    def __init__(self, notify: Callable[[np.ndarray], Union[str, Tuple[str, float]]], host: str = HOST,
+                 port: int = 0):
+        """
+            Endpoint of the tools that serve in-process, answering each request with the notification of the sample
+        :param notify: function returning the notification of one sample, or the notification and its score
+        """
+        self.notify = notify
+        self.host = host
+        self._server = ThreadingHTTPServer((host, port), self._get_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def _get_handler(self) -> type:
+        notify = self.notify
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self, status: int, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == HEALTH_PATH:
+                    self._respond(200, {'status': 'ready'})
+                else:
+                    self._respond(404, {'error': f"Unknown path {self.path}"})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+                if self.path != NOTIFY_PATH:
+                    self._respond(404, {'error': f"Unknown path {self.path}"})
+                    return
+
+                try:
+                    notification = notify(np.asarray(json.loads(body)['features']))
+                except Exception as e:
+                    self._respond(500, {'error': str(e)})
+                    return
+
+                if isinstance(notification, tuple):
+                    self._respond(200, {'notification': notification[0], 'score': float(notification[1])})
+                else:
+                    self._respond(200, {'notification': notification})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+        if self._thread is not None:
+            self._thread.join()
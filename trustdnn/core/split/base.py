@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Iterator
 from pathlib import Path
 from abc import abstractmethod
 from dataclasses import dataclass
@@ -51,6 +51,22 @@ class Split:
     def labels(self, labels):
         self._labels = labels
 
+    @property
+    def size(self) -> int:
+        """
+            Number of samples in the split
+        """
+        return len(self.labels)
+
+    @abstractmethod
+    def iter_labels(self, chunk_size: int) -> Iterator[Any]:
+        """
+            Reads the labels in chunks without loading the whole file
+        :param chunk_size: number of samples per chunk
+        :return: iterator over DataFrames with the labels
+        """
+        pass
+
     @abstractmethod
     def save(self):
         pass
@@ -1,29 +1,45 @@
-import numpy as np
-import pandas as pd
+from typing import TYPE_CHECKING
 
 from trustdnn.core.split import Split
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class CSVSplit(Split):
     format = 'csv'
 
     @property
-    def features(self) -> pd.DataFrame:
+    def features(self) -> 'pd.DataFrame':
         if self._features is None:
+            import pandas as pd
+
             self._features = pd.read_csv(self.features_path, delimiter=',', encoding='utf-8',
                                          header=None if not self.headers else 'infer')
 
         return self._features
 
     @property
-    def labels(self) -> pd.DataFrame:
+    def labels(self) -> 'pd.DataFrame':
         if self._labels is None:
+            import numpy as np
+            import pandas as pd
+
             self._labels = pd.read_csv(self.labels_path, delimiter=',', dtype=np.int32, encoding='utf-8',
                                        header=None if not self.headers else 'infer')
 
         return self._labels
 
+    def iter_labels(self, chunk_size: int):
+        import numpy as np
+        import pandas as pd
+
+        yield from pd.read_csv(self.labels_path, delimiter=',', dtype=np.int32, encoding='utf-8',
+                               header=None if not self.headers else 'infer', chunksize=chunk_size)
+
     def save(self):
+        import numpy as np
+
         self.path.mkdir(parents=True, exist_ok=True)
         self._features.to_csv(self.features_path, index=False, header=self.headers)
         # TODO: should be pandas dataframe
@@ -1,6 +1,3 @@
-import numpy as np
-import pandas as pd
-
 from trustdnn.core.split.base import Split
 
 
@@ -10,6 +7,8 @@ class NPYSplit(Split):
     @property
     def features(self):
         if self._features is None:
+            import numpy as np
+
             self._features = np.load(self.features_path)
 
         return self._features
@@ -17,11 +16,34 @@ class NPYSplit(Split):
     @property
     def labels(self):
         if self._labels is None:
+            import numpy as np
+            import pandas as pd
+
             self._labels = pd.DataFrame(np.load(self.labels_path), columns=['y'])
 
         return self._labels
 
+    @property
+    def size(self) -> int:
+        if self._labels is None:
+            import numpy as np
+
+            return len(np.load(self.labels_path, mmap_mode='r'))
+
+        return len(self._labels)
+
+    def iter_labels(self, chunk_size: int):
+        import numpy as np
+        import pandas as pd
+
+        labels = np.load(self.labels_path, mmap_mode='r')
+
+        for start in range(0, len(labels), chunk_size):
+            yield pd.DataFrame(np.asarray(labels[start:start + chunk_size]), columns=['y'])
+
     def save(self):
+        import numpy as np
+
         self.path.mkdir(parents=True, exist_ok=True)
         np.save(self.features_path, self._features)
         np.save(self.labels_path, self._labels)
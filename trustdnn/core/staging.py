@@ -0,0 +1,268 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from trustdnn.core.dataset.base import Dataset
+
+# written in the staged copy of a dataset, the copy is stale once the files of the dataset change
+MANIFEST = '.staged.json'
+# seconds after which the partial copy of an interrupted staging is removed
+STALE_COPY_AGE = 3600
+
+
+def link_or_copy(source: Path, target: Path):
+    # hard links only work within a filesystem, e.g. for a local scratch dir next to the benchmark
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+def get_manifest(path: Path) -> Dict[str, list]:
+    """
+        Size and modification time of the files in the split directories of a dataset, by relative path
+    """
+    return {str(file.relative_to(path)): [file.stat().st_size, file.stat().st_mtime_ns]
+            for split in sorted(path.iterdir()) if split.is_dir()
+            for file in sorted(split.rglob('*')) if file.is_file()}
+
+
+def sync(source: Path, target: Path, missing_only: bool = False):
+    """
+        Copies the files of the source directory that differ from the target (size or modification time), each
+        replaced at once, so that readers of the target never see a partial file
+    :param missing_only: only copies the files the target does not have
+    """
+    for file in source.rglob('*'):
+        if not file.is_file():
+            continue
+
+        destination = target / file.relative_to(source)
+
+        if destination.exists():
+            if missing_only:
+                continue
+
+            stat, destination_stat = file.stat(), destination.stat()
+
+            if stat.st_size == destination_stat.st_size and stat.st_mtime_ns == destination_stat.st_mtime_ns:
+                continue
+
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = destination.with_name(f".{destination.name}.{uuid.uuid4().hex[:8]}.tmp")
+        shutil.copy2(file, tmp_path)
+        tmp_path.replace(destination)
+
+
+class Stager:
+    def __init__(self, scratch: Path, budget: int = None, log=None):
+        """
+            Stages the datasets and working directories of the instances on a fast local directory (e.g., a tmpfs).
+            Each dataset is staged once and shared by the instances using it; the staged datasets are kept across
+            runs, and the least recently used ones not in use are evicted to fit new ones within the budget. The
+            working directories are staged per session and removed by cleanup.
+        :param scratch: scratch directory
+        :param budget: bytes of staged datasets kept in the scratch directory (no budget by default)
+        :param log: logger of the application
+        """
+        self.scratch = scratch
+        self.budget = budget
+        self.log = log
+        self.datasets_path = scratch / 'datasets'
+        self.work_path = scratch / 'work' / uuid.uuid4().hex[:8]
+        # size of the staged datasets, least recently used first
+        self._staged: 'OrderedDict[str, int]' = OrderedDict()
+        self._users: Dict[str, int] = {}
+        self._datasets: Dict[str, Dataset] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self.datasets_path.mkdir(parents=True, exist_ok=True)
+
+        for path in sorted(self.datasets_path.iterdir(), key=lambda p: p.stat().st_mtime):
+            if path.suffix == '.tmp' or not (path / MANIFEST).exists():
+                # copies of other processes are only removed once they are too old to be in progress
+                if time.time() - path.stat().st_mtime > STALE_COPY_AGE:
+                    shutil.rmtree(path, ignore_errors=True)
+
+                continue
+
+            with (path / MANIFEST).open() as f:
+                self._staged[path.name] = sum(size for size, _ in json.load(f)['files'].values())
+
+    @property
+    def used(self) -> int:
+        return sum(self._staged.values())
+
+    @staticmethod
+    def get_key(dataset: Dataset) -> str:
+        # datasets of different benchmarks may share a name
+        return f"{dataset.name}-{hashlib.sha1(str(dataset.path.resolve()).encode()).hexdigest()[:10]}"
+
+    def _warn(self, message: str):
+        if self.log:
+            self.log.warning(message)
+
+    def _remove(self, key: str):
+        shutil.rmtree(self.datasets_path / key, ignore_errors=True)
+        self._staged.pop(key, None)
+        self._datasets.pop(key, None)
+
+    def _reserve(self, key: str, size: int) -> bool:
+        """
+            Evicts the least recently used datasets not in use until the dataset fits in the budget
+        """
+        if self.budget is not None:
+            for staged in list(self._staged):
+                if self.used + size <= self.budget:
+                    break
+
+                if not self._users.get(staged):
+                    self._remove(staged)
+
+            if self.used + size > self.budget:
+                return False
+
+        self._staged[key] = size
+
+        return True
+
+    def _is_fresh(self, key: str, manifest: dict) -> bool:
+        with (self.datasets_path / key / MANIFEST).open() as f:
+            return json.load(f)['files'] == manifest
+
+    def stage_dataset(self, dataset: Dataset) -> Dataset:
+        """
+            The staged copy of the dataset, staged on first use. Must be released with release_dataset.
+        :return: the staged dataset, or the dataset itself if it cannot be staged
+        """
+        key = self.get_key(dataset)
+
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        # instances of the same dataset wait for the copy of the first one
+        with lock:
+            manifest = get_manifest(dataset.path)
+
+            with self._lock:
+                if key in self._staged and not self._is_fresh(key, manifest):
+                    if self._users.get(key):
+                        self._warn(f"Dataset {dataset.name} changed while staged, using it from {dataset.path}")
+                        return dataset
+
+                    self._remove(key)
+
+                if key in self._staged:
+                    self._staged.move_to_end(key)
+                    self._users[key] = self._users.get(key, 0) + 1
+
+                    if key not in self._datasets:
+                        self._datasets[key] = Dataset(self.datasets_path / key / dataset.name)
+
+                    return self._datasets[key]
+
+                size = sum(size for size, _ in manifest.values())
+
+                if not self._reserve(key, size):
+                    self._warn(f"Dataset {dataset.name} ({size} bytes) does not fit in the staging budget, using it "
+                               f"from {dataset.path}")
+                    return dataset
+
+                self._users[key] = 1
+
+            try:
+                tmp_path = self.datasets_path / f"{key}.{uuid.uuid4().hex[:8]}.tmp"
+
+                for relative in manifest:
+                    target = tmp_path / dataset.name / relative
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    link_or_copy(dataset.path / relative, target)
+
+                with (tmp_path / MANIFEST).open('w') as f:
+                    json.dump({'source': str(dataset.path), 'files': manifest}, f)
+
+                try:
+                    tmp_path.rename(self.datasets_path / key)
+                except OSError:
+                    # staged by another process in the meantime
+                    if not self._is_fresh(key, manifest):
+                        raise
+
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+            except OSError as e:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+
+                with self._lock:
+                    self._users.pop(key, None)
+                    self._staged.pop(key, None)
+
+                self._warn(f"Could not stage dataset {dataset.name}, using it from {dataset.path}: {e}")
+                return dataset
+
+            with self._lock:
+                self._datasets[key] = Dataset(self.datasets_path / key / dataset.name)
+
+                return self._datasets[key]
+
+    def release_dataset(self, dataset: Dataset, staged: Dataset):
+        """
+            Releases the staged copy of the dataset, which is kept until it is evicted
+        :param dataset: the original dataset
+        :param staged: the dataset returned by stage_dataset
+        """
+        if staged is dataset:
+            return
+
+        key = self.get_key(dataset)
+
+        with self._lock:
+            if self._users.get(key):
+                self._users[key] -= 1
+                # the time of the last use orders the datasets staged by previous runs
+                os.utime(self.datasets_path / key)
+
+    def get_working_dir(self, working_dir: Path) -> Path:
+        return self.work_path / working_dir.resolve().relative_to(working_dir.resolve().anchor)
+
+    def stage_working_dir(self, working_dir: Path) -> Path:
+        """
+            The staged working directory, with the files of the working directory it does not have yet, such as the
+            output of the analysis when staged for the inference
+        """
+        staged = self.get_working_dir(working_dir)
+        staged.mkdir(parents=True, exist_ok=True)
+        sync(working_dir, staged, missing_only=True)
+
+        return staged
+
+    def copy_back(self, staged: Path, working_dir: Path):
+        """
+            Copies the files written in the staged working directory back to the working directory
+        """
+        sync(staged, working_dir)
+
+    def cleanup(self):
+        """
+            Removes the staged working directories of the session, once copied back
+        """
+        shutil.rmtree(self.work_path, ignore_errors=True)
+
+    def map_path(self, path: Optional[Path], staged: Path, working_dir: Path) -> Optional[Path]:
+        """
+            The path in the working directory of a path in the staged working directory
+        """
+        if path is None or not Path(path).is_relative_to(staged):
+            return path
+
+        return working_dir / Path(path).relative_to(staged)
@@ -0,0 +1,51 @@
+import numpy as np
+
+# scales the MAD to be a consistent estimator of the standard deviation for normal data
+MAD_SCALE = 1.4826
+
+
+def mad_outliers(values: np.ndarray, threshold: float = 3.5) -> np.ndarray:
+    """
+        Flags outliers by their distance to the median in units of the median absolute deviation (MAD)
+    :param values: values to check
+    :param threshold: maximum distance in (scaled) MADs
+    :return: boolean mask with the outliers
+    """
+    values = np.asarray(values, dtype=float)
+
+    if len(values) < 3:
+        return np.zeros(len(values), dtype=bool)
+
+    median = np.median(values)
+    mad = MAD_SCALE * np.median(np.abs(values - median))
+
+    if mad == 0:
+        return np.zeros(len(values), dtype=bool)
+
+    return np.abs(values - median) / mad > threshold
+
+
+def permutation_test(a: np.ndarray, b: np.ndarray, n_resamples: int = 10000, seed: int = 0) -> float:
+    """
+        Two-sided permutation test for the difference in means of two independent samples. All permutations are
+        drawn at once as a matrix of shuffled indices.
+    :param a: first sample
+    :param b: second sample
+    :param n_resamples: number of permutations
+    :param seed: seed for the random generator
+    :return: p-value, NaN if any of the samples has less than two values
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+
+    if len(a) < 2 or len(b) < 2:
+        return np.nan
+
+    pooled = np.concatenate([a, b])
+    observed = abs(b.mean() - a.mean())
+    rng = np.random.default_rng(seed)
+    permutations = pooled[np.argsort(rng.random((n_resamples, len(pooled))), axis=1)]
+    differences = np.abs(permutations[:, len(a):].mean(axis=1) - permutations[:, :len(a)].mean(axis=1))
+
+    # the observed arrangement counts as one of the permutations
+    return float((np.sum(differences >= observed - 1e-12) + 1) / (n_resamples + 1))
@@ -0,0 +1,59 @@
+import pandas as pd
+
+from typing import Dict
+
+# a configuration of the tool on a model
+CONFIGURATION = ['tool', 'benchmark', 'dataset', 'model', 'batch_size', 'threads']
+
+
+def pareto_front(memory: pd.Series, throughput: pd.Series) -> pd.Series:
+    """
+        Flags the points no other point dominates, with less or as much memory for a higher throughput, or with less
+        memory for as much throughput
+    :param memory: peak memory of the points
+    :param throughput: throughput of the points
+    :return: boolean series aligned with the points
+    """
+    order = pd.DataFrame({'memory': memory, 'throughput': throughput}).sort_values(['memory', 'throughput'],
+                                                                                   ascending=[True, False])
+    front, best = pd.Series(False, index=memory.index), float('-inf')
+
+    for index, row in order.iterrows():
+        if row['throughput'] > best:
+            front[index] = True
+            best = row['throughput']
+
+    return front
+
+
+def summarize_sweep(executions: pd.DataFrame, samples: Dict[str, int]) -> pd.DataFrame:
+    """
+        Median duration and peak memory of the successful runs of each configuration, the samples per second they
+        infer, and whether the configuration is on the throughput-memory Pareto front of the tool on the model
+    :param executions: executions of the sweep, with the batch_size and threads of each run
+    :param samples: number of test samples of each dataset
+    :return: one row per configuration
+    """
+    executions = executions[executions['status'] == 'success'].copy()
+
+    if executions.empty:
+        return pd.DataFrame(columns=CONFIGURATION + ['runs', 'duration', 'mem_peak', 'throughput', 'pareto'])
+
+    if 'threads' not in executions:
+        # sweeps saved without their thread counts, each run was pinned to as many cores
+        executions['threads'] = executions['cores']
+
+    if 'batch_size' not in executions:
+        executions['batch_size'] = None
+
+    summary = executions.groupby(CONFIGURATION, dropna=False).agg(runs=('duration', 'size'),
+                                                                  duration=('duration', 'median'),
+                                                                  mem_peak=('mem_peak', 'median')).reset_index()
+    # runs shorter than the resolution of the durations have no throughput
+    summary['throughput'] = summary['dataset'].map(samples) / summary['duration'].where(summary['duration'] > 0)
+    summary['pareto'] = False
+
+    for _, group in summary.groupby(['tool', 'model']):
+        summary.loc[group.index, 'pareto'] = pareto_front(group['mem_peak'], group['throughput'])
+
+    return summary
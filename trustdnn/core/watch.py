@@ -0,0 +1,99 @@
+import io
+import json
+
+from pathlib import Path
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class LineFollower:
+    def __init__(self, path: Path):
+        """
+            Reads the lines appended to a file since the last read, from the offset where it stopped
+        :param path: path to the file
+        """
+        self.path = path
+        self.offset = 0
+
+    def read(self) -> List[str]:
+        """
+            Complete lines appended since the last read, a line being written is read once it is complete
+        """
+        if not self.path.exists():
+            return []
+
+        if self.path.stat().st_size < self.offset:
+            # the file was replaced by a shorter one
+            self.offset = 0
+
+        with self.path.open('rb') as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        end = data.rfind(b'\n') + 1
+        self.offset += end
+
+        return data[:end].decode(errors='replace').splitlines()
+
+
+class ExecutionFollower:
+    def __init__(self, working_dir: Path):
+        """
+            Follows the executions of a working directory as they are saved: the attempts in journal.jsonl, keeping
+            the last attempt of the measured runs, or the rows of executions.csv for campaigns without journal
+        :param working_dir: working directory of the campaign
+        """
+        self.journal = LineFollower(working_dir / 'journal.jsonl')
+        self.executions = LineFollower(working_dir / 'executions.csv')
+        self._header = None
+        self._rows = 0
+
+    def _read_journal(self) -> List[dict]:
+        entries = [json.loads(line) for line in self.journal.read() if line.strip()]
+
+        # retried, re-queued and warm-up attempts are not saved as executions
+        return [entry for entry in entries if entry.get('retry_in') is None and not entry.get('requeued') and
+                entry.get('repetition') is not None]
+
+    def _read_executions(self) -> 'pd.DataFrame':
+        import pandas as pd
+
+        with self.executions.path.open() as f:
+            header = f.readline()
+
+        if self.executions.path.stat().st_size < self.executions.offset:
+            # replaced by the executions of a new campaign
+            self._header, self._rows = None, 0
+
+        if header != self._header:
+            # the file is rewritten on each save, new columns change the header and the offsets of the rows
+            self._header = header
+            self.executions.offset = len(header.encode())
+            skip = self._rows
+        else:
+            skip = 0
+
+        lines = self.executions.read()[skip:]
+
+        if not lines:
+            return pd.DataFrame()
+
+        self._rows += len(lines)
+
+        return pd.read_csv(io.StringIO(header + '\n'.join(lines) + '\n'), index_col=False)
+
+    def read(self) -> 'pd.DataFrame':
+        """
+            Executions saved since the last read
+        """
+        import pandas as pd
+
+        if self.journal.path.exists():
+            return pd.DataFrame(self._read_journal())
+
+        if self.executions.path.exists():
+            return self._read_executions()
+
+        return pd.DataFrame()
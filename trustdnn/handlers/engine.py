@@ -0,0 +1,280 @@
+import os
+import time
+import shlex
+import signal
+import asyncio
+
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Tuple
+from datetime import datetime, timezone
+
+from trustdnn.core.objects import Execution, Job
+from trustdnn.core.scheduler import MemoryScheduler
+from trustdnn.handlers.instance import InstanceHandler, get_peak_memory, get_process_and_children_memory, \
+    partition_cores
+
+# lines longer than the default limit of the stream readers (64 KiB) would break the log capture
+STREAM_LIMIT = 2 ** 20
+
+
+@dataclass
+class RunningJob:
+    job: Job
+    process: object
+    # memory reserved in the scheduler for the job
+    reserved: int
+    memory_usage: List[int] = field(default_factory=list)
+    exceeded: bool = False
+
+
+class AsyncEngine:
+    def __init__(self, log, parallel: int = 1, timeout: float = None, interval: float = 0.2, budget: int = None,
+                 pinning: bool = False):
+        """
+            Runs the jobs as subprocesses from a single event loop: their logs are streamed to the log files, the
+            memory of all running jobs is sampled by one task, and jobs exceeding the timeout are killed.
+            Under a memory budget, jobs are admitted by their estimated peak memory (Job.memory), and a job
+            exceeding its estimate while sharing the budget is killed and re-queued with a larger estimate.
+            With pinning, the cores are split among the concurrent jobs, each job runs on its own set of cores with
+            the thread pools of its libraries sized to it.
+        :param log: logger of the application
+        :param parallel: maximum number of jobs running at the same time
+        :param timeout: seconds after which a job is killed (no timeout by default)
+        :param interval: seconds between memory samples
+        :param budget: memory budget in bytes shared by the running jobs (no budget by default)
+        :param pinning: pins the jobs without cores to a partition of the available cores, when running more than
+            one job at a time
+        """
+        self.log = log
+        self.parallel = parallel
+        self.timeout = timeout
+        self.interval = interval
+        self.budget = budget
+        self.pinning = pinning
+        # core sets and the number of jobs running on each
+        self._core_sets: List[List[int]] = []
+        self._core_users: List[int] = []
+        self._running: Dict[int, RunningJob] = {}
+        self._scheduler = None
+
+    def _check_memory(self, pid: int, running: RunningJob, rss: int):
+        if not self.budget or running.job.memory is None or rss <= running.reserved or running.exceeded:
+            return
+
+        if self._scheduler.running > 1:
+            # the other jobs were admitted on the estimate, the job is retried once there is room for it
+            self.log.warning(f"Killed for exceeding its estimated memory ({running.reserved} bytes): "
+                             f"{running.job.command}")
+            running.exceeded = True
+            self._kill(pid)
+        else:
+            # alone it puts no other job at risk, its reservation grows so that no job is admitted on the estimate
+            self._scheduler.resize(running.reserved, rss)
+            running.reserved = rss
+
+    def _sample_job(self, pid: int, running: RunningJob, final: bool = False):
+        import psutil
+
+        try:
+            rss = get_process_and_children_memory(running.process)['rss']
+
+            if final:
+                # the jobs shorter than the interval are seen by this sample only, the peak of the job covers them
+                rss = max(rss, get_peak_memory(running.process) or 0)
+        except psutil.NoSuchProcess:
+            return
+
+        running.memory_usage.append(rss)
+
+        if not final:
+            self._check_memory(pid, running, rss)
+
+    async def _sample(self):
+        while True:
+            for pid, running in list(self._running.items()):
+                self._sample_job(pid, running)
+
+            await asyncio.sleep(self.interval)
+
+    async def _stream(self, stream: asyncio.StreamReader, path: Path, callback: Callable):
+        with path.open('a') as f:
+            async for line in stream:
+                line = line.decode(errors='replace')
+                f.write(line)
+                callback(line.rstrip('\n'))
+
+    def _kill(self, pid: int):
+        # the job runs in its own session, so the shell and the tool are killed together
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def _acquire_cores(self, job: Job) -> Tuple[List[int], int]:
+        if job.cores or not self._core_sets:
+            return job.cores, -1
+
+        # there are more sets than jobs unless parallel exceeds the cores, then the sets are shared
+        index = self._core_users.index(min(self._core_users))
+        self._core_users[index] += 1
+
+        return self._core_sets[index], index
+
+    async def _execute(self, job: Job) -> Tuple[Execution, bool]:
+        import psutil
+
+        self.log.info(f"Executing: {job.command}")
+        timestamp = int(datetime.now(timezone.utc).timestamp())
+        start_time = time.time()
+        cores, core_set = self._acquire_cores(job)
+
+        try:
+            process = await asyncio.create_subprocess_exec(*shlex.split(job.command), cwd=job.cwd,
+                                                           env=InstanceHandler.get_environment(cores, job.env),
+                                                           stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.PIPE,
+                                                           start_new_session=True, limit=STREAM_LIMIT)
+        except BaseException:
+            self._release_cores(core_set)
+            raise
+
+        InstanceHandler.set_affinity(process.pid, cores)
+
+        running = None
+
+        try:
+            running = RunningJob(job=job, process=psutil.Process(process.pid), reserved=job.memory or 0)
+            self._running[process.pid] = running
+            self._sample_job(process.pid, running)
+        except psutil.NoSuchProcess:
+            pass
+
+        timed_out = False
+        # concurrent jobs share the log directory, their logs are told apart by the job name
+        log_name = f"{timestamp}.{job.name}" if job.name else str(timestamp)
+
+        async def wait():
+            await asyncio.gather(self._stream(process.stdout, job.log_path / f"{log_name}.stdout", self.log.info),
+                                 self._stream(process.stderr, job.log_path / f"{log_name}.stderr", self.log.error))
+
+            if running:
+                # the streams close as the job exits, the last sample is taken before the job is reaped
+                self._sample_job(process.pid, running, final=True)
+
+            await process.wait()
+
+        try:
+            await asyncio.wait_for(wait(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.log.error(f"Killed after {self.timeout}s: {job.command}")
+            timed_out = True
+            self._kill(process.pid)
+            await process.wait()
+        except BaseException:
+            # cancelled (e.g., Ctrl-C, which does not reach the session of the job) or failed, the job is not left
+            # running without the engine
+            self._kill(process.pid)
+            await process.wait()
+            raise
+        finally:
+            self._running.pop(process.pid, None)
+            self._release_cores(core_set)
+
+            if running and running.reserved != (job.memory or 0):
+                # the reservation is released as the estimate it was admitted with
+                self._scheduler.resize(running.reserved, job.memory or 0)
+
+        duration = round(time.time() - start_time, 2)
+        return_code = process.returncode if process.returncode is not None else -1
+        memory_usage = running.memory_usage if running else []
+        execution = InstanceHandler.get_execution(timestamp, job.output, duration, return_code, memory_usage)
+        execution.cores = len(cores) if cores else None
+        execution.stderr = job.log_path / f"{log_name}.stderr"
+
+        if timed_out:
+            execution.status = 'timeout'
+        elif running and running.exceeded:
+            execution.status = 'exceeded'
+
+        return execution, bool(running and running.exceeded)
+
+    def _release_cores(self, core_set: int):
+        if core_set >= 0:
+            self._core_users[core_set] -= 1
+
+    async def execute(self, job: Job, on_requeue: Callable[[Execution], None] = None) -> Execution:
+        """
+            Runs the job once the scheduler admits it. A job killed for exceeding its estimated memory is re-queued
+            with the estimate doubled (at least its observed peak), until it is admitted alone.
+        :param job: the job
+        :param on_requeue: called with the execution of each attempt killed for exceeding its estimate
+        :return: the execution of the last attempt
+        """
+        while True:
+            estimate = job.memory or 0
+            await self._scheduler.acquire(estimate, job.exclusive)
+
+            try:
+                execution, exceeded = await self._execute(job)
+            finally:
+                self._scheduler.release(estimate)
+
+            if not exceeded:
+                return execution
+
+            if on_requeue:
+                on_requeue(execution)
+
+            job.memory = int(min(self.budget, max(2 * estimate, execution.mem_peak)))
+            self.log.info(f"Re-queued with an estimate of {job.memory} bytes: {job.command}")
+
+    async def execute_call(self, job: Job, call: Callable[[], Execution]) -> Execution:
+        """
+            Runs a blocking call, such as the in-process API of a tool, in a thread once the scheduler admits it
+            alone: the call shares the memory and the interpreter of the engine with the sampled jobs. A call
+            exceeding the timeout cannot be killed, it keeps its reservation until it returns.
+        :param job: the job the call runs, its output and estimated memory (Job.memory)
+        :param call: returns the execution of the job
+        :return: the execution of the call, or a timed out execution
+        """
+        estimate = job.memory or 0
+        await self._scheduler.acquire(estimate, exclusive=True)
+        timestamp = int(datetime.now(timezone.utc).timestamp())
+        start_time = time.time()
+        future = asyncio.get_running_loop().run_in_executor(None, call)
+        future.add_done_callback(lambda _: self._scheduler.release(estimate))
+
+        try:
+            # shielded, so that the reservation is released by the thread and not by the cancellation
+            return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.log.error(f"Timed out after {self.timeout}s, waiting for the call to return: {job.command}")
+            execution = InstanceHandler.get_execution(timestamp, job.output, round(time.time() - start_time, 2), -1,
+                                                      [])
+            execution.status = 'timeout'
+
+            return execution
+
+    async def _run(self, tasks: Iterable[Callable[[], Awaitable]]) -> list:
+        self._scheduler = MemoryScheduler(budget=self.budget, parallel=self.parallel)
+
+        # a job running alone keeps all the cores and the default thread pools
+        if self.pinning and self.parallel > 1:
+            self._core_sets = partition_cores(self.parallel)
+            self._core_users = [0] * len(self._core_sets)
+        sampler = asyncio.create_task(self._sample())
+
+        try:
+            return await asyncio.gather(*(task() for task in tasks))
+        finally:
+            sampler.cancel()
+
+    def run(self, tasks: Iterable[Callable[[], Awaitable]]) -> list:
+        """
+            Runs the tasks concurrently in a new event loop. Tasks are coroutine functions that call execute, the
+            number of jobs running at the same time is bounded by parallel and by the memory budget.
+        :param tasks: coroutine functions
+        :return: the results of the tasks
+        """
+        return asyncio.run(self._run(tasks))
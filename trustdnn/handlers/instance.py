@@ -1,17 +1,22 @@
+import os
 import time
+import traceback
 import subprocess
-import psutil
 import threading
 
 from pathlib import Path
 from cement import Handler
-from typing import Callable, Union
+from typing import Callable, Dict, List, Optional, Union
 from datetime import datetime, timezone
 from statistics import median, mean
 
-from trustdnn.core.objects import Execution, Instance
+from trustdnn.core.objects import Execution, Instance, Job
 from trustdnn.core.interfaces import HandlersInterface
 
+# variables read by the numerical libraries of the tools for the size of their thread pools
+THREAD_VARIABLES = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS',
+                    'VECLIB_MAXIMUM_THREADS', 'TF_NUM_INTRAOP_THREADS']
+
 
 def monitor_process(process, stdout_file, stderr_file, stdout_callback=None, stderr_callback=None):
     for line in process.stdout:
@@ -44,41 +49,215 @@ def get_process_and_children_memory(process):
         return memory_info_dict
 
 
-def get_memory_usage(p, memory_usage_callback):
-    while True:
+def get_peak_memory(process) -> Optional[int]:
+    """
+        Peak RSS of the process in bytes (VmHWM), None where /proc is not available or the process exited
+    """
+    try:
+        with open(f"/proc/{process.pid}/status") as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return None
+
+
+def get_memory_usage(p, memory_usage_callback, stop: threading.Event = None, children: bool = True):
+    import psutil
+
+    # without a stop event, samples until the process finishes
+    stop = stop or threading.Event()
+
+    while not stop.is_set():
         try:
             # Memory usage
-            memory_info = get_process_and_children_memory(p)
+            memory_info = get_process_and_children_memory(p) if children else p.memory_info()._asdict()
             memory_usage_callback(memory_info['rss'])
-            time.sleep(0.2)
+            stop.wait(0.2)
 
         except psutil.NoSuchProcess:
             break
 
 
+def get_available_cores() -> List[int]:
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cores(parts: int, cores: List[int] = None) -> List[List[int]]:
+    """
+        Splits the cores into disjoint sets of contiguous cores, one per concurrent job
+    :param parts: number of concurrent jobs, capped at the number of cores
+    :param cores: cores to split (defaults to the cores available to the current process)
+    """
+    cores = cores or get_available_cores()
+    parts = max(1, min(parts, len(cores)))
+    size, extra = divmod(len(cores), parts)
+    sets, start = [], 0
+
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        sets.append(cores[start:end])
+        start = end
+
+    return sets
+
+
 class InstanceHandler(HandlersInterface, Handler):
     class Meta:
         label = 'instance'
 
     def __init__(self, **kw):
         super().__init__(**kw)
+        self.stager = None
+
+    def enable_staging(self, scratch: Path, budget: int = None):
+        """
+            Stages the datasets and working directories of the instances on the scratch directory
+        :param scratch: scratch directory, on a tmpfs or a local disk
+        :param budget: bytes of staged datasets kept in the scratch directory
+        """
+        from trustdnn.core.staging import Stager
+
+        self.stager = Stager(scratch, budget=budget, log=self.app.log)
+
+    def stage(self, instance: Instance) -> Instance:
+        """
+            The instance on the staged dataset, with the staged working directory. Must be released with unstage.
+        """
+        if self.stager is None:
+            return instance
+
+        dataset = self.stager.stage_dataset(instance.dataset)
+        working_dir = self.stager.stage_working_dir(instance.working_dir)
+
+        return Instance(dataset=dataset, model=instance.model, working_dir=working_dir, phase=instance.phase)
+
+    def unstage(self, staged: Instance, instance: Instance):
+        """
+            Releases the staged dataset and copies the outputs of the staged instance back to its working directory
+        """
+        if self.stager is None or staged is instance:
+            return
+
+        self.stager.release_dataset(instance.dataset, staged.dataset)
+        self.stager.copy_back(staged.working_dir, instance.working_dir)
 
     def __call__(self, instance: Instance, command_call: Callable, sub_command_call: Callable,
-                 tool_path: Path) -> Union[Execution, None]:
-        out_path, sub_command = sub_command_call(instance.model, instance.dataset, instance.working_dir)
+                 tool_path: Path, force: bool = False, in_process_call: Callable = None) -> Union[Execution, None]:
+        job = self.get_job(instance, command_call, sub_command_call, tool_path, force)
+
+        if job is None:
+            return None
+
+        if in_process_call:
+            execution = self.execute_in_process(in_process_call, instance, job.log_path, output=job.output)
+        else:
+            execution = self._execute(job.command, job.log_path, output=job.output, cwd=job.cwd, stdout=True,
+                                      stderr=True, env=job.env, cores=job.cores)
+
+        self.settle_output(job.output, success=execution.status == 'success')
+
+        return execution
+
+    @staticmethod
+    def get_environment(cores: Optional[List[int]], env: Dict[str, str] = None) -> Optional[Dict[str, str]]:
+        """
+            Environment of a job pinned to the cores, with the thread pools of its libraries limited to their number
+        """
+        if not cores:
+            return env
+
+        env = dict(os.environ if env is None else env)
+        env.update({variable: str(len(cores)) for variable in THREAD_VARIABLES})
+        env['TF_NUM_INTEROP_THREADS'] = '1'
+
+        return env
+
+    @staticmethod
+    def set_affinity(pid: int, cores: Optional[List[int]]):
+        """
+            Pins the spawned process and the children it started so far to the cores, the children it starts later
+            inherit them. Set after the spawn, since running code in the child before the exec (preexec_fn) is not
+            safe in a process with threads.
+        """
+        import psutil
+
+        if not cores:
+            return
+
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+
+        for p in processes:
+            try:
+                p.cpu_affinity(cores)
+            except (psutil.NoSuchProcess, AttributeError):
+                # finished already, or no affinity on the platform
+                pass
+
+    @staticmethod
+    def get_previous_output(output: Path) -> Path:
+        return output.with_name(f"{output.name}.prev")
+
+    @staticmethod
+    def set_aside(output: Path):
+        """
+            Moves the output of the previous run aside until the run replacing it succeeds
+        """
+        output.replace(InstanceHandler.get_previous_output(output))
+
+    @staticmethod
+    def settle_output(output: Optional[Path], success: bool):
+        """
+            Removes the output set aside once the run replacing it succeeds, and restores it otherwise
+        """
+        if output is None:
+            return
+
+        previous = InstanceHandler.get_previous_output(output)
+
+        if not previous.exists():
+            return
+
+        if success:
+            previous.unlink()
+        else:
+            previous.replace(output)
+
+    @staticmethod
+    def get_job(instance: Instance, command_call: Callable, sub_command_call: Callable, tool_path: Path,
+                force: bool = False, **kwargs) -> Union[Job, None]:
+        """
+            Builds the job that runs the tool on the instance, None if its output exists and is not replaced. The
+            kwargs are passed to the sub-command of the tool.
+        """
+        out_path, sub_command = sub_command_call(instance.model, instance.dataset, instance.working_dir, **kwargs)
         command = command_call(sub_command)
 
+        if force and out_path and out_path.exists():
+            # the output of the previous run is moved aside, otherwise the run is skipped
+            InstanceHandler.set_aside(out_path)
+
         if out_path and not out_path.exists():
-            return self._execute(command, instance.working_dir.parent, output=out_path, cwd=tool_path, stdout=True,
-                                 stderr=True)
+            return Job(command=command, output=out_path, log_path=instance.working_dir.parent, cwd=tool_path,
+                       name=instance.model.name)
 
         return None
 
     def _execute(self, command: str, log_path: Path, output: Path, cwd: Path, stdout: bool = False,
-                 stderr: bool = False) -> Execution:
+                 stderr: bool = False, env: Dict[str, str] = None, cores: List[int] = None) -> Execution:
         """
             Function to run shell commands
         """
+        import psutil
 
         self.app.log.info(f"Executing: {command}")
         timestamp = int(datetime.now(timezone.utc).timestamp())
@@ -91,7 +270,8 @@ class InstanceHandler(HandlersInterface, Handler):
 
         # Execute the command with stdout redirected to a pipe
         process = psutil.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                               text=True, cwd=cwd)
+                               text=True, cwd=cwd, env=self.get_environment(cores, env))
+        self.set_affinity(process.pid, cores)
 
         #p = psutil.Process(process.pid)
         # Start monitoring CPU and memory usage
@@ -111,6 +291,56 @@ class InstanceHandler(HandlersInterface, Handler):
 
         duration = round(time.time() - start_time, 2)
         return_code = process.returncode if process.returncode is not None else -1
+        execution = self.get_execution(timestamp, output, duration, return_code, memory_usage)
+        execution.cores = len(cores) if cores else None
+        execution.stderr = stderr_file
+
+        return execution
+
+    def execute_in_process(self, call: Callable, instance: Instance, log_path: Path, output: Path) -> Execution:
+        """
+            Runs the in-process API of a tool under the same instrumentation as the commands. The memory usage is the
+            increase of the RSS of the current process over its RSS before the call, the children of the process
+            (e.g., the jobs of the engine) are not counted.
+        """
+        import psutil
+
+        self.app.log.info(f"Executing in-process: {call.__qualname__} on {instance}")
+        timestamp = int(datetime.now(timezone.utc).timestamp())
+        process = psutil.Process()
+        baseline = process.memory_info().rss
+        memory_usage = []
+        stop = threading.Event()
+
+        thread = threading.Thread(target=get_memory_usage, args=(process, lambda rss: memory_usage.append(
+            max(rss - baseline, 0)), stop), kwargs={'children': False})
+        start_time = time.time()
+        thread.start()
+
+        try:
+            call(instance.model, instance.dataset, instance.working_dir)
+            return_code = 0
+        except Exception as e:
+            self.app.log.error(f"{call.__qualname__} failed: {e}")
+            return_code = 1
+
+            with (log_path / f"{timestamp}.stderr").open('a') as f:
+                traceback.print_exc(file=f)
+        finally:
+            stop.set()
+            thread.join()
+
+        duration = round(time.time() - start_time, 2)
+        execution = self.get_execution(timestamp, output, duration, return_code, memory_usage)
+        execution.stderr = log_path / f"{timestamp}.stderr"
+
+        return execution
+
+    @staticmethod
+    def get_execution(timestamp: int, output: Path, duration: float, return_code: int,
+                      memory_usage: list) -> Execution:
+        # processes that exit before the first sample have no memory usage
+        memory_usage = memory_usage or [0]
         # Calculate average memory usage
         mem_mean = mean(memory_usage)
         mem_median = median(memory_usage)
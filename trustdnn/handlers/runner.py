@@ -0,0 +1,346 @@
+import uuid
+import asyncio
+import functools
+
+from pathlib import Path
+from dataclasses import dataclass, fields
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
+
+from trustdnn.core.objects import Execution, Instance, Job
+from trustdnn.handlers.tool import ToolPlugin
+
+
+@dataclass
+class RunOptions:
+    """
+        Options of the executions, named as the options of the execute command
+    """
+    repeat: int = 1
+    warmup: int = 0
+    in_process: bool = False
+    parallel: int = 1
+    timeout: float = None
+    memory_budget: float = None
+    no_pinning: bool = False
+    retries: int = 0
+    backoff: float = 5.0
+    retry_alone: bool = False
+    shrink_batch: bool = False
+    stage: str = None
+    stage_budget: float = None
+
+    @classmethod
+    def from_args(cls, args) -> 'RunOptions':
+        """
+            Options from the parsed arguments, or any object with the same attributes
+        """
+        return cls(**{f.name: getattr(args, f.name) for f in fields(cls) if getattr(args, f.name, None) is not None})
+
+
+class Runner:
+    def __init__(self, app, working_dir: Path, options: RunOptions):
+        """
+            Runs the instances of one or more tools as a single workload: all executions share the engine, its memory
+            budget and its cores, and are saved to the executions.csv and journal.jsonl of the working directory.
+        :param app: the application
+        :param working_dir: working directory of the campaign
+        :param options: options of the executions
+        """
+        from trustdnn.handlers.engine import AsyncEngine
+        from trustdnn.core.failures import RetryPolicy
+        from trustdnn.core.journal import Journal
+
+        self.app = app
+        self.working_dir = working_dir
+        self.options = options
+        self.instance_handler = app.handler.get('handlers', 'instance', setup=True)
+        self.budget = int(options.memory_budget * 1024 ** 3) if options.memory_budget else None
+        self.engine = AsyncEngine(app.log, parallel=options.parallel, timeout=options.timeout, budget=self.budget,
+                                  pinning=not options.no_pinning)
+        self.executions = self.load_executions() if self.budget else None
+        self.journal = Journal(working_dir / "journal.jsonl")
+        self.policy = RetryPolicy(retries=options.retries, backoff=options.backoff, alone=options.retry_alone,
+                                  shrink_batch=options.shrink_batch)
+        # outputs of previous runs are only replaced when measuring several runs
+        self.force = options.repeat > 1 or options.warmup > 0
+        self._in_process_calls = {}
+        # outputs are copied back from the staging directory while the other executions run
+        self._copier = None
+        self._copies = []
+
+        if options.stage:
+            from concurrent.futures import ThreadPoolExecutor
+
+            self.instance_handler.enable_staging(Path(options.stage).expanduser(),
+                                                 budget=int(options.stage_budget * 1024 ** 3)
+                                                 if options.stage_budget else None)
+            self._copier = ThreadPoolExecutor(max_workers=2)
+
+        if options.in_process and options.parallel > 1:
+            app.log.warning("In-process executions run one at a time")
+
+    def load_executions(self):
+        path = self.working_dir / "executions.csv"
+
+        if not path.exists():
+            return None
+
+        import pandas as pd
+
+        return pd.read_csv(path, index_col=False)
+
+    def get_execution_row(self, tool: ToolPlugin, benchmark: str, instance: Instance, execution: Execution,
+                          **columns) -> dict:
+        row = {**execution.to_dict(), **columns}
+        row['tool'] = tool.name
+        row['benchmark'] = benchmark
+        row['dataset'] = instance.dataset.name
+        row['model'] = instance.model.name
+        row['phase'] = instance.phase
+        row['output'] = str(row['output'])
+
+        return row
+
+    def save_execution(self, tool: ToolPlugin, benchmark: str, instance: Instance, execution: Execution,
+                       **columns):
+        if execution.status == 'exists':
+            return
+
+        path = self.working_dir / "executions.csv"
+        execution = self.get_execution_row(tool, benchmark, instance, execution, **columns)
+
+        import pandas as pd
+
+        if path.exists():
+            executions = pd.read_csv(path, index_col=False)
+            executions = pd.concat([executions, pd.DataFrame([execution])], ignore_index=True)
+        else:
+            executions = pd.DataFrame([execution])
+
+        executions.to_csv(path, index=False)
+
+    def get_in_process_call(self, tool: ToolPlugin, phase: str) -> Optional[Callable]:
+        if not self.options.in_process:
+            return None
+
+        if (tool.name, phase) not in self._in_process_calls:
+            if tool.runs_in_process(phase):
+                self._in_process_calls[(tool.name, phase)] = getattr(tool, phase)
+            else:
+                self.app.log.warning(f"{tool} does not support in-process {phase}, running its command instead")
+                self._in_process_calls[(tool.name, phase)] = None
+
+        return self._in_process_calls[(tool.name, phase)]
+
+    def estimate_memory(self, tool: ToolPlugin, instance: Instance) -> int:
+        from trustdnn.core.scheduler import estimate_memory
+
+        dataset = instance.dataset
+        splits = [dataset.test] if instance.phase == 'infer' else [dataset.train, dataset.val]
+
+        return estimate_memory(self.executions, tool=tool.name, phase=instance.phase, dataset=dataset.name,
+                               model=instance.model.name,
+                               files=[instance.model.path] + [split.features_path for split in splits])
+
+    def get_job(self, tool: ToolPlugin, instance: Instance, force: bool, staged: Instance = None,
+                **kwargs) -> Optional[Job]:
+        """
+            The job of the instance, run on its staged copy if any: the tool reads and writes the staging directory
+            and its logs are written to the working directory. A replaced output is set aside in the staging
+            directory, the working directory keeps it until the outputs are copied back.
+        """
+        job = self.instance_handler.get_job(staged or instance, command_call=tool.run_command,
+                                            sub_command_call=getattr(tool, f"{instance.phase}_command"),
+                                            tool_path=tool.path, force=force, **kwargs)
+
+        if job is not None and staged is not None:
+            job.log_path = instance.working_dir.parent
+
+        return job
+
+    def get_output(self, output: Path, instance: Instance, staged: Optional[Instance]) -> Path:
+        if staged is None:
+            return output
+
+        return self.instance_handler.stager.map_path(output, staged.working_dir, instance.working_dir)
+
+    async def run_attempts(self, tool: ToolPlugin, benchmark: str, instance: Instance, job: Job,
+                           estimate: Optional[int], group: str, repetition: Optional[int],
+                           in_process_call: Callable = None, staged: Instance = None, columns: dict = None,
+                           **kwargs) -> Tuple[Execution, Optional[int], dict]:
+        """
+            Runs the job until it succeeds or fails with a failure that is not retried
+        :param staged: staged copy of the instance the job runs on
+        :param columns: columns journaled with the attempts that are not arguments of the sub-command
+        :param kwargs: arguments of the sub-command the job was built with, saved with the executions
+        :return: the execution of the last attempt, the memory estimate of the instance, and the arguments of the
+            sub-command of the last attempt
+        """
+        from trustdnn.core.failures import classify, read_tail
+
+        attempt, batch_size, cores = 0, kwargs.get('batch_size', getattr(tool, 'batch_size', None)), job.cores
+
+        def record(execution: Execution, **entry):
+            self.journal.record(**self.get_execution_row(tool, benchmark, instance, execution, **kwargs,
+                                                         **(columns or {})),
+                                stderr=execution.stderr, **entry)
+
+        def on_requeue(execution: Execution):
+            execution.group, execution.repetition = group, repetition
+            execution.attempt, execution.failure = attempt, classify(execution)
+            execution.output = self.get_output(execution.output, instance, staged)
+            record(execution, requeued=True)
+
+        while True:
+            try:
+                job.memory = estimate
+
+                if in_process_call:
+                    # runs alone in a thread, the event loop keeps streaming the logs of the other jobs
+                    execution = await self.engine.execute_call(job, functools.partial(
+                        self.instance_handler.execute_in_process, in_process_call, staged or instance, job.log_path,
+                        output=job.output))
+                else:
+                    job.exclusive = attempt > 0 and self.policy.alone
+                    execution = await self.engine.execute(job, on_requeue=on_requeue)
+                    # a job re-queued for exceeding its estimate keeps the larger one for the next runs
+                    estimate = job.memory
+            except BaseException:
+                # cancelled, the output of the previous run is restored
+                self.instance_handler.settle_output(job.output, success=False)
+                raise
+
+            execution.group, execution.repetition = group, repetition
+            execution.attempt = attempt
+            execution.failure = classify(execution, read_tail(execution.stderr), tool.failures)
+            # saved with the path the output is copied back to
+            execution.output = self.get_output(execution.output, instance, staged)
+            retry = self.policy.should_retry(execution.failure, attempt)
+            delay = self.policy.delay(attempt) if retry else None
+            record(execution, retry_in=delay)
+
+            if not retry:
+                # the output of the previous run is restored when the run failed
+                self.instance_handler.settle_output(job.output, success=execution.status == 'success')
+
+                return execution, estimate, kwargs
+
+            self.app.log.warning(f"Execution on {instance} failed ({execution.failure}), retrying in {delay}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+            batch_size = self.policy.batch_size(execution.failure, batch_size)
+            kwargs = {**kwargs, 'batch_size': batch_size} if batch_size else kwargs
+            # the output of the failed attempt is removed, the output of the previous run stays aside
+            job.output.unlink(missing_ok=True)
+            job = self.get_job(tool, instance, force=True, staged=staged, **kwargs)
+            # the logs of the attempts are kept apart
+            job.name = f"{job.name}.retry{attempt}"
+            job.cores = cores
+
+    async def run_instance(self, tool: ToolPlugin, benchmark: str, instance: Instance, cores: List[int] = None,
+                           columns: dict = None, **kwargs) -> Optional[Execution]:
+        """
+            Runs the instance with the warm-up and repetition protocol. Warm-up runs are discarded and the measured
+            repetitions are saved as separate executions sharing a group id, the runs are sequential.
+        :param cores: cores the runs are pinned to, instead of the cores assigned by the engine
+        :param columns: columns saved with the executions that are not arguments of the sub-command
+        :param kwargs: arguments of the sub-command, such as the batch_size, saved as columns of the executions
+        :return: the execution of the last run, None if the output exists
+        """
+        group = uuid.uuid4().hex[:8]
+        execution, staged, copy = None, None, None
+        estimate = self.estimate_memory(tool, instance) if self.budget else None
+        in_process_call = self.get_in_process_call(tool, instance.phase)
+        repeat, warmup = self.options.repeat, self.options.warmup
+
+        if self._copier:
+            # staged in a thread, the first instance of a dataset copies it while the other executions run
+            staged = await asyncio.get_running_loop().run_in_executor(None, self.instance_handler.stage, instance)
+
+        try:
+            for run in range(warmup + repeat):
+                is_warmup = run < warmup
+                self.app.log.info(f"Running {'warm-up' if is_warmup else 'repetition'} "
+                                  f"{run + 1 if is_warmup else run - warmup + 1} of {tool} on {instance}")
+
+                job = self.get_job(tool, instance, force=self.force, staged=staged, **kwargs)
+
+                if job is None:
+                    execution = None
+                    continue
+
+                job.cores = cores
+                # warm-up runs are journaled without repetition
+                repetition = None if is_warmup else run - warmup
+                execution, estimate, arguments = await self.run_attempts(tool, benchmark, instance, job, estimate,
+                                                                         group=group, repetition=repetition,
+                                                                         in_process_call=in_process_call,
+                                                                         staged=staged, columns=columns, **kwargs)
+
+                if not is_warmup:
+                    self.save_execution(tool, benchmark, instance, execution, **arguments, **(columns or {}))
+        finally:
+            if staged is not None:
+                copy = self._copier.submit(self.instance_handler.unstage, staged, instance)
+                self._copies.append(copy)
+
+        if instance.phase == 'infer' and execution and execution.status == 'success':
+            if copy is not None:
+                try:
+                    # the notifications are converted next to the output in the working directory
+                    await asyncio.wrap_future(copy)
+                except OSError:
+                    # reported once the staging finishes
+                    return execution
+
+            # converted in a thread, so the other executions keep streaming
+            await asyncio.get_running_loop().run_in_executor(None, self.convert_notifications, tool,
+                                                             execution.output)
+
+        return execution
+
+    def convert_notifications(self, tool: ToolPlugin, output: Path):
+        """
+            Converts the notifications of the output once, so that evaluations only memory-map them
+        """
+        try:
+            tool.convert_notifications(output)
+        except Exception as e:
+            self.app.log.warning(f"Could not convert the notifications in {output}, they are converted on "
+                                 f"evaluation instead: {e}")
+
+    def run(self, tasks: Iterable[Callable[[], Awaitable]]) -> list:
+        """
+            Runs the tasks, coroutine functions calling run_instance, as a single workload
+        """
+        try:
+            return self.engine.run(tasks)
+        finally:
+            self.finish_staging()
+
+    def finish_staging(self):
+        """
+            Waits for the outputs to be copied back, and removes the staged working directories unless a copy failed
+        """
+        if self._copier is None:
+            return
+
+        failed = False
+
+        for copy in self._copies:
+            try:
+                copy.result()
+            except OSError as e:
+                self.app.log.error(f"Could not copy the outputs back from the staging directory: {e}")
+                failed = True
+
+        self._copier.shutdown()
+        self._copies = []
+
+        if failed:
+            self.app.log.warning(f"Keeping the staged working directories in {self.instance_handler.stager.work_path}")
+        else:
+            self.instance_handler.stager.cleanup()
+
+    def run_instances(self, tool: ToolPlugin, benchmark: str, instances: Iterable[Instance]) -> list:
+        return self.run([functools.partial(self.run_instance, tool, benchmark, instance) for instance in instances])
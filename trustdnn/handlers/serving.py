@@ -0,0 +1,205 @@
+import os
+import shlex
+import signal
+import asyncio
+import threading
+
+from pathlib import Path
+from datetime import datetime, timezone
+from dataclasses import dataclass, fields
+from typing import Iterable, Optional, TYPE_CHECKING
+
+from trustdnn.core.objects import Instance
+from trustdnn.core.exc import TrustDNNError
+from trustdnn.handlers.tool import ToolPlugin
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass
+class ServeOptions:
+    """
+        Options of the load generator, named as the options of the serve action
+    """
+    concurrency: int = 1
+    rate: float = None
+    requests: int = None
+    port: int = None
+    ready_timeout: float = 120.0
+    request_timeout: float = 30.0
+    in_process: bool = False
+
+    @classmethod
+    def from_args(cls, args) -> 'ServeOptions':
+        return cls(**{f.name: getattr(args, f.name) for f in fields(cls) if getattr(args, f.name, None) is not None})
+
+
+class ServingRunner:
+    def __init__(self, app, working_dir: Path, options: ServeOptions):
+        """
+            Starts the endpoint of a tool for each instance, one at a time, and replays the test samples against it.
+            The summaries are saved to the serving.csv of the working directory, and the requests of each run to the
+            serving directory of the instance.
+        :param app: the application
+        :param working_dir: working directory
+        :param options: options of the load generator
+        """
+        self.app = app
+        self.working_dir = working_dir
+        self.options = options
+
+    def get_offline_notifications(self, tool: ToolPlugin, instance: Instance) -> Optional['np.ndarray']:
+        """
+            Notification codes of the offline inference of the instance, None if it did not run
+        """
+        output, _ = tool.infer_command(instance.model, instance.dataset, instance.working_dir)
+
+        if not output.exists():
+            self.app.log.warning(f"No offline inference of {tool} on {instance}, the agreement is not measured")
+            return None
+
+        try:
+            return tool.load_notifications(output)
+        except Exception as e:
+            self.app.log.warning(f"Could not load the notifications in {output}: {e}")
+            return None
+
+    async def start_process(self, tool: ToolPlugin, instance: Instance, port: int, log_name: str):
+        command = tool.run_command(tool.serve_command(instance.model, instance.dataset, instance.working_dir, port))
+        self.app.log.info(f"Starting server: {command}")
+        log_path = instance.working_dir.parent
+
+        with (log_path / f"{log_name}.stdout").open('w') as stdout, \
+                (log_path / f"{log_name}.stderr").open('w') as stderr:
+            # in its own session, so the shell and the server are stopped together
+            return await asyncio.create_subprocess_exec(*shlex.split(command), cwd=tool.path, stdout=stdout,
+                                                        stderr=stderr, start_new_session=True)
+
+    @staticmethod
+    async def stop_process(process, timeout: float = 10):
+        if process.returncode is not None:
+            return
+
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            os.killpg(process.pid, signal.SIGKILL)
+            await process.wait()
+        except ProcessLookupError:
+            pass
+
+    async def generate_load(self, port: int, instance: Instance, process=None) -> dict:
+        """
+            Waits for the endpoint and replays the test samples, sampling the memory of the server process if any
+        """
+        from trustdnn.core.serve import HOST, LoadGenerator, wait_until_ready
+
+        await wait_until_ready(HOST, port, self.options.ready_timeout,
+                               alive=(lambda: process.returncode is None) if process else None)
+        generator = LoadGenerator(HOST, port, instance.dataset.test.features, requests=self.options.requests,
+                                  concurrency=self.options.concurrency, rate=self.options.rate,
+                                  timeout=self.options.request_timeout)
+        memory_usage, stop, thread = [], threading.Event(), None
+
+        if process is not None:
+            import psutil
+            from trustdnn.handlers.instance import get_memory_usage
+
+            thread = threading.Thread(target=get_memory_usage, args=(psutil.Process(process.pid),
+                                                                     memory_usage.append, stop))
+            thread.start()
+
+        try:
+            result = await generator.generate()
+        finally:
+            stop.set()
+
+            if thread is not None:
+                thread.join()
+
+        return {'result': result, 'mem_peak': max(memory_usage) if memory_usage else None}
+
+    async def serve(self, tool: ToolPlugin, instance: Instance, log_name: str) -> dict:
+        from trustdnn.core.serve import NotificationServer, get_free_port
+
+        port = self.options.port or get_free_port()
+
+        # tools without a server command are served in-process without -ip
+        if tool.runs_in_process('serve') and (self.options.in_process or not tool.has_serve_command()):
+            server = NotificationServer(tool.serve(instance.model, instance.dataset, instance.working_dir),
+                                        port=port)
+            server.start()
+
+            try:
+                return await self.generate_load(server.port, instance)
+            finally:
+                server.stop()
+
+        if not tool.has_serve_command():
+            raise TrustDNNError(f"{tool} does not support serving")
+
+        if self.options.in_process:
+            self.app.log.warning(f"{tool} does not support in-process serving, running its server instead")
+
+        process = await self.start_process(tool, instance, port, log_name)
+
+        try:
+            return await self.generate_load(port, instance, process)
+        finally:
+            await self.stop_process(process)
+
+    def save_requests(self, instance: Instance, timestamp: int, result):
+        import pandas as pd
+
+        path = instance.working_dir / 'serving'
+        path.mkdir(exist_ok=True)
+        pd.DataFrame({'index': result.indices, 'latency': result.latencies,
+                      'notification': result.notifications}).to_csv(path / f"{timestamp}.csv", index=False)
+
+    def save_summary(self, row: dict):
+        import pandas as pd
+
+        path = self.working_dir / "serving.csv"
+
+        if path.exists():
+            rows = pd.concat([pd.read_csv(path, index_col=False), pd.DataFrame([row])], ignore_index=True)
+        else:
+            rows = pd.DataFrame([row])
+
+        rows.to_csv(path, index=False)
+
+    def run_instance(self, tool: ToolPlugin, benchmark: str, instance: Instance) -> Optional[dict]:
+        """
+            Serves the instance under load and saves its summary
+        :return: the summary, None if the server failed
+        """
+        timestamp = int(datetime.now(timezone.utc).timestamp())
+        offline = self.get_offline_notifications(tool, instance)
+        self.app.log.info(f"Serving {tool} on {instance}")
+
+        try:
+            served = asyncio.run(self.serve(tool, instance, log_name=f"{timestamp}.{instance.model.name}.serve"))
+        except TrustDNNError as e:
+            self.app.log.error(f"Serving {tool} on {instance} failed: {e}")
+            return None
+
+        result = served['result']
+        self.save_requests(instance, timestamp, result)
+        row = {'timestamp': timestamp, 'tool': tool.name, 'benchmark': benchmark, 'dataset': instance.dataset.name,
+               'model': instance.model.name, 'concurrency': self.options.concurrency, 'rate': self.options.rate,
+               **result.summary(offline), 'mem_peak': served['mem_peak']}
+        self.save_summary(row)
+        self.app.log.info(f"{tool} on {instance.model.name}: {row['throughput']} requests/s, p50 "
+                          f"{row['latency_p50']} ms, p99 {row['latency_p99']} ms, {row['errors']} errors, "
+                          f"agreement {row['agreement']}")
+
+        return row
+
+    def run_instances(self, tool: ToolPlugin, benchmark: str, instances: Iterable[Instance]) -> list:
+        if not tool.supports_serving():
+            raise TrustDNNError(f"{tool} does not support serving")
+
+        # one server at a time, so that the latencies are not disturbed by the other instances
+        return [self.run_instance(tool, benchmark, instance) for instance in instances]
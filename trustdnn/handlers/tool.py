@@ -1,23 +1,41 @@
 import os
 import platform
 
-from typing import Tuple
+from typing import Any, Callable, Dict, List, Tuple, Iterator, Optional, Union, TYPE_CHECKING
 from pathlib import Path
 from abc import abstractmethod
 
-import pandas as pd
-
 from trustdnn.handlers.plugin import PluginHandler
 from trustdnn.core.dataset.base import Dataset
 from trustdnn.core.model import Model
 
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from trustdnn.core.notifications import NotificationArtifact
+
+
+# optional methods running a phase in the same process
+IN_PROCESS_PHASES = ('analyze', 'infer', 'serve')
+
 
 class ToolPlugin(PluginHandler):
     class Meta:
         label = 'tool'
 
+    # phases with an in-process API and whether the tool has a serving command, set when the class is defined
+    in_process_phases: frozenset = frozenset()
+    serves_with_command: bool = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # the optional methods are checked once, before the tool is registered
+        cls.in_process_phases = frozenset(phase for phase in IN_PROCESS_PHASES
+                                          if getattr(cls, phase) is not getattr(ToolPlugin, phase))
+        cls.serves_with_command = cls.serve_command is not ToolPlugin.serve_command
+
     def __init__(self, name: str, command: str = None, path: str = None, interpreter: str = None, env_path: str = None,
-                 **kw):
+                 failures: Dict[str, str] = None, **kw):
         super().__init__(name, **kw)
         """
             Tool Plugin
@@ -27,17 +45,19 @@ class ToolPlugin(PluginHandler):
             :param working_dir: working directory
             :param interpreter: interpreter to use
             :param env_path: path to the environment
+            :param failures: regular expressions matched against the stderr of failed executions, mapped to the class
+                of failure they identify ('oom' and 'transient' failures are retried)
         """
         # check paths
         self.command = command
         self.interpreter = interpreter
-        self.has_metrics = False
         self.path = Path(path).expanduser() if path else None
 
         if path and not self.path.exists():
             raise FileNotFoundError(f"Tool path {path} not found")
 
         self.env_path = Path(env_path).expanduser() if env_path else None
+        self.failures = failures or {}
         self.shell = os.getenv('SHELL', '/bin/bash')
         self._activate_command = None
 
@@ -48,7 +68,7 @@ class ToolPlugin(PluginHandler):
         :param model: model to use
         :param dataset: dataset to use
         :param working_dir: working directory
-        :param kwargs:
+        :param kwargs: batch_size, reduced on the retries of executions that ran out of memory
         :return: output path and command
         """
         pass
@@ -60,13 +80,13 @@ class ToolPlugin(PluginHandler):
         :param model: model to use
         :param dataset: dataset to use
         :param working_dir: working directory
-        :param kwargs:
+        :param kwargs: batch_size, reduced on the retries of executions that ran out of memory
         :return: output path and command
         """
         pass
 
     @abstractmethod
-    def get_notifications(self, output: Path, **kwargs) -> pd.DataFrame:
+    def get_notifications(self, output: Path, **kwargs) -> 'pd.DataFrame':
         """
             Get notifications
         :param output: output path
@@ -75,6 +95,189 @@ class ToolPlugin(PluginHandler):
         """
         pass
 
+    def iter_notifications(self, output: Path, chunk_size: int, **kwargs) -> Iterator['pd.DataFrame']:
+        """
+            Get notifications in chunks, tools should override it to read the output incrementally. By default, the
+            notifications returned by get_notifications are split in chunks.
+        :param output: output path
+        :param chunk_size: number of samples per chunk
+        :param kwargs:
+        :return: iterator over DataFrames with notification column
+        """
+        notifications = self.get_notifications(output, **kwargs)
+
+        for start in range(0, len(notifications), chunk_size):
+            yield notifications.iloc[start:start + chunk_size]
+
+    def get_scores(self, output: Path, **kwargs) -> Optional['pd.DataFrame']:
+        """
+            Get the confidence scores behind the notifications, optional for tools that emit them
+        :param output: output path
+        :param kwargs:
+        :return: returns DataFrame with score column (higher means the prediction is more likely correct), or None if
+            the tool does not emit scores
+        """
+        return None
+
+    def get_notification_sources(self, output: Union[Path, str]) -> List[Path]:
+        """
+            Files the notifications and scores of the output are read from, tools that read them from other files
+            than the output should override it so that the artifact of the output is stale once these files change
+        :param output: output path
+        :return: paths of the files, the output first
+        """
+        return [Path(output)]
+
+    def get_notification_artifact(self, output: Union[Path, str]) -> 'NotificationArtifact':
+        from trustdnn.core.notifications import NotificationArtifact
+
+        return NotificationArtifact(output, sources=self.get_notification_sources(output))
+
+    def read_notification_codes(self, output: Union[Path, str]) -> Tuple['np.ndarray', Optional['np.ndarray']]:
+        """
+            Reads the notification codes and scores of the output, without the artifact
+        :param output: output path
+        :return: notification codes and scores (None if the tool does not emit scores)
+        """
+        from trustdnn.core.evaluation import encode_notifications, get_column
+
+        notifications = self.get_notifications(Path(output))
+
+        if notifications is None:
+            raise ValueError(f"{self.name} does not return notifications for {output}")
+
+        scores = self.get_scores(Path(output))
+
+        # notifications are stored by position, as the labels and predictions they are evaluated against
+        return encode_notifications(notifications['notification']), \
+            get_column(scores, 'score') if scores is not None else None
+
+    def convert_notifications(self, output: Union[Path, str]) -> 'NotificationArtifact':
+        """
+            Converts the notifications and scores of the output to the canonical artifact, unless it is up to date
+        :param output: output path
+        :return: the artifact of the output
+        """
+        artifact = self.get_notification_artifact(output)
+
+        if not artifact.fresh:
+            artifact.save(*self.read_notification_codes(output))
+
+        return artifact
+
+    def _load_notification_codes(self, output: Union[Path, str]) -> Tuple['np.ndarray', Optional['np.ndarray']]:
+        artifact = self.get_notification_artifact(output)
+
+        if artifact.fresh:
+            return artifact.codes, artifact.scores
+
+        codes, scores = self.read_notification_codes(output)
+
+        try:
+            artifact.save(codes, scores)
+        except OSError:
+            # outputs in read-only directories are converted on each evaluation instead
+            pass
+
+        return codes, scores
+
+    def load_notifications(self, output: Union[Path, str]) -> 'np.ndarray':
+        """
+            Memory-maps the notification codes of the output, converting them on first use
+        """
+        return self._load_notification_codes(output)[0]
+
+    def iter_notification_codes(self, output: Union[Path, str], chunk_size: int) -> Iterator['np.ndarray']:
+        """
+            Notification codes in chunks, from the artifact when it is up to date and from iter_notifications
+            otherwise, so that streaming evaluations do not convert the whole output
+        """
+        from trustdnn.core.evaluation import encode_notifications
+
+        artifact = self.get_notification_artifact(output)
+
+        if artifact.fresh:
+            codes = artifact.codes
+
+            for start in range(0, len(codes), chunk_size):
+                yield codes[start:start + chunk_size]
+        else:
+            for notifications in self.iter_notifications(Path(output), chunk_size):
+                yield encode_notifications(notifications['notification'])
+
+    def load_scores(self, output: Union[Path, str]) -> Optional['np.ndarray']:
+        """
+            Memory-maps the scores of the output, converting them on first use. None if the tool does not emit scores.
+        """
+        return self._load_notification_codes(output)[1]
+
+    def analyze(self, model: Model, dataset: Dataset, working_dir: Path, **kwargs):
+        """
+            Offline analysis in the same process, optional for tools implemented in Python that can be imported in
+            the environment of trustdnn. Must write the output returned by analyze_command. Only called when
+            runs_in_process('analyze'), i.e., when the tool overrides it.
+        :param model: model to use, model.load() returns the loaded model shared by the instances of the model
+        :param dataset: dataset to use
+        :param working_dir: working directory
+        :param kwargs:
+        """
+        raise NotImplementedError(f"{self.name} does not support in-process analysis")
+
+    def infer(self, model: Model, dataset: Dataset, working_dir: Path, **kwargs):
+        """
+            Inference in the same process, optional for tools implemented in Python that can be imported in the
+            environment of trustdnn. Must write the output returned by infer_command. Only called when
+            runs_in_process('infer'), i.e., when the tool overrides it.
+        :param model: model to use, model.load() returns the loaded model shared by the instances of the model
+        :param dataset: dataset to use
+        :param working_dir: working directory
+        :param kwargs:
+        """
+        raise NotImplementedError(f"{self.name} does not support in-process inference")
+
+    def serve_command(self, model: Model, dataset: Dataset, working_dir: Path, port: int, **kwargs) -> str:
+        """
+            Serving phase, optional: the command starts a server on localhost:port that notifies one sample per
+            request (see trustdnn.core.serve for the endpoint) with the analysis in the working directory. Only
+            called when has_serve_command(), i.e., when the tool overrides it.
+        :param model: model to use
+        :param dataset: dataset to use
+        :param working_dir: working directory
+        :param port: port of the endpoint
+        :param kwargs:
+        :return: command
+        """
+        raise NotImplementedError(f"{self.name} does not support serving")
+
+    def serve(self, model: Model, dataset: Dataset, working_dir: Path, **kwargs) -> Callable[['np.ndarray'], Any]:
+        """
+            Serving in the same process, optional for tools implemented in Python that can be imported in the
+            environment of trustdnn, which exposes the returned function on the endpoint. Only called when
+            runs_in_process('serve'), i.e., when the tool overrides it.
+        :param model: model to use, model.load() returns the loaded model shared by the instances of the model
+        :param dataset: dataset to use
+        :param working_dir: working directory
+        :param kwargs:
+        :return: function returning the notification of the features of one sample, or the notification and its score
+        """
+        raise NotImplementedError(f"{self.name} does not support in-process serving")
+
+    def runs_in_process(self, phase: str) -> bool:
+        """
+            Checks if the tool implements the in-process API for the phase (analyze, infer or serve), which gates the
+            calls to the methods of the phase
+        """
+        return phase in self.in_process_phases
+
+    def has_serve_command(self) -> bool:
+        """
+            Checks if the tool implements serve_command, which gates the calls to it
+        """
+        return self.serves_with_command
+
+    def supports_serving(self) -> bool:
+        return self.has_serve_command() or self.runs_in_process('serve')
+
     def __str__(self):
         return self.name
 
@@ -6,8 +6,11 @@ from .core.exc import TrustDNNError
 from .controllers.base import Base
 from .controllers.execute import Execute
 from .controllers.evaluate import Evaluate
+from .controllers.benchmark import Benchmark
+from .controllers.campaign import Campaign
 
 from trustdnn.core.interfaces import PluginsInterface, HandlersInterface
+from trustdnn.core.registry import PluginRegistry
 from trustdnn.handlers.instance import InstanceHandler
 
 from trustdnn.handlers.tool import ToolPlugin
@@ -55,9 +58,12 @@ class TrustDNN(App):
 
         # register handlers
         handlers = [
-            Base, Execute, Evaluate, InstanceHandler
+            Base, Execute, Evaluate, Benchmark, Campaign, InstanceHandler
         ]
 
+    # set by load_configs
+    registry: PluginRegistry = None
+
     def get_plugin_handler(self, name: str, kind: type = None, **kw):
         """
             Gets the handler associated to the plugin
@@ -68,37 +74,18 @@ class TrustDNN(App):
         """
 
         try:
-
-            if name not in self.plugin.get_loaded_plugins():
-                try:
-                    if self.plugin.load_plugin(name):
-                        self.log.info(f'Loaded plugin {name}')
-                except ModuleNotFoundError as mnf:
-                    self.log.error(f'Plugin {name} not found')
-                    exit(1)
-
-            plugin = self.handler.resolve('plugins', name)
-
-            if kind is not None:
-                if not isinstance(plugin, kind):
-                    raise TypeError(f'Plugin {name} is not of type {kind.__name__}')
-
             if kind == ToolPlugin:
-                configs = self.config.get('tools', name)
+                section = 'tools'
             elif kind == BenchmarkPlugin:
-                configs = self.config.get('benchmarks', name)
+                section = 'benchmarks'
             else:
                 raise InterfaceError(f'Invalid kind {kind}')
 
-            if configs is None:
-                raise KeyError(f'No configuration found for plugin {name}')
-
-            kw.update(configs)
-            plugin.__init__(**kw)
-            plugin._setup(self)
-            self.log.info(f'Initialized plugin {name}')
-
-            return plugin
+            try:
+                return self.registry.get(name, kind, section, **kw)
+            except ModuleNotFoundError as mnf:
+                self.log.error(f'Plugin {name} not found')
+                exit(1)
 
         except InterfaceError as ie:
             self.log.error(str(ie))
@@ -107,15 +94,17 @@ class TrustDNN(App):
             self.log.error(str(te))
             exit(1)
         except KeyError as ke:
-            self.log.error(f"Could not resolve plugin {name}")
+            self.log.error(f"Could not resolve plugin {name}: {ke}")
             exit(1)
         except FileNotFoundError as fnf:
             self.log.error(str(fnf))
             exit(1)
 
     def load_configs(self):
+        """
+            Checks the config directories. The config of each plugin is parsed only when the plugin is requested.
+        """
         import os
-        import json
 
         trustdnn_dir = os.environ.get('TRUSTDNN_DIR', None)
 
@@ -135,27 +124,13 @@ class TrustDNN(App):
             self.log.error(f'Tools config path {tools_config_path} not found')
             exit(1)
 
-        self.config.add_section('tools')
-
-        for tool_config_path in tools_config_path.iterdir():
-            if tool_config_path.is_file() and tool_config_path.suffix == '.json':
-                self.log.info(f'Loading tool config {tool_config_path}')
-                with tool_config_path.open() as f:
-                    self.config.set('tools', tool_config_path.stem, json.load(f))
-
         benchmarks_config_path = trustdnn_config_path / 'benchmarks'
 
         if not benchmarks_config_path.exists():
             self.log.error(f'Benchmarks config path {benchmarks_config_path} not found')
             exit(1)
 
-        self.config.add_section('benchmarks')
-
-        for benchmark_config_path in benchmarks_config_path.iterdir():
-            if benchmark_config_path.is_file() and benchmark_config_path.suffix == '.json':
-                self.log.info(f'Loading benchmark config {benchmark_config_path}')
-                with benchmark_config_path.open() as f:
-                    self.config.set('benchmarks', benchmark_config_path.stem, json.load(f))
+        self.registry = PluginRegistry(self, trustdnn_config_path)
 
 
 class TrustDNNTest(TestApp, TrustDNN):
@@ -58,6 +58,14 @@ class DeepInfer(ToolPlugin):
         print('Model:', Path(output).parent.name, 'Violations:', violations['0'].sum(), 'Satisfactions:',
               satisfactions['0'].sum())
 
+        return self._to_notifications(df)
+
+    def iter_notifications(self, output: Path, chunk_size: int, **kwargs):
+        for df in pd.read_csv(output, chunksize=chunk_size):
+            yield self._to_notifications(df)
+
+    @staticmethod
+    def _to_notifications(df: pd.DataFrame) -> pd.DataFrame:
         # replace all 'wrong with incorrect'
 
         df['implication'] = df['implication'].str.replace('Wrong', 'incorrect')
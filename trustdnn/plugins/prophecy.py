@@ -56,6 +56,10 @@ class Prophecy(ToolPlugin):
 
         return df.rename(columns={'outcome': 'notification'})
 
+    def iter_notifications(self, output: Path, chunk_size: int, **kwargs):
+        for df in pd.read_csv(output, chunksize=chunk_size):
+            yield df.rename(columns={'outcome': 'notification'})
+
 
 def load(app):
     app.handler.register(Prophecy)
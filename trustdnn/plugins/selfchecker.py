@@ -1,5 +1,3 @@
-import json
-
 import numpy as np
 import pandas as pd
 
@@ -20,11 +18,10 @@ class SelfChecker(ToolPlugin):
         self.batch_size = batch_size
         self.only_activation_layers = only_activation_layers
         self.only_dense_layers = only_dense_layers
-        self.has_metrics = True
         self.var_threshold = var_threshold
 
     def analyze_command(self, model: Model, dataset: Dataset, working_dir: Path, **kwargs):
-        command_args = f"-m {model.path} -wd {working_dir} -bs {self.batch_size} "
+        command_args = f"-m {model.path} -wd {working_dir} -bs {kwargs.get('batch_size', self.batch_size)} "
 
         if self.only_dense_layers:
             command_args += "-odl "
@@ -43,7 +40,7 @@ class SelfChecker(ToolPlugin):
         return output, command
 
     def infer_command(self, model: Model, dataset: Dataset, working_dir: Path, **kwargs):
-        command_args = f"-m {model.path} -wd {working_dir} -bs {self.batch_size} "
+        command_args = f"-m {model.path} -wd {working_dir} -bs {kwargs.get('batch_size', self.batch_size)} "
 
         if self.only_dense_layers:
             command_args += "-odl "
@@ -56,25 +53,30 @@ class SelfChecker(ToolPlugin):
 
         return output, subcommand
 
-    # This is just a shortcut to get the metrics for selfchecker, but a tool is supposed to return the notifications
     @staticmethod
-    def get_metrics(output: Path):
-        with open(output, 'r') as f:
-            return json.load(f)
+    def get_pred_labels_path(output: Path) -> Path:
+        # the inference writes the predictions of the model and of its layers next to performance.json
+        return Path(output).parent / 'pred_labels_test.npy'
 
-    def get_notifications(self, output: Path, **kwargs):
-        pass
+    def get_notification_sources(self, output: Path):
+        return [Path(output), self.get_pred_labels_path(output)]
+
+    @staticmethod
+    def _to_notifications(pred_labels: np.ndarray) -> pd.DataFrame:
+        # the prediction is notified as incorrect when the layer-based prediction (second to last column) disagrees
+        # with the prediction of the model (last column)
+        incorrect = np.asarray(pred_labels[:, -2] != pred_labels[:, -1], dtype=np.int8)
+
+        return pd.DataFrame({'notification': pd.Categorical.from_codes(incorrect, categories=['correct', 'incorrect'])})
 
-        #pred_labels = np.load(output).astype(int)
-        #notifications = []
+    def get_notifications(self, output: Path, **kwargs):
+        return self._to_notifications(np.load(self.get_pred_labels_path(output), mmap_mode='r'))
 
-        #for idx, _ in enumerate(pred_labels):
-        #    if pred_labels[idx].T[-2] != pred_labels[idx].T[-1]:
-        #        notifications.append('incorrect')
-        #    else:
-        #        notifications.append('correct')
+    def iter_notifications(self, output: Path, chunk_size: int, **kwargs):
+        pred_labels = np.load(self.get_pred_labels_path(output), mmap_mode='r')
 
-        #return pd.DataFrame(notifications, columns=['notification'])
+        for start in range(0, len(pred_labels), chunk_size):
+            yield self._to_notifications(pred_labels[start:start + chunk_size])
 
 
 def load(app):